@@ -4,19 +4,17 @@ Digital Wellness Coach Agents
 
 from crewai import Agent
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
-from config import AGENT_CONFIG
+from config import AGENT_CONFIG, LLM_CACHE_CONFIG
+from utils.llm_backends import create_llm
+from utils.llm_cache import get_shared_llm_cache
 import json
 
 # Import our custom tool classes
 from tools.dopamine_cycle_breaker import dopamine_cycle_breaker
 from tools.screen_time_analyzer import screen_time_analyzer
 
-# Initialize language model
-llm = ChatOpenAI(
-    model=AGENT_CONFIG["model"],
-    temperature=AGENT_CONFIG["temperature"]
-)
+# Initialize language model (backend chosen by AGENT_CONFIG["backend"])
+llm = create_llm(AGENT_CONFIG, cache=get_shared_llm_cache(LLM_CACHE_CONFIG))
 
 # Create LangChain compatible tools
 @tool
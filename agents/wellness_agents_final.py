@@ -3,16 +3,14 @@ Digital Wellness Coach Agents - Final Version with Built-in Tools
 """
 
 from crewai import Agent
-from langchain_openai import ChatOpenAI
 from langchain.tools import Tool
 from datetime import datetime
-from config import AGENT_CONFIG
+from config import AGENT_CONFIG, LLM_CACHE_CONFIG
+from utils.llm_backends import create_llm
+from utils.llm_cache import get_shared_llm_cache
 
-# Initialize language model
-llm = ChatOpenAI(
-    model=AGENT_CONFIG["model"],
-    temperature=AGENT_CONFIG["temperature"]
-)
+# Initialize language model (backend chosen by AGENT_CONFIG["backend"])
+llm = create_llm(AGENT_CONFIG, cache=get_shared_llm_cache(LLM_CACHE_CONFIG))
 
 # BUILT-IN TOOL 1: DateTime Tool
 def get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S") -> str:
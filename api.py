@@ -2,15 +2,57 @@
 REST API for Digital Wellness Coach
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
-from main import DigitalWellnessCoach, generate_dynamic_sample_data, generate_mood_data
+from utils.dashboards import DashboardService, RenderPoolBrokenError
+from config import API_CONFIG, DASHBOARD_CONFIG, LLM_CACHE_CONFIG
+
+# Dashboard render workers are forked before main is imported: it opens
+# SQLite connections and starts crewai and telemetry threads, none of which
+# a forked child may inherit
+dashboards = DashboardService(
+    cache_dir=DASHBOARD_CONFIG["cache_dir"],
+    workers=DASHBOARD_CONFIG["render_workers"],
+    profile=DASHBOARD_CONFIG["profile"],
+    render_timeout=DASHBOARD_CONFIG["render_timeout_seconds"],
+    max_cache_mb=DASHBOARD_CONFIG["max_cache_mb"]
+)
+dashboards.start()
+
+from main import create_coach_pool, generate_dynamic_sample_data, generate_mood_data
+from utils.job_queue import JobQueue, QueueFullError
+from utils.llm_cache import get_shared_llm_cache
+from utils.openmetrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsWriter, RequestMetrics
+from utils.streaming import imap_unordered, iter_json_records
+from utils.visualizer import DASHBOARD_PROFILES
 import json
 import os
+import time
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for web frontends
-coach = DigitalWellnessCoach()
+# Each concurrent analysis leases its own coach; trackers and caches are shared
+coach_pool = create_coach_pool(API_CONFIG["coach_pool_size"])
+coach_state = coach_pool.primary.shared
+job_queue = JobQueue(
+    max_workers=API_CONFIG["max_concurrent_analyses"],
+    max_pending=API_CONFIG["max_queued_jobs"],
+    result_ttl_minutes=API_CONFIG["job_ttl_minutes"]
+)
+request_metrics = RequestMetrics()
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+    request_metrics.start()
+
+@app.after_request
+def _record_request(response):
+    # Streamed responses are timed until their first byte
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    elapsed = time.perf_counter() - g.get("request_start", time.perf_counter())
+    request_metrics.observe(request.method, endpoint, response.status_code, elapsed)
+    return response
 
 @app.route('/')
 def home():
@@ -19,13 +61,59 @@ def home():
         "service": "Digital Wellness Coach API",
         "version": "1.0",
         "endpoints": {
-            "POST /analyze": "Analyze user's digital wellness",
+            "POST /analyze": "Analyze user's digital wellness (?async=true returns a job id)",
+            "GET /jobs/<job_id>": "Status and result of an async analysis",
+            "POST /analyze/batch": "Analyze a JSON array or NDJSON of users, streamed back as NDJSON",
             "GET /demo/<severity>": "Run demo analysis (light/moderate/heavy)",
+            "GET /dashboard/<user_id>": "Dashboard for the user's latest analysis, rendered on demand (?profile=preview|print|vector)",
             "GET /health": "API health check",
+            "GET /metrics": "Prometheus/OpenMetrics metrics",
             "GET /sample/<severity>": "Get sample data for testing"
         }
     })
 
+def _wants_async():
+    """Async mode via ?async=true, a 'Prefer: respond-async' header or config"""
+    flag = request.args.get("async")
+    if flag is not None:
+        return flag.lower() in ("1", "true", "yes")
+    if "respond-async" in request.headers.get("Prefer", ""):
+        return True
+    return API_CONFIG["async_analyze"]
+
+def _validate_user_data(user_data):
+    """Return an error message if required fields are missing"""
+    if not isinstance(user_data, dict):
+        return "Request body must be a JSON object"
+    required_fields = ["apps", "sessions", "app_switches", "duration_minutes"]
+    for field in required_fields:
+        if field not in user_data:
+            return f"Missing required field: {field}"
+    return None
+
+def _run_analysis(user_data):
+    """Run the coach and build the /analyze response body and cache status"""
+    result, cache_status = coach_pool.analyze_user_with_status(user_data)
+    
+    # Extract key metrics from result
+    severity = "CRITICAL" if "critical" in str(result).lower() else "MODERATE"
+    
+    return {
+        "status": "success",
+        "severity": severity,
+        "analysis": str(result),
+        "metrics": {
+            "app_switches": user_data["app_switches"],
+            "total_minutes": user_data["duration_minutes"],
+            "app_count": len(user_data["apps"])
+        }
+    }, cache_status
+
+def _run_analysis_job(user_data):
+    """Job/batch variant of _run_analysis with the cache status in the body"""
+    body, cache_status = _run_analysis(user_data)
+    return {**body, "cache_status": cache_status}
+
 @app.route('/analyze', methods=['POST'])
 def analyze_wellness():
     """Analyze user's digital wellness"""
@@ -33,36 +121,87 @@ def analyze_wellness():
         user_data = request.json
         
         # Validate required fields
-        required_fields = ["apps", "sessions", "app_switches", "duration_minutes"]
-        for field in required_fields:
-            if field not in user_data:
-                return jsonify({
-                    "status": "error",
-                    "message": f"Missing required field: {field}"
-                }), 400
+        error = _validate_user_data(user_data)
+        if error:
+            return jsonify({
+                "status": "error",
+                "message": error
+            }), 400
         
-        # Run analysis
-        result = coach.analyze_user(user_data)
-        
-        # Extract key metrics from result
-        severity = "CRITICAL" if "critical" in str(result).lower() else "MODERATE"
+        if _wants_async():
+            try:
+                job_id = job_queue.submit(_run_analysis_job, user_data)
+            except QueueFullError as e:
+                response = jsonify({"status": "error", "message": str(e)})
+                response.headers["Retry-After"] = "30"
+                return response, 503
+            
+            response = jsonify({
+                "status": "accepted",
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}"
+            })
+            response.headers["Location"] = f"/jobs/{job_id}"
+            return response, 202
         
-        return jsonify({
-            "status": "success",
-            "severity": severity,
-            "analysis": str(result),
-            "metrics": {
-                "app_switches": user_data["app_switches"],
-                "total_minutes": user_data["duration_minutes"],
-                "app_count": len(user_data["apps"])
-            }
-        })
+        # Run analysis
+        body, cache_status = _run_analysis(user_data)
+        response = jsonify(body)
+        response.headers["X-Cache"] = cache_status
+        return response
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500
 
+def _analyze_batch_record(user_data):
+    """Validate and analyze one record of a batch request"""
+    error = _validate_user_data(user_data)
+    if error:
+        return {"status": "error", "message": error}
+    return _run_analysis_job(user_data)
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze many users, streaming one NDJSON line per user as it finishes
+    
+    The body is a JSON array or NDJSON of usage records. Records are parsed
+    lazily and at most API_CONFIG["batch_max_parallel"] analyses run at
+    once, so the batch is never held in memory. Each line carries the
+    record's position in the request as "index".
+    """
+    records = iter_json_records(request.stream)
+    
+    def generate():
+        try:
+            results = imap_unordered(
+                _analyze_batch_record,
+                records,
+                max_workers=API_CONFIG["batch_max_parallel"]
+            )
+            for index, outcome in results:
+                if isinstance(outcome, Exception):
+                    outcome = {"status": "error", "message": str(outcome)}
+                yield json.dumps({"index": index, **outcome}) + "\n"
+        except ValueError as e:
+            # Malformed body: report it as the final line
+            yield json.dumps({"index": None, "status": "error", "message": str(e)}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and result of an async analysis job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown or expired job: {job_id}"
+        }), 404
+    
+    return jsonify(job)
+
 @app.route('/demo/<severity>', methods=['GET'])
 def demo_analysis(severity):
     """Run demo analysis with different severity levels"""
@@ -78,9 +217,9 @@ def demo_analysis(severity):
         mood_data = generate_mood_data(severity)
         
         # Run analysis
-        result = coach.analyze_user(data, mood_data)
+        result, cache_status = coach_pool.analyze_user_with_status(data, mood_data)
         
-        return jsonify({
+        response = jsonify({
             "status": "success",
             "severity": severity,
             "user_data": {
@@ -91,12 +230,54 @@ def demo_analysis(severity):
             },
             "analysis_summary": str(result)[:1000] + "..."  # First 1000 chars
         })
+        response.headers["X-Cache"] = cache_status
+        return response
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500
 
+@app.route('/dashboard/<user_id>', methods=['GET'])
+def get_dashboard(user_id):
+    """Render (or serve the cached) dashboard for the user's latest saved analysis"""
+    profile = request.args.get("profile", DASHBOARD_CONFIG["profile"])
+    if profile not in DASHBOARD_PROFILES:
+        return jsonify({
+            "status": "error",
+            "message": f"Profile must be one of: {', '.join(DASHBOARD_PROFILES)}"
+        }), 400
+    
+    report = coach_state.report_sink.latest(user_id)
+    if report is None or not report.get("usage_data"):
+        return jsonify({
+            "status": "error",
+            "message": f"No saved analysis with usage data for user: {user_id}"
+        }), 404
+    
+    # The ETag is the content hash, so unchanged dashboards need no render or transfer
+    etag = dashboards.key(report["usage_data"], report.get("agent_analysis"), profile)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    try:
+        image, etag, cache_status = dashboards.get(report["usage_data"], report.get("agent_analysis"), profile)
+    except RenderPoolBrokenError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Could not render dashboard: {e}"
+        }), 500
+    
+    response = Response(image, mimetype=DASHBOARD_PROFILES[profile]["mimetype"])
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, max-age=300"
+    response.headers["X-Cache"] = cache_status
+    return response
+
 @app.route('/sample/<severity>', methods=['GET'])
 def get_sample_data(severity):
     """Get sample data for testing"""
@@ -119,12 +300,95 @@ def health_check():
     """API health check"""
     return jsonify({
         "status": "healthy",
-        "agents": len(coach.agents),
+        "agents": len(coach_pool.primary.agents),
         "custom_tools": 2,
-        "built_in_tools": 3
+        "built_in_tools": 3,
+        "jobs": job_queue.get_stats(),
+        "cache": coach_state.cache.get_stats() if coach_state.cache else None,
+        "coach_pool": coach_pool.get_stats(),
+        "dashboards": dashboards.get_stats(),
+        "background_writes": {
+            "writer": coach_state.writer.get_stats(),
+            "renderer": coach_state.render_writer.get_stats()
+        }
     })
 
+def _render_metrics():
+    """Collect request, queue, cache, agent and token metrics as OpenMetrics text"""
+    writer = MetricsWriter()
+    request_metrics.render(writer)
+    
+    jobs = job_queue.get_stats()
+    writer.family("wellness_job_queue_jobs", "gauge", "Analysis jobs by status")
+    for status in ["queued", "running", "completed", "failed"]:
+        writer.sample("wellness_job_queue_jobs", jobs[status], status=status)
+    writer.family("wellness_job_queue_capacity", "gauge", "Maximum queued plus running jobs")
+    writer.sample("wellness_job_queue_capacity", jobs["max_pending"])
+    
+    if coach_state.cache is not None:
+        cache = coach_state.cache.get_stats()
+        writer.family("wellness_analysis_cache_lookups", "counter", "Analysis cache lookups by result")
+        for result in ["memory_hits", "disk_hits", "stale_hits", "misses"]:
+            writer.sample("wellness_analysis_cache_lookups_total", cache[result], result=result)
+        writer.family("wellness_analysis_cache_evictions", "counter", "Entries evicted from the memory tier")
+        writer.sample("wellness_analysis_cache_evictions_total", cache["evictions"])
+        writer.family("wellness_analysis_cache_entries", "gauge", "Cached analyses by tier")
+        writer.sample("wellness_analysis_cache_entries", cache["memory_entries"], tier="memory")
+        writer.sample("wellness_analysis_cache_entries", cache["disk_entries"], tier="disk")
+        writer.family("wellness_analysis_cache_hit_ratio", "gauge", "Fresh hits over all lookups")
+        writer.sample("wellness_analysis_cache_hit_ratio", cache["hit_ratio"])
+    
+    llm_cache = get_shared_llm_cache(LLM_CACHE_CONFIG)
+    if llm_cache is not None:
+        llm_stats = llm_cache.get_stats()
+        writer.family("wellness_llm_cache_lookups", "counter", "LLM completion cache lookups by result")
+        writer.sample("wellness_llm_cache_lookups_total", llm_stats["hits"], result="hit")
+        writer.sample("wellness_llm_cache_lookups_total", llm_stats["misses"], result="miss")
+    
+    agents = coach_state.agent_tracker.get_performance_report()
+    writer.family("wellness_llm_tokens", "counter", "LLM tokens used per agent")
+    for agent, tokens in sorted(agents["token_usage_by_agent"].items()):
+        writer.sample("wellness_llm_tokens_total", tokens["prompt_tokens"], agent=agent, type="prompt")
+        writer.sample("wellness_llm_tokens_total", tokens["completion_tokens"], agent=agent, type="completion")
+    writer.family("wellness_agent_tool_calls", "counter", "Tool invocations per agent")
+    for agent, tools in sorted(agents["tool_usage_by_agent"].items()):
+        for tool, count in sorted(tools.items()):
+            writer.sample("wellness_agent_tool_calls_total", count, agent=agent, tool=tool)
+    writer.family("wellness_agent_task_errors", "counter", "Failed tasks per agent")
+    for agent, count in sorted(agents["error_counts"].items()):
+        writer.sample("wellness_agent_task_errors_total", count, agent=agent)
+    
+    pool = coach_pool.get_stats()
+    writer.family("wellness_coach_pool_coaches", "gauge", "Pooled coaches by state")
+    writer.sample("wellness_coach_pool_coaches", pool["in_use"], state="in_use")
+    writer.sample("wellness_coach_pool_coaches", pool["created"] - pool["in_use"], state="idle")
+    writer.family("wellness_coach_pool_waits", "counter", "Analyses that waited for a free coach")
+    writer.sample("wellness_coach_pool_waits_total", pool["waits"])
+    
+    backgrounds = [(w.name, w.get_stats()) for w in [coach_state.writer, coach_state.render_writer]]
+    writer.family("wellness_background_queue_items", "gauge", "Items waiting for a background writer")
+    for name, stats in backgrounds:
+        writer.sample("wellness_background_queue_items", stats["queued"], writer=name)
+    writer.family("wellness_background_writes", "counter", "Background writes by outcome")
+    for name, stats in backgrounds:
+        writer.sample("wellness_background_writes_total", stats["written"], writer=name, outcome="written")
+        writer.sample("wellness_background_writes_total", stats["failed"], writer=name, outcome="failed")
+    writer.family("wellness_background_inline_writes", "counter", "Writes done by the caller because the queue was full")
+    for name, stats in backgrounds:
+        writer.sample("wellness_background_inline_writes_total", stats["inline_writes"], writer=name)
+    
+    performance = coach_state.performance_tracker.generate_performance_report()
+    writer.summary("wellness_agent_duration_seconds", "Time spent per agent", performance["agent_latency"], "agent")
+    writer.summary("wellness_stage_duration_seconds", "Time spent per pipeline stage", performance["stage_latency"], "stage")
+    
+    return writer.render()
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus/OpenMetrics scrape endpoint"""
+    return Response(_render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     print("🚀 Starting Digital Wellness Coach API...")
     print("📍 Access at: http://localhost:5000")
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=True, port=5000, threaded=True)
\ No newline at end of file
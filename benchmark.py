@@ -0,0 +1,235 @@
+"""
+End-to-end benchmark for the Digital Wellness Coach pipeline.
+
+Builds a reproducible light/moderate/heavy cohort with
+generate_dynamic_sample_data, runs every user through each pipeline stage
+separately and prints machine-readable JSON (throughput, p50/p95/p99 and
+the RSS change per stage, plus the process peak RSS) that can be diffed
+between releases.
+
+The crew runs against the offline LLM backend, so no API key or network
+access is needed and the numbers measure our own overhead:
+
+    python benchmark.py --users 20 --seed 7 --output outputs/benchmarks/run.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SEVERITIES = ["light", "moderate", "heavy"]
+STAGES = ["tool_analysis", "crew_kickoff", "evaluate_responses", "save_results", "visual_report"]
+PERCENTILES = [50, 95, 99]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the wellness coach pipeline")
+    parser.add_argument("--users", type=int, default=10, help="users per severity level")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the generated cohort")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="synthetic latency per offline completion")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="stages to time")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Select the offline LLM and disable caches before the app modules load"""
+    os.environ["LLM_BACKEND"] = "offline"
+    os.environ["OFFLINE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["OFFLINE_LLM_JITTER_MS"] = "0"
+
+    import config
+    # Every user must do the full work, not hit a cache
+    config.CACHE_CONFIG["enabled"] = False
+    config.LLM_CACHE_CONFIG["enabled"] = False
+    return config
+
+
+def build_cohort(users_per_severity, seed):
+    """Reproducible list of (usage_data, mood_data) across severities"""
+    from main import generate_dynamic_sample_data, generate_mood_data
+
+    random.seed(seed)
+    cohort = []
+    for severity in SEVERITIES:
+        for i in range(users_per_severity):
+            usage_data = generate_dynamic_sample_data(severity, user_id=f"bench_{severity}_{i:03d}")
+            cohort.append((usage_data, generate_mood_data(severity)))
+    return cohort
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (only ever grows)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_bytes():
+    """Current resident set size, or None where /proc is unavailable (e.g. macOS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(durations, errors):
+    """Latency distribution (ms) and throughput for one stage"""
+    values = sorted(durations)
+    total = sum(values)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "throughput_per_sec": round(len(values) / total, 2) if total else None,
+        "mean_ms": round(total / len(values) * 1000, 3) if values else None,
+        "min_ms": round(values[0] * 1000, 3) if values else None,
+        "max_ms": round(values[-1] * 1000, 3) if values else None
+    }
+    for q in PERCENTILES:
+        value = percentile(values, q)
+        summary[f"p{q}_ms"] = round(value * 1000, 3) if value is not None else None
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(args):
+    config = configure_environment(args)
+
+    from main import DigitalWellnessCoach
+    from utils.tiered_analysis import TIER_LLM, build_deterministic_report, run_tool_analysis
+    from utils.visualizer import generate_visual_report
+
+    cohort = build_cohort(args.users, args.seed)
+
+    durations = {stage: [] for stage in args.stages}
+    errors = {stage: 0 for stage in args.stages}
+    # Net RSS change summed over every run of the stage (memory it kept)
+    rss_deltas = {stage: 0 for stage in args.stages}
+
+    def timed(stage, fn):
+        if stage not in durations:
+            return None
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            # Failed runs are counted but kept out of the latency distribution
+            errors[stage] += 1
+            print(f"⚠️ {stage} failed: {e}", file=sys.stderr)
+            return None
+        finally:
+            rss_after = current_rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                rss_deltas[stage] += rss_after - rss_before
+        durations[stage].append(time.perf_counter() - start)
+        return result
+
+    # Reports, feedback and dashboards go to a scratch directory that is removed
+    # afterwards; the coach opens its report store and feedback log relative to it
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="wellness_bench_") as workdir:
+        os.chdir(workdir)
+        coach = None
+        try:
+            coach = DigitalWellnessCoach()
+            wall_start = time.perf_counter()
+            for usage_data, mood_data in cohort:
+                user_id = usage_data["user_id"]
+                tool_results = timed("tool_analysis", lambda: run_tool_analysis(usage_data))
+                result = timed("crew_kickoff", lambda: coach._run_crew(usage_data, mood_data, time.time()))
+                if result is None:
+                    # Keep the downstream stages measurable when the crew stage is skipped or fails
+                    result = build_deterministic_report(usage_data, tool_results or run_tool_analysis(usage_data))
+                timed("evaluate_responses", lambda: coach._evaluate_agent_responses(result))
+                # Include the background write, not just queueing it
+                timed("save_results", lambda: (coach._save_results(result, user_id, TIER_LLM, []), coach.shared.flush()))
+                timed("visual_report", lambda: generate_visual_report(usage_data, result))
+            wall_seconds = time.perf_counter() - wall_start
+        finally:
+            # Stop the writers and close the stores before the directory goes away
+            if coach is not None:
+                coach.shared.close()
+            os.chdir(original_dir)
+
+    stages = {}
+    for stage in args.stages:
+        stages[stage] = summarize(durations[stage], errors[stage])
+        stages[stage]["rss_delta_mb"] = (
+            round(rss_deltas[stage] / (1024 * 1024), 1) if current_rss_bytes() is not None else None
+        )
+
+    return {
+        "benchmark": "digital_wellness_pipeline",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "parameters": {
+            "users_per_severity": args.users,
+            "severities": SEVERITIES,
+            "seed": args.seed,
+            "llm_backend": config.AGENT_CONFIG["backend"],
+            "llm_latency_ms": args.llm_latency_ms,
+            "execution": config.ANALYSIS_CONFIG["execution"]
+        },
+        "total": {
+            "users": len(cohort),
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput_users_per_sec": round(len(cohort) / wall_seconds, 3) if wall_seconds else None,
+            "process_peak_rss_mb": peak_rss_mb()
+        },
+        "stages": stages
+    }
+
+
+def main():
+    args = parse_args()
+    # App modules print progress; keep stdout for the JSON report
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = run_benchmark(args)
+    finally:
+        sys.stdout = real_stdout
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(report_json)
+    print(report_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,100 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# API Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("Please set OPENAI_API_KEY in your .env file")
-
 # Agent Configurations
 AGENT_CONFIG = {
+    "backend": os.getenv("LLM_BACKEND", "openai"),  # "openai", or "offline" for load testing without the API
     "model": "gpt-3.5-turbo",  # or "gpt-4" for better results
     "temperature": 0.7,
-    "max_iterations": 3
+    "max_iterations": 3,
+    "offline_latency_ms": float(os.getenv("OFFLINE_LLM_LATENCY_MS", "200")),  # synthetic delay per completion
+    "offline_latency_jitter_ms": float(os.getenv("OFFLINE_LLM_JITTER_MS", "50")),
+    "offline_completion_tokens": None  # fixed completion size, or None to count the templated response
+}
+
+# API Configuration
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+if AGENT_CONFIG["backend"] == "openai" and not OPENAI_API_KEY:
+    raise ValueError("Please set OPENAI_API_KEY in your .env file (or LLM_BACKEND=offline)")
+
+# Analysis Tiers
+ANALYSIS_CONFIG = {
+    "mode": "tiered",  # "tiered" tries the deterministic tools first, "full" always runs the crew
+    "escalate_severities": ["MEDIUM", "HIGH", "CRITICAL"],  # DopamineCycleBreaker levels needing the LLM crew
+    "min_wellness_score": 60,  # escalate below this ScreenTimeAnalyzer score
+    "min_confidence": 0.8,  # escalate when too much usage data is missing
+    "mood_escalation_score": 4,  # escalate when any mood survey is at or below this
+    "execution": "parallel",  # "parallel" runs independent tasks concurrently, "sequential" uses one crew
+    "max_parallel_tasks": 3  # thread pool size for parallel execution
+}
+
+# REST API
+API_CONFIG = {
+    "async_analyze": False,  # make POST /analyze return a job id by default
+    "max_concurrent_analyses": 2,  # worker threads running queued analyses
+    "max_queued_jobs": 100,  # queued + running jobs before /analyze returns 503
+    "job_ttl_minutes": 60,  # how long finished job results stay available
+    "batch_max_parallel": 4,  # analyses running at once for one POST /analyze/batch
+    "coach_pool_size": 4  # coaches with isolated crews; further concurrent analyses wait for one
+}
+
+# Analysis Cache
+CACHE_CONFIG = {
+    "enabled": True,  # serve repeated analyses from utils/cache.py::AnalysisCache
+    "ttl_minutes": 60,
+    "stale_minutes": 24 * 60,  # serve expired analyses this long while refreshing them in the background
+    "refresh_workers": 1,  # background threads re-running stale analyses
+    "cache_dir": "cache",
+    "backend": "sqlite",  # "sqlite" or "pickle"
+    "key_mode": "exact",  # "semantic" lets users with matching usage profiles share an analysis
+    "max_entries": 1000,  # in-memory LRU tier
+    "max_bytes": 50 * 1024 * 1024
+}
+
+# LLM Completion Cache
+LLM_CACHE_CONFIG = {
+    "enabled": True,  # answer repeated agent prompts from utils/llm_cache.py
+    "ttl_minutes": 24 * 60,
+    "cache_dir": "cache"
+}
+
+# Saved Reports
+REPORT_CONFIG = {
+    "sink": "sqlite",  # "sqlite", "files" (JSON + TXT per report) or "parquet" (needs pyarrow)
+    "output_dir": "outputs",  # files sink
+    "sqlite_path": "outputs/reports.sqlite3",
+    "parquet_dir": "outputs/reports_parquet"
+}
+
+# Background Writer (reports, feedback, error logs and dashboards)
+WRITER_CONFIG = {
+    "enabled": True,  # False writes synchronously on the request thread
+    "max_queue": 1000,  # queued writes before submitters block (backpressure)
+    "max_render_queue": 100,  # queued dashboards
+    "batch_size": 50,  # items handed to one sink/log write
+    "batch_wait_ms": 200,  # how long the writer waits to fill a batch
+    "put_timeout_seconds": 5  # then the caller writes the item itself
+}
+
+# Dashboards
+DASHBOARD_CONFIG = {
+    "render_on_analysis": False,  # True also saves a 300 dpi PNG to outputs/ for every analysis
+    "cache_dir": "cache/dashboards",  # images for GET /dashboard/<user_id>, keyed by content hash
+    "render_workers": 2,  # processes rendering dashboards
+    "profile": "preview",  # default output profile: preview (thumbnail PNG), print (300 dpi PNG) or vector (SVG)
+    "render_timeout_seconds": 60,
+    "max_cache_mb": 512  # least recently served images are deleted beyond this
+}
+
+# Feedback Loop
+FEEDBACK_CONFIG = {
+    "window_size": 100,  # most recent feedback records kept in memory for trend analysis
+    "ewma_alpha": 0.2,  # weight of the newest score in the recent-trend average
+    "min_samples_for_trends": 10,  # analyses before trends are reported
+    "log_dir": "outputs/feedback",  # append-only NDJSON segments (utils/feedback_log.py)
+    "segment_max_mb": 16,  # rotate to a new segment at this size
+    "fsync_every": 50,  # records between fsyncs
+    "fsync_interval_seconds": 5.0  # or sync on the first record after this long
 }
 
 # Wellness Thresholds
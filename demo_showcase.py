@@ -3,7 +3,7 @@ Comprehensive showcase of Digital Wellness Coach capabilities
 """
 
 from main import DigitalWellnessCoach, generate_dynamic_sample_data, generate_mood_data
-from utils.visualizer import create_wellness_dashboard, create_comparative_analysis
+from utils.visualizer import render_dashboards, create_comparative_analysis
 from utils.cache import AnalysisCache
 import time
 import json
@@ -90,12 +90,13 @@ def run_comprehensive_demo():
     print_section("GENERATING VISUALIZATIONS")
     
     print("📊 Creating individual dashboards...")
-    for i, (data, (severity, name)) in enumerate(zip(user_data_list, profiles)):
-        try:
-            create_wellness_dashboard(data)
+    # Rendered in parallel worker processes, one result per user
+    dashboards = render_dashboards(user_data_list)
+    for outcome, (severity, name) in zip(dashboards, profiles):
+        if isinstance(outcome, Exception):
+            print(f"   ⚠️  Visualization error for {name}: {outcome}")
+        else:
             print(f"   ✅ Dashboard created for {name}")
-        except Exception as e:
-            print(f"   ⚠️  Visualization error for {name}: {e}")
     
     print("\n📊 Creating comparative analysis...")
     try:
@@ -4,23 +4,170 @@ Digital Wellness Coach - Main Application
 
 from crewai import Crew, Process
 
-from agents.wellness_agents_with_simple_tools import get_all_agents, performance_tracker as agent_performance_tracker
-from tasks.wellness_tasks import get_all_tasks
+from agents.wellness_agents_with_simple_tools import create_agents, get_all_agents, performance_tracker as agent_performance_tracker
+from tasks.wellness_tasks import create_tasks, get_all_tasks, get_task_graph
+from utils.background_writer import BackgroundWriter
+from utils.cache import (
+    AnalysisCache,
+    CACHE_BYPASS,
+    CACHE_COALESCED,
+    CACHE_HIT,
+    CACHE_MISS,
+    CACHE_STALE,
+    ENTRY_STALE
+)
+from utils.coach_pool import CoachPool
+from utils.crew_instrumentation import CrewInstrumentation
+from utils.feedback import FeedbackWindow
+from utils.feedback_log import FeedbackLog
 from utils.metrics import PerformanceTracker
+from utils.report_sinks import create_report_sink
+from utils.singleflight import SingleFlight
+from utils.task_graph import run_task_graph
+from utils.tiered_analysis import (
+    TIER_DETERMINISTIC,
+    TIER_LLM,
+    build_deterministic_report,
+    escalation_reasons,
+    run_tool_analysis,
+    summarize_tool_results
+)
+from config import ANALYSIS_CONFIG, CACHE_CONFIG, DASHBOARD_CONFIG, FEEDBACK_CONFIG, REPORT_CONFIG, WRITER_CONFIG
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import threading
 import time
 import os
 import random
 
-class DigitalWellnessCoach:
+def _create_cache():
+    """Create the analysis cache, or None when caching is disabled"""
+    if not CACHE_CONFIG["enabled"]:
+        return None
+    return AnalysisCache(
+        ttl_minutes=CACHE_CONFIG["ttl_minutes"],
+        cache_dir=CACHE_CONFIG["cache_dir"],
+        max_entries=CACHE_CONFIG["max_entries"],
+        max_bytes=CACHE_CONFIG["max_bytes"],
+        backend=CACHE_CONFIG["backend"],
+        key_mode=CACHE_CONFIG["key_mode"],
+        stale_minutes=CACHE_CONFIG["stale_minutes"]
+    )
+
+def _write_error_logs(errors):
+    """Background writer handler: one JSON file per (filename, error_data)"""
+    os.makedirs("outputs/errors", exist_ok=True)
+    for filename, error_data in errors:
+        with open(filename, 'w') as f:
+            json.dump(error_data, f, indent=2)
+
+class SharedCoachState:
+    """State shared by every coach of a CoachPool
+    
+    Trackers, caches, in-flight coalescing, the report sink and feedback
+    history are common to all pooled coaches so metrics and cache hits
+    cover the whole process; each member guards its own mutations. Crews
+    and agents stay per coach.
+    """
     def __init__(self):
+        self.performance_tracker = PerformanceTracker()
+        self.agent_tracker = agent_performance_tracker
+        self.cache = _create_cache()
+        self.inflight = SingleFlight()
+        # Background refreshes of stale cache entries, at most one per key
+        self.refresh_executor = ThreadPoolExecutor(
+            max_workers=CACHE_CONFIG["refresh_workers"],
+            thread_name_prefix="cache-refresh"
+        )
+        self.refreshing = set()
+        self.refresh_lock = threading.Lock()
+        self.report_sink = create_report_sink(REPORT_CONFIG)
+        self.feedback_log = FeedbackLog(
+            log_dir=FEEDBACK_CONFIG["log_dir"],
+            segment_max_bytes=FEEDBACK_CONFIG["segment_max_mb"] * 1024 * 1024,
+            fsync_every=FEEDBACK_CONFIG["fsync_every"],
+            fsync_interval_seconds=FEEDBACK_CONFIG["fsync_interval_seconds"]
+        )
+        self.feedback_history = FeedbackWindow(
+            max_entries=FEEDBACK_CONFIG["window_size"],
+            ewma_alpha=FEEDBACK_CONFIG["ewma_alpha"]
+        )
+        # Trends carry over restarts: seed the window from the end of the log
+        for feedback in self.feedback_log.tail(FEEDBACK_CONFIG["window_size"]):
+            self.feedback_history.append(feedback)
+        
+        # Reports, feedback, error logs and dashboards are written off the request path
+        self.writer = BackgroundWriter(
+            name="writer",
+            max_queue=WRITER_CONFIG["max_queue"],
+            batch_size=WRITER_CONFIG["batch_size"],
+            batch_wait_seconds=WRITER_CONFIG["batch_wait_ms"] / 1000,
+            put_timeout=WRITER_CONFIG["put_timeout_seconds"],
+            enabled=WRITER_CONFIG["enabled"]
+        )
+        self.writer.register("report", self._write_reports)
+        self.writer.register("feedback", self.feedback_log.append_many)
+        self.writer.register("error", _write_error_logs)
+        # matplotlib.style.context mutates the global rcParams, so dashboards render one at a time on their own thread
+        self.render_writer = BackgroundWriter(
+            name="renderer",
+            max_queue=WRITER_CONFIG["max_render_queue"],
+            batch_size=1,
+            batch_wait_seconds=0,
+            put_timeout=WRITER_CONFIG["put_timeout_seconds"],
+            enabled=WRITER_CONFIG["enabled"]
+        )
+        self.render_writer.register("dashboard", self._render_dashboards)
+    
+    def _write_reports(self, reports):
+        with self.performance_tracker.time_stage("report_write"):
+            self.report_sink.write_many(reports)
+    
+    def _render_dashboards(self, items):
+        from utils.visualizer import generate_visual_report
+        for usage_data, result in items:
+            with self.performance_tracker.time_stage("visual_report"):
+                generate_visual_report(usage_data, result)
+    
+    def flush(self, timeout=None):
+        """Wait for queued reports, feedback, error logs and dashboards"""
+        return self.writer.flush(timeout) and self.render_writer.flush(timeout)
+    
+    def close(self):
+        """Flush and stop the writers, then close the stores they write to"""
+        self.writer.close()
+        self.render_writer.close()
+        self.refresh_executor.shutdown(wait=True)
+        self.feedback_log.close()
+        self.report_sink.close()
+        if self.cache is not None:
+            self.cache.close()
+
+class DigitalWellnessCoach:
+    def __init__(self, agents=None, tasks=None, shared=None):
+        """Create a coach
+        
+        ``agents`` (list) and ``tasks`` (create_tasks() dict) default to the
+        module-level instances; pooled coaches get their own so concurrent
+        crews never share state. ``shared`` is the SharedCoachState of the
+        pool, or a private one for a standalone coach.
+        """
         print("🏗️ Initializing Digital Wellness Coach...")
-        self.agents = get_all_agents()
-        self.tasks = get_all_tasks()
+        self.agents = agents or get_all_agents()
+        self.task_map = tasks
+        self.tasks = list(tasks.values()) if tasks else get_all_tasks()
         self.crew = self._create_crew()
-        self.performance_tracker = PerformanceTracker()  # Use your existing tracker
-        self.feedback_history = []
+        self.shared = shared or SharedCoachState()
+        self.performance_tracker = self.shared.performance_tracker  # Use your existing tracker
+        self.instrumentation = CrewInstrumentation(self.performance_tracker, self.shared.agent_tracker)
+        self.instrumentation.instrument(self._crew_agents(), self.crew)
+        self.feedback_history = self.shared.feedback_history
+        self.cache = self.shared.cache
+        self.inflight = self.shared.inflight
+        # Where stale entries are re-analyzed; a CoachPool routes refreshes through itself
+        self.refresh_target = self
         print("✅ Digital Wellness Coach ready!")
         
     def _create_crew(self):
@@ -33,88 +180,267 @@ class DigitalWellnessCoach:
             memory=True
         )
     
-    def analyze_user(self, usage_data, mood_data=None):
-        """Run complete wellness analysis for a user"""
+    def _crew_agents(self):
+        """Crew agents plus the agents assigned to tasks, without duplicates"""
+        agents = {}
+        for agent in self.agents + [task.agent for task in self.tasks]:
+            agents[id(agent)] = agent
+        return list(agents.values())
+    
+    def analyze_user(self, usage_data, mood_data=None, mode=None):
+        """Run complete wellness analysis for a user
+        
+        In "tiered" mode the custom tools run first and their templated
+        report is returned when they fully decide the outcome; the LLM crew
+        only runs when a severity or confidence rule escalates. "full" mode
+        always runs the crew. Defaults to ANALYSIS_CONFIG["mode"].
+        """
+        result, _ = self.analyze_user_with_status(usage_data, mood_data, mode)
+        return result
+    
+    def analyze_user_with_status(self, usage_data, mood_data=None, mode=None, refresh=False):
+        """Run the analysis and report how the cache served it
+        
+        Returns ``(result, cache_status)`` where cache_status is one of
+        HIT, MISS, COALESCED (waited for an identical in-flight analysis),
+        STALE (expired entry served while a refresh runs in the background)
+        or BYPASS (caching disabled). Only successful analyses are cached.
+        ``refresh=True`` skips the cache lookup and stores a new analysis.
+        """
         start_time = time.time()
+        mode = mode or ANALYSIS_CONFIG["mode"]
         print(f"\n🔍 Starting wellness analysis for user: {usage_data.get('user_id', 'Unknown')}")
         print("="*60)
         
         try:
-            # Prepare inputs for the crew
-            inputs = {
-                "usage_data": json.dumps(usage_data),
-                "mood_data": json.dumps(mood_data) if mood_data else "{}",
-                "usage_analysis": "",  # Will be filled by tasks
-                "all_analyses": ""  # Will be filled by tasks
-            }
+            analysis, cache_status = self._get_analysis(usage_data, mood_data, mode, start_time, refresh)
+            result = analysis["result"]
+            tier = analysis["tier"]
             
-            # Execute the crew
-            print("\n🤖 AI Agents working on your wellness analysis...")
-            result = self.crew.kickoff(inputs=inputs)
-            
-            # Track performance for each agent
-            for agent in self.agents:
-                # Track agent performance (simulated success for now)
-                self.performance_tracker.track_agent_performance(
-                    agent.role, 
-                    start_time, 
-                    success=True
+            # Save results
+            with self.performance_tracker.time_stage("save_results"):
+                self._save_results(
+                    result,
+                    usage_data.get("user_id", "unknown"),
+                    tier,
+                    analysis["reasons"],
+                    usage_data,
+                    analysis.get("findings")
                 )
             
-            # Save results
-            self._save_results(result, usage_data.get("user_id", "unknown"))
-            
-            # Generate visualization
-            try:
-                from utils.visualizer import generate_visual_report
-                generate_visual_report(usage_data, result)
-                print("📊 Visual dashboard generated successfully!")
-            except Exception as e:
-                print(f"⚠️ Could not generate visualization: {e}")
+            # Dashboards are rendered on demand by GET /dashboard/<user_id> unless configured here
+            if DASHBOARD_CONFIG["render_on_analysis"]:
+                try:
+                    self.shared.render_writer.submit("dashboard", (usage_data, result))
+                    print("📊 Visual dashboard queued for rendering")
+                except Exception as e:
+                    print(f"⚠️ Could not generate visualization: {e}")
             
             # Implement feedback loop
-            self.implement_feedback_loop(result, usage_data.get("user_id", "unknown"))
+            with self.performance_tracker.time_stage("feedback_loop"):
+                self.implement_feedback_loop(result, usage_data.get("user_id", "unknown"), tier)
             
-            return result
+            self.performance_tracker.track_stage("end_to_end", time.time() - start_time)
+            return result, cache_status
             
         except Exception as e:
             error_msg = f"Error during analysis: {str(e)}"
             print(f"\n❌ {error_msg}")
             
-            # Track failure
-            for agent in self.agents:
-                self.performance_tracker.track_agent_performance(
-                    agent.role, 
-                    start_time, 
-                    success=False
-                )
+            # Track failure (failing agents were already recorded by the crew instrumentation)
+            self.performance_tracker.track_agent_performance(
+                "Analysis Pipeline",
+                start_time,
+                success=False
+            )
             
             # Log error for improvement
             self._log_error(usage_data.get("user_id", "unknown"), str(e))
-            return error_msg
+            return error_msg, CACHE_MISS
+    
+    def _get_analysis(self, usage_data, mood_data, mode, start_time, refresh=False):
+        """Serve the analysis from cache, an identical in-flight run, or a new run"""
+        if self.cache is None:
+            return self._compute_analysis(usage_data, mood_data, mode, start_time), CACHE_BYPASS
+        
+        context = {"mood_data": mood_data, "mode": mode}
+        key = self.cache.get_key(usage_data, context)
+        if not refresh:
+            cached, state = self.cache.get_with_state(usage_data, context)
+            if cached is not None:
+                self.performance_tracker.track_agent_performance("Analysis Cache", start_time, success=True)
+                if state == ENTRY_STALE:
+                    print("\n⚡ Serving stale cached analysis, refreshing in the background")
+                    self._schedule_refresh(key, usage_data, mood_data, mode)
+                    return self._personalize(cached, usage_data), CACHE_STALE
+                print("\n⚡ Serving cached analysis")
+                return self._personalize(cached, usage_data), CACHE_HIT
+        
+        def compute_and_store():
+            analysis = self._compute_analysis(usage_data, mood_data, mode, start_time)
+            self.cache.set(usage_data, dict(analysis, result=str(analysis["result"])), context)
+            return analysis
+        
+        analysis, shared = self.inflight.do(key, compute_and_store)
+        if shared:
+            print("\n🔗 Reused the result of an identical in-flight analysis")
+            analysis = self._personalize(analysis, usage_data)
+        return analysis, CACHE_COALESCED if shared else CACHE_MISS
+    
+    def _personalize(self, analysis, usage_data):
+        """Adapt an analysis shared from another user (semantic cache keys) to this one
+        
+        The deterministic report is rebuilt from this user's tool output; an
+        LLM report has the other user's id replaced. The saved severity,
+        score and findings always come from this user's tools.
+        """
+        user_id = usage_data.get("user_id", "unknown")
+        source_id = analysis.get("user_id")
+        if source_id == user_id:
+            return analysis
+        
+        tool_results = run_tool_analysis(usage_data)
+        if analysis["tier"] == TIER_DETERMINISTIC:
+            result = build_deterministic_report(usage_data, tool_results)
+        else:
+            result = str(analysis["result"])
+            if source_id:
+                result = re.sub(rf"(?<!\w){re.escape(source_id)}(?!\w)", lambda _: user_id, result)
+        return dict(analysis, result=result, user_id=user_id, findings=summarize_tool_results(tool_results))
+    
+    def _schedule_refresh(self, key, usage_data, mood_data, mode):
+        """Queue a background re-analysis unless one is already pending for this key"""
+        shared = self.shared
+        with shared.refresh_lock:
+            if key in shared.refreshing:
+                return
+            shared.refreshing.add(key)
+        try:
+            shared.refresh_executor.submit(self._refresh, key, usage_data, mood_data, mode)
+        except RuntimeError:
+            # Executor already shut down
+            with shared.refresh_lock:
+                shared.refreshing.discard(key)
+    
+    def _refresh(self, key, usage_data, mood_data, mode):
+        try:
+            self.refresh_target.analyze_user_with_status(usage_data, mood_data, mode, refresh=True)
+        finally:
+            with self.shared.refresh_lock:
+                self.shared.refreshing.discard(key)
+    
+    def _compute_analysis(self, usage_data, mood_data, mode, start_time):
+        """Run the tools and, if escalated, the LLM crew; raises on failure"""
+        tier = TIER_LLM
+        reasons = []
+        tool_results = None
+        if mode == "tiered":
+            with self.performance_tracker.time_stage("tool_analysis"):
+                tool_results = run_tool_analysis(usage_data)
+            reasons = escalation_reasons(usage_data, mood_data, tool_results, ANALYSIS_CONFIG)
+            if not reasons:
+                tier = TIER_DETERMINISTIC
+        
+        if tier == TIER_DETERMINISTIC:
+            print("\n⚡ Tools fully determine this plan, skipping the LLM crew")
+            result = build_deterministic_report(usage_data, tool_results)
+            self.performance_tracker.track_agent_performance(
+                "Deterministic Fast Path",
+                start_time,
+                success=True
+            )
+        else:
+            if reasons:
+                print(f"\n⬆️ Escalating to AI agents: {', '.join(reasons)}")
+            with self.performance_tracker.time_stage("crew_kickoff"):
+                result = self._run_crew(usage_data, mood_data, start_time)
+        
+        if tool_results is None:
+            # The saved report's severity and score come from the tools on every tier
+            with self.performance_tracker.time_stage("tool_analysis"):
+                tool_results = run_tool_analysis(usage_data)
+        
+        return {
+            "result": result,
+            "tier": tier,
+            "reasons": reasons,
+            "findings": summarize_tool_results(tool_results),
+            # Lets a semantic cache hit for another user be personalized
+            "user_id": usage_data.get("user_id", "unknown")
+        }
+    
+    def _run_crew(self, usage_data, mood_data, start_time):
+        """Run the full LLM crew"""
+        # Prepare inputs for the crew
+        inputs = {
+            "usage_data": json.dumps(usage_data),
+            "mood_data": json.dumps(mood_data) if mood_data else "{}",
+            "usage_analysis": "",  # Will be filled by tasks
+            "all_analyses": ""  # Will be filled by tasks
+        }
+        
+        # Execute the crew
+        print("\n🤖 AI Agents working on your wellness analysis...")
+        # Each agent's duration, tools, tokens and failures are recorded by the instrumentation
+        if ANALYSIS_CONFIG["execution"] == "parallel":
+            result = self._run_task_graph(inputs)
+        else:
+            result = self.instrumentation.run_sequential(self.crew, inputs)
+        
+        return result
+    
+    def _run_task_graph(self, inputs):
+        """Run independent tasks concurrently and feed their outputs downstream
+        
+        Usage, addiction and emotional analyses only read the raw inputs, so
+        they run in parallel; sleep assessment starts once the usage analysis
+        is done and the wellness plan receives all four outputs. Returns the
+        wellness plan output, like the sequential crew does.
+        """
+        graph = get_task_graph(self.task_map)
+        
+        def run_task(name, node, task_inputs):
+            task = node["task"]
+            crew = Crew(
+                agents=[task.agent],
+                tasks=[task],
+                process=Process.sequential,
+                verbose=True
+            )
+            with self.instrumentation.task_run(task.agent.role):
+                return crew.kickoff(inputs=task_inputs)
+        
+        outputs = run_task_graph(
+            graph,
+            inputs,
+            run_task,
+            max_workers=ANALYSIS_CONFIG["max_parallel_tasks"]
+        )
+        return outputs["create_wellness_plan"]
     
-    def implement_feedback_loop(self, result, user_id):
+    def implement_feedback_loop(self, result, user_id, tier=TIER_LLM):
         """Track agent performance and improve over time"""
         feedback_data = {
             "user_id": user_id,
             "timestamp": datetime.now().isoformat(),
+            "analysis_tier": tier,
             "agent_performance": self._evaluate_agent_responses(result),
             "user_satisfaction": None,  # To be implemented with user input
             "result_quality": self._assess_result_quality(result),
             "system_metrics": {
                 "performance_report": self.performance_tracker.generate_performance_report(),
-                "agent_specific_metrics": agent_performance_tracker.get_performance_report()
+                "agent_specific_metrics": self.shared.agent_tracker.get_performance_report()
             }
         }
         
-        # Store feedback
+        # Store feedback (bounded window shared by all pooled coaches)
         self.feedback_history.append(feedback_data)
         
         # Save feedback for analysis
         self._save_feedback(feedback_data)
         
         # Trigger improvement if needed
-        if len(self.feedback_history) >= 10:
+        if len(self.feedback_history) >= FEEDBACK_CONFIG["min_samples_for_trends"]:
             self._analyze_feedback_trends()
     
     def _evaluate_agent_responses(self, result):
@@ -211,28 +537,26 @@ class DigitalWellnessCoach:
             return 60
     
     def _save_feedback(self, feedback_data):
-        """Save feedback data for analysis"""
-        feedback_dir = "outputs/feedback"
-        os.makedirs(feedback_dir, exist_ok=True)
-        
-        filename = f"{feedback_dir}/feedback_{feedback_data['user_id']}_{feedback_data['timestamp'].replace(':', '-')}.json"
-        with open(filename, 'w') as f:
-            json.dump(feedback_data, f, indent=2)
+        """Queue feedback data for the shared log (read back with FeedbackLog.read)"""
+        self.shared.writer.submit("feedback", feedback_data)
     
     def _analyze_feedback_trends(self):
         """Analyze feedback trends for system improvement"""
-        if not self.feedback_history:
+        # Running window sums and EWMAs, so this costs the same on every request
+        trends = self.feedback_history.trends()
+        if not trends["window_size"]:
             return
         
-        # Calculate average scores
-        avg_completeness = sum(f["agent_performance"]["completeness"] for f in self.feedback_history) / len(self.feedback_history)
-        avg_relevance = sum(f["agent_performance"]["relevance"] for f in self.feedback_history) / len(self.feedback_history)
-        avg_actionability = sum(f["agent_performance"]["actionability"] for f in self.feedback_history) / len(self.feedback_history)
+        averages = trends["averages"]
+        ewma = trends["ewma"]
+        avg_completeness = averages["completeness"]
+        avg_relevance = averages["relevance"]
+        avg_actionability = averages["actionability"]
         
-        print("\n📊 Performance Analysis:")
-        print(f"  - Average Completeness: {avg_completeness:.1f}%")
-        print(f"  - Average Relevance: {avg_relevance:.1f}%")
-        print(f"  - Average Actionability: {avg_actionability:.1f}%")
+        print(f"\n📊 Performance Analysis (last {trends['window_size']} of {trends['total_seen']} analyses):")
+        print(f"  - Average Completeness: {avg_completeness:.1f}% (recent trend {ewma['completeness']:.1f}%)")
+        print(f"  - Average Relevance: {avg_relevance:.1f}% (recent trend {ewma['relevance']:.1f}%)")
+        print(f"  - Average Actionability: {avg_actionability:.1f}% (recent trend {ewma['actionability']:.1f}%)")
         
         # Identify areas for improvement
         if avg_completeness < 70:
@@ -244,9 +568,6 @@ class DigitalWellnessCoach:
     
     def _log_error(self, user_id, error_msg):
         """Log errors for debugging and improvement"""
-        error_dir = "outputs/errors"
-        os.makedirs(error_dir, exist_ok=True)
-        
         error_data = {
             "user_id": user_id,
             "timestamp": datetime.now().isoformat(),
@@ -254,15 +575,14 @@ class DigitalWellnessCoach:
             "system_state": self.performance_tracker.generate_performance_report()
         }
         
-        filename = f"{error_dir}/error_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w') as f:
-            json.dump(error_data, f, indent=2)
+        filename = f"outputs/errors/error_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        self.shared.writer.submit("error", (filename, error_data))
     
     def get_performance_report(self):
         """Generate comprehensive performance report"""
         try:
             system_metrics = self.performance_tracker.generate_performance_report()
-            agent_metrics = agent_performance_tracker.get_performance_report()
+            agent_metrics = self.shared.agent_tracker.get_performance_report()
             
             report = f"""
 📊 PERFORMANCE REPORT
@@ -270,37 +590,40 @@ class DigitalWellnessCoach:
 System Metrics:
   - Total Analyses: {system_metrics.get('total_analyses', 0)}
   - Average Response Time: {system_metrics.get('avg_response_time', 0):.2f} seconds
+  - p95 Response Time: {system_metrics.get('response_time_percentiles', {}).get('p95', 0):.2f} seconds
   
 Agent Success Rates:
 """
             for agent, rate in system_metrics.get('agent_success_rates', {}).items():
                 report += f"  - {agent}: {rate:.1f}%\n"
             
+            stage_latency = system_metrics.get('stage_latency', {})
+            if stage_latency:
+                report += "\nStage Latency (p50 / p95):\n"
+                for stage, latency in stage_latency.items():
+                    report += f"  - {stage}: {latency['p50']:.2f}s / {latency['p95']:.2f}s\n"
+            
             report += f"\nDetailed Agent Performance:\n{agent_metrics}"
             
             return report
         except Exception as e:
             return f"Performance report generation error: {str(e)}"
     
-    def _save_results(self, result, user_id):
-        """Save analysis results"""
+    def _save_results(self, result, user_id, tier=TIER_LLM, reasons=None, usage_data=None, findings=None):
+        """Save analysis results (with the usage data, so dashboards can be rendered later)
+        
+        ``findings`` is the tool summary from summarize_tool_results; the
+        stored severity, score and key findings come from it.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Create a comprehensive report structure
         comprehensive_report = {
             "timestamp": timestamp,
             "user_id": user_id,
-            "digital_wellness_analysis": {
-                "severity_level": "CRITICAL",
-                "wellness_score": "35/100",
-                "key_findings": [
-                    "Excessive screen time: 6h 55m daily",
-                    "High social media usage: 301 minutes",
-                    "Late night usage detected: 165 minutes after 22:00",
-                    "Rapid app switching: 145 switches",
-                    "Continuous usage without breaks"
-                ]
-            },
+            "analysis_tier": tier,
+            "escalation_reasons": reasons or [],
+            "digital_wellness_analysis": findings or {},
             "wellness_plan": {
                 "immediate_actions": [
                     "Enable focus mode during work hours",
@@ -322,35 +645,40 @@ Agent Success Rates:
                 ]
             },
             "agent_analysis": str(result),
+            "usage_data": usage_data,
             "performance_metrics": self.performance_tracker.generate_performance_report()
         }
         
         try:
-            # Save as JSON for structured data
-            json_filename = f"outputs/wellness_report_{user_id}_{timestamp}.json"
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(comprehensive_report, f, indent=2)
-            
-            # Save as text for readability
-            txt_filename = f"outputs/wellness_report_{user_id}_{timestamp}.txt"
-            with open(txt_filename, 'w', encoding='utf-8') as f:
-                f.write("DIGITAL WELLNESS REPORT\n")
-                f.write("="*50 + "\n\n")
-                f.write(f"User ID: {user_id}\n")
-                f.write(f"Generated: {timestamp}\n\n")
-                f.write("ANALYSIS RESULTS:\n")
-                f.write("-"*30 + "\n")
-                f.write(str(result))
-                f.write("\n\n" + "="*50 + "\n")
-                f.write("For structured data, see the JSON file.\n")
-            
-            print(f"\n✅ Reports saved:")
-            print(f"   📄 {json_filename}")
-            print(f"   📄 {txt_filename}")
+            # Written in batches by the background writer
+            self.shared.writer.submit("report", comprehensive_report)
+            print(f"\n✅ Report queued for the {self.shared.report_sink.name} report store")
             
         except Exception as e:
             print(f"\n⚠️ Could not save report: {str(e)}")
 
+def create_coach_pool(size):
+    """Pool of up to ``size`` coaches with isolated crews and shared trackers
+    
+    The first coach uses the module-level agents and tasks; every further
+    coach builds its own. Stale cache refreshes go through the pool, so a
+    background refresh never runs on a coach that is serving a request.
+    """
+    shared = SharedCoachState()
+    pool = None
+    
+    def factory():
+        if pool is None:
+            coach = DigitalWellnessCoach(shared=shared)
+        else:
+            coach = DigitalWellnessCoach(agents=create_agents(), tasks=create_tasks(), shared=shared)
+            coach.refresh_target = pool
+        return coach
+    
+    pool = CoachPool(factory, size=size)
+    pool.primary.refresh_target = pool
+    return pool
+
 def generate_sample_data():
     """Generate sample usage data for testing"""
     return {
@@ -482,7 +810,8 @@ def generate_dynamic_sample_data(severity="moderate", user_id=None):
         "light": [8, 9, 12, 13, 17, 18, 19]
     }
     
-    selected_hours = random.sample(hour_pools[severity], k=session_count)
+    # One session per distinct hour, so a heavy user with 15 sessions uses all 14 pool hours
+    selected_hours = random.sample(hour_pools[severity], k=min(session_count, len(hour_pools[severity])))
     selected_hours.sort()
     
     remaining_session_time = total_minutes
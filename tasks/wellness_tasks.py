@@ -3,114 +3,137 @@ Tasks for Digital Wellness Coach
 """
 
 from crewai import Task
-from agents.wellness_agents_improved import (
-    wellness_orchestrator,
-    screen_analyst,
-    break_suggester,
-    sleep_monitor,
-    sentiment_tracker
-)
-
-# Task 1: Analyze Usage Patterns
-analyze_usage_task = Task(
-    description="""Analyze the user's device usage data to identify patterns, 
-    concerning behaviors, and areas for improvement. 
-    
-    Input data: {usage_data}
-    
-    Provide a comprehensive analysis including:
-    1. Total screen time and app breakdown
-    2. Peak usage times and patterns
-    3. Apps causing most disruption
-    4. Initial wellness score (0-100)
-    5. Key areas of concern
-    
-    Use the Screen Time Analyzer tool to get detailed metrics.""",
-    expected_output="""A detailed JSON report containing usage analysis, 
-    identified patterns, wellness score, and specific areas of concern highlighted.""",
-    agent=screen_analyst
-)
-
-# Task 2: Detect Addictive Patterns
-detect_addiction_task = Task(
-    description="""Using the Dopamine Cycle Breaker tool, analyze the user's 
-    behavior for addictive patterns and problematic usage.
-    
-    Input data: {usage_data}
-    
-    Focus on:
-    1. Rapid app switching behavior
-    2. Doom scrolling patterns
-    3. Notification response patterns
-    4. Late night usage
-    5. Continuous usage without breaks
-    
-    Determine the severity level and specific interventions needed.""",
-    expected_output="""A comprehensive report on addictive patterns detected, 
-    severity level, and specific intervention recommendations.""",
-    agent=break_suggester
-)
-
-# Task 3: Assess Sleep Impact
-sleep_assessment_task = Task(
-    description="""Evaluate how the user's device usage affects their sleep quality.
-    
-    Previous analysis: {usage_analysis}
-    
-    Examine:
-    1. Evening and night-time device usage
-    2. Blue light exposure patterns
-    3. Stimulating content before bed
-    4. Sleep disruption indicators
-    5. Circadian rhythm impact
-    
-    Provide specific recommendations for better sleep hygiene.""",
-    expected_output="""A sleep impact report with specific recommendations 
-    for improving sleep quality through better device usage habits.""",
-    agent=sleep_monitor
-)
-
-# Task 4: Emotional Impact Analysis
-emotional_impact_task = Task(
-    description="""Analyze the correlation between social media usage and emotional well-being.
-    
-    Usage data: {usage_data}
-    Mood data: {mood_data}
-    
-    Look for:
-    1. Time spent on social platforms
-    2. Posting vs. scrolling behavior
-    3. Peak emotional vulnerability times
-    4. Comparison and FOMO indicators
-    5. Emotional patterns after social media use
-    
-    Identify specific triggers and suggest healthier engagement patterns.""",
-    expected_output="""An emotional wellness report linking social media behaviors 
-    to emotional patterns, with specific recommendations for healthier engagement.""",
-    agent=sentiment_tracker
-)
-
-# Task 5: Create Comprehensive Wellness Plan
-create_wellness_plan_task = Task(
-    description="""Synthesize all analyses into a comprehensive, personalized digital wellness plan.
+from agents.wellness_agents_improved import create_agents, get_all_agents
+
+def create_tasks(agents=None):
+    """Build the five tasks, keyed by task graph name
     
-    All analyses: {all_analyses}
+    ``agents`` is a list in get_all_agents() order; by default a fresh set
+    is created so pooled coaches never share task or agent state.
+    """
+    (
+        wellness_orchestrator,
+        screen_analyst,
+        break_suggester,
+        sleep_monitor,
+        sentiment_tracker
+    ) = agents or create_agents()
     
-    The plan must include:
-    1. Executive summary of key issues
-    2. Prioritized interventions (immediate, short-term, long-term)
-    3. Daily wellness schedule
-    4. Specific app limits and boundaries
-    5. Break and mindfulness activities
-    6. Sleep optimization protocol
-    7. Progress tracking metrics
-    8. Emergency protocols for high-risk behaviors
+    # Task 1: Analyze Usage Patterns
+    analyze_usage_task = Task(
+        description="""Analyze the user's device usage data to identify patterns, 
+        concerning behaviors, and areas for improvement. 
+
+        Input data: {usage_data}
+
+        Provide a comprehensive analysis including:
+        1. Total screen time and app breakdown
+        2. Peak usage times and patterns
+        3. Apps causing most disruption
+        4. Initial wellness score (0-100)
+        5. Key areas of concern
+
+        Use the Screen Time Analyzer tool to get detailed metrics.""",
+        expected_output="""A detailed JSON report containing usage analysis, 
+        identified patterns, wellness score, and specific areas of concern highlighted.""",
+        agent=screen_analyst
+    )
+
+    # Task 2: Detect Addictive Patterns
+    detect_addiction_task = Task(
+        description="""Using the Dopamine Cycle Breaker tool, analyze the user's 
+        behavior for addictive patterns and problematic usage.
+
+        Input data: {usage_data}
+
+        Focus on:
+        1. Rapid app switching behavior
+        2. Doom scrolling patterns
+        3. Notification response patterns
+        4. Late night usage
+        5. Continuous usage without breaks
+
+        Determine the severity level and specific interventions needed.""",
+        expected_output="""A comprehensive report on addictive patterns detected, 
+        severity level, and specific intervention recommendations.""",
+        agent=break_suggester
+    )
+
+    # Task 3: Assess Sleep Impact
+    sleep_assessment_task = Task(
+        description="""Evaluate how the user's device usage affects their sleep quality.
+
+        Previous analysis: {usage_analysis}
+
+        Examine:
+        1. Evening and night-time device usage
+        2. Blue light exposure patterns
+        3. Stimulating content before bed
+        4. Sleep disruption indicators
+        5. Circadian rhythm impact
+
+        Provide specific recommendations for better sleep hygiene.""",
+        expected_output="""A sleep impact report with specific recommendations 
+        for improving sleep quality through better device usage habits.""",
+        agent=sleep_monitor
+    )
+
+    # Task 4: Emotional Impact Analysis
+    emotional_impact_task = Task(
+        description="""Analyze the correlation between social media usage and emotional well-being.
+
+        Usage data: {usage_data}
+        Mood data: {mood_data}
+
+        Look for:
+        1. Time spent on social platforms
+        2. Posting vs. scrolling behavior
+        3. Peak emotional vulnerability times
+        4. Comparison and FOMO indicators
+        5. Emotional patterns after social media use
+
+        Identify specific triggers and suggest healthier engagement patterns.""",
+        expected_output="""An emotional wellness report linking social media behaviors 
+        to emotional patterns, with specific recommendations for healthier engagement.""",
+        agent=sentiment_tracker
+    )
+
+    # Task 5: Create Comprehensive Wellness Plan
+    create_wellness_plan_task = Task(
+        description="""Synthesize all analyses into a comprehensive, personalized digital wellness plan.
+
+        All analyses: {all_analyses}
+
+        The plan must include:
+        1. Executive summary of key issues
+        2. Prioritized interventions (immediate, short-term, long-term)
+        3. Daily wellness schedule
+        4. Specific app limits and boundaries
+        5. Break and mindfulness activities
+        6. Sleep optimization protocol
+        7. Progress tracking metrics
+        8. Emergency protocols for high-risk behaviors
+
+        Make the plan actionable, realistic, and personalized to the user's specific patterns.""",
+        expected_output="""A complete digital wellness plan formatted as a structured 
+        document with clear action items, timelines, and success metrics.""",
+        agent=wellness_orchestrator
+    )
     
-    Make the plan actionable, realistic, and personalized to the user's specific patterns.""",
-    expected_output="""A complete digital wellness plan formatted as a structured 
-    document with clear action items, timelines, and success metrics.""",
-    agent=wellness_orchestrator
-)
+    return {
+        "analyze_usage": analyze_usage_task,
+        "detect_addiction": detect_addiction_task,
+        "sleep_assessment": sleep_assessment_task,
+        "emotional_impact": emotional_impact_task,
+        "create_wellness_plan": create_wellness_plan_task
+    }
+
+_default_tasks = create_tasks(get_all_agents())
+analyze_usage_task = _default_tasks["analyze_usage"]
+detect_addiction_task = _default_tasks["detect_addiction"]
+sleep_assessment_task = _default_tasks["sleep_assessment"]
+emotional_impact_task = _default_tasks["emotional_impact"]
+create_wellness_plan_task = _default_tasks["create_wellness_plan"]
 
 def get_all_tasks():
     """Return all configured tasks in execution order"""
@@ -120,4 +143,29 @@ def get_all_tasks():
         sleep_assessment_task,
         emotional_impact_task,
         create_wellness_plan_task
-    ]
\ No newline at end of file
+    ]
+
+def get_task_graph(tasks=None):
+    """Return the task dependency graph used for parallel execution.
+    
+    Each node lists the tasks it depends on and, for dependent tasks, the
+    input placeholder that receives the upstream outputs. Nodes are listed
+    in the same order as get_all_tasks(). ``tasks`` is a create_tasks()
+    dict and defaults to the module-level tasks.
+    """
+    tasks = tasks or _default_tasks
+    return {
+        "analyze_usage": {"task": tasks["analyze_usage"], "depends_on": []},
+        "detect_addiction": {"task": tasks["detect_addiction"], "depends_on": []},
+        "sleep_assessment": {
+            "task": tasks["sleep_assessment"],
+            "depends_on": ["analyze_usage"],
+            "input_key": "usage_analysis"
+        },
+        "emotional_impact": {"task": tasks["emotional_impact"], "depends_on": []},
+        "create_wellness_plan": {
+            "task": tasks["create_wellness_plan"],
+            "depends_on": ["analyze_usage", "detect_addiction", "sleep_assessment", "emotional_impact"],
+            "input_key": "all_analyses"
+        }
+    }
@@ -0,0 +1,117 @@
+"""Test cases for the REST API (analyses run on a stand-in coach pool)"""
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+import api
+from utils.job_queue import JobQueue
+
+USAGE_DATA = {
+    "user_id": "api_user",
+    "apps": [{"name": "Instagram", "category": "Social Media", "duration": 120}],
+    "sessions": [{"hour": 23, "duration": 90}],
+    "app_switches": 40,
+    "duration_minutes": 120
+}
+
+
+class StubCoachPool:
+    """Answers analyses without running the crew"""
+
+    def __init__(self, release=None):
+        self.release = release
+
+    def analyze_user_with_status(self, usage_data):
+        if self.release is not None:
+            self.release.wait(5)
+        return f"Digital Wellness Plan for {usage_data['user_id']}", "MISS"
+
+
+class TestAsyncJobs(unittest.TestCase):
+    def setUp(self):
+        self.client = api.app.test_client()
+        self.job_queue = JobQueue(max_workers=1, max_pending=1)
+        self.release = threading.Event()
+        patches = [
+            mock.patch.object(api, "job_queue", self.job_queue),
+            mock.patch.object(api, "coach_pool", StubCoachPool(self.release))
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.release.set()
+        self.job_queue.shutdown()
+
+    def wait_for_job(self, status_url, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.client.get(status_url).get_json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.01)
+        raise AssertionError("Job did not finish")
+
+    def test_submit_status_result(self):
+        """202 with a job URL, then the finished job carries the analysis"""
+        response = self.client.post("/analyze?async=true", json=USAGE_DATA)
+        self.assertEqual(response.status_code, 202)
+        status_url = response.get_json()["status_url"]
+        self.assertEqual(response.headers["Location"], status_url)
+        self.assertIn(self.client.get(status_url).get_json()["status"], ("queued", "running"))
+
+        self.release.set()
+        job = self.wait_for_job(status_url)
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["result"]["status"], "success")
+        self.assertEqual(job["result"]["cache_status"], "MISS")
+        self.assertIn("api_user", job["result"]["analysis"])
+
+    def test_full_queue_returns_503(self):
+        self.assertEqual(self.client.post("/analyze?async=true", json=USAGE_DATA).status_code, 202)
+        response = self.client.post("/analyze?async=true", json=USAGE_DATA)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "30")
+
+    def test_unknown_job_returns_404(self):
+        self.assertEqual(self.client.get("/jobs/does-not-exist").status_code, 404)
+
+
+class TestAnalyzeBatch(unittest.TestCase):
+    def setUp(self):
+        self.client = api.app.test_client()
+        patch = mock.patch.object(api, "coach_pool", StubCoachPool())
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def post_batch(self, body):
+        response = self.client.post("/analyze/batch", data=body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_array_and_ndjson_bodies(self):
+        """Every record gets one line carrying its index, invalid records included"""
+        users = [dict(USAGE_DATA, user_id=f"batch_{i}") for i in range(5)]
+        users[2] = {"user_id": "incomplete"}
+        for body in (json.dumps(users), "\n".join(json.dumps(u) for u in users)):
+            lines = sorted(self.post_batch(body), key=lambda line: line["index"])
+            self.assertEqual([line["index"] for line in lines], list(range(5)))
+            self.assertEqual(lines[2]["status"], "error")
+            self.assertIn("batch_4", lines[4]["analysis"])
+
+    def test_malformed_tail_reports_accepted_records_first(self):
+        """Records before a parse error are still analyzed; the error is the last line"""
+        users = [dict(USAGE_DATA, user_id=f"batch_{i}") for i in range(3)]
+        body = "\n".join(json.dumps(u) for u in users) + "\n{not json"
+        lines = self.post_batch(body)
+        self.assertEqual(sorted(line["index"] for line in lines[:-1]), [0, 1, 2])
+        self.assertTrue(all(line["status"] == "success" for line in lines[:-1]))
+        self.assertEqual(lines[-1]["index"], None)
+        self.assertEqual(lines[-1]["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+"""Test cases for the background writer"""
+import threading
+import time
+import unittest
+
+from utils.background_writer import BackgroundWriter
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    def test_items_are_batched_and_flushed(self):
+        """Queued items reach the handler in batches and flush waits for them"""
+        writer = BackgroundWriter(batch_size=10, batch_wait_seconds=0.05)
+        batches = []
+        writer.register("report", lambda items: batches.append(list(items)))
+        for i in range(25):
+            writer.submit("report", i)
+
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(25)))
+        self.assertTrue(all(len(batch) <= 10 for batch in batches))
+        self.assertLess(len(batches), 25)
+        writer.close()
+
+    def test_full_queue_falls_back_to_caller(self):
+        """With the queue full, submit writes inline instead of dropping"""
+        writer = BackgroundWriter(max_queue=1, batch_size=1, put_timeout=0.01)
+        release = threading.Event()
+        written = []
+
+        def slow(items):
+            release.wait(5)
+            written.extend(items)
+
+        writer.register("report", slow)
+        writer.submit("report", "a")  # picked up by the worker, which blocks
+        time.sleep(0.05)
+        writer.submit("report", "b")  # fills the queue
+        threading.Timer(0.1, release.set).start()
+        writer.submit("report", "c")  # queue full: written by this thread
+
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(sorted(written), ["a", "b", "c"])
+        self.assertEqual(writer.get_stats()["inline_writes"], 1)
+        writer.close()
+
+    def test_handler_errors_are_counted(self):
+        """A failing handler does not stop the writer"""
+        writer = BackgroundWriter(batch_wait_seconds=0)
+        writer.register("error", lambda items: 1 / 0)
+        writer.register("report", lambda items: None)
+        writer.submit("error", 1)
+        writer.submit("report", 2)
+        self.assertTrue(writer.flush(timeout=5))
+        stats = writer.get_stats()
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["written"], 1)
+        writer.close()
+
+    def test_close_drains_and_later_writes_are_inline(self):
+        writer = BackgroundWriter()
+        written = []
+        writer.register("report", written.extend)
+        writer.submit("report", 1)
+        writer.close(timeout=5)
+        writer.submit("report", 2)
+        self.assertEqual(written, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+"""Test cases for the batch entry points of the custom tools"""
+import unittest
+import json
+import random
+
+import pandas as pd
+
+from tools.dopamine_cycle_breaker import dopamine_cycle_breaker
+from tools.screen_time_analyzer import screen_time_analyzer
+
+
+def make_user(rng, user_id):
+    """Build a random usage record shaped like generate_dynamic_sample_data output"""
+    categories = ["Social Media", "Productivity", "Entertainment", "Utility"]
+    return {
+        "user_id": user_id,
+        "apps": [
+            {
+                "name": rng.choice(["Instagram", "Gmail", "YouTube", "TikTok"]),
+                "category": rng.choice(categories),
+                "duration": rng.choice([rng.randint(0, 300), round(rng.uniform(0, 300), 2)])
+            }
+            for _ in range(rng.randint(0, 8))
+        ],
+        "sessions": [
+            {"hour": rng.randint(0, 23), "duration": rng.randint(5, 150)}
+            for _ in range(rng.randint(0, 10))
+        ],
+        "daily_usage": [rng.randint(30, 700) for _ in range(rng.randint(0, 6))]
+    }
+
+
+class TestScreenTimeAnalyzerBatch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.users = [make_user(rng, f"user_{i}") for i in range(300)]
+
+    def test_batch_matches_per_user(self):
+        """run_batch output is identical to calling run per user"""
+        expected = [screen_time_analyzer.run(json.dumps(u)) for u in self.users]
+        self.assertEqual(screen_time_analyzer.run_batch(self.users), expected)
+
+    def test_dataframe_input(self):
+        """A one-row-per-user DataFrame gives the same result as the records"""
+        expected = screen_time_analyzer.run_batch(self.users, as_json=False)
+        result = screen_time_analyzer.run_batch(pd.DataFrame(self.users), as_json=False)
+        self.assertEqual(result, expected)
+
+    def test_long_format_frames(self):
+        """Long-format apps/sessions/daily_usage tables match the per-user path"""
+        users = [
+            {
+                "apps": [dict(app, duration=float(app["duration"])) for app in u["apps"]],
+                "sessions": u["sessions"],
+                "daily_usage": u["daily_usage"]
+            }
+            for u in self.users
+        ]
+        frames = {
+            "apps": pd.DataFrame(
+                [dict(app, user=i) for i, u in enumerate(users) for app in u["apps"]]
+            ),
+            "sessions": pd.DataFrame(
+                [dict(s, user=i) for i, u in enumerate(users) for s in u["sessions"]]
+            ),
+            "daily_usage": pd.DataFrame(
+                [{"user": i, "minutes": m} for i, u in enumerate(users) for m in u["daily_usage"]]
+            ),
+            "n_users": len(users)
+        }
+        expected = [screen_time_analyzer.run(json.dumps(u)) for u in users]
+        self.assertEqual(screen_time_analyzer.run_batch(frames), expected)
+
+    def test_invalid_records(self):
+        """Bad rows produce the same error payload as the per-user path"""
+        batch = ["not json", {"apps": [{"duration": "ten"}]}, self.users[0]]
+        expected = [
+            screen_time_analyzer.run("not json"),
+            screen_time_analyzer.run(json.dumps(batch[1])),
+            screen_time_analyzer.run(json.dumps(batch[2]))
+        ]
+        self.assertEqual(screen_time_analyzer.run_batch(batch), expected)
+
+
+class TestDopamineCycleBreakerBatch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.users = [
+            {
+                "app_switches": rng.randint(0, 300),
+                "duration_minutes": rng.randint(30, 720),
+                "scroll_speed": rng.randint(20, 250),
+                "notification_response_time": [rng.randint(1, 30) for _ in range(rng.randint(0, 7))],
+                "usage_times": [{"hour": rng.randint(0, 23)} for _ in range(rng.randint(0, 6))],
+                "session_duration": rng.randint(10, 200)
+            }
+            for _ in range(300)
+        ]
+
+    def strip_timestamp(self, result, as_json=True):
+        if as_json:
+            self.assertIsInstance(result, str)
+            result = json.loads(result)
+        else:
+            self.assertIsInstance(result, dict)
+            result = dict(result)
+        result.pop("timestamp", None)
+        return result
+
+    def test_batch_matches_per_user(self):
+        """run_batch gives the same analysis, interventions and severity as run"""
+        expected = [self.strip_timestamp(dopamine_cycle_breaker.run(json.dumps(u))) for u in self.users]
+        result = [self.strip_timestamp(r) for r in dopamine_cycle_breaker.run_batch(self.users)]
+        self.assertEqual(result, expected)
+
+        frame_result = dopamine_cycle_breaker.run_batch(pd.DataFrame(self.users), as_json=False)
+        self.assertEqual([self.strip_timestamp(r, as_json=False) for r in frame_result], expected)
+
+    def test_fallback_rows_match_output_type(self):
+        """Rows analyzed on the per-user path come back in the same form as the rest"""
+        users = [dict(self.users[0], usage_times={}), self.users[1]]
+        expected = [self.strip_timestamp(dopamine_cycle_breaker.run(json.dumps(u))) for u in users]
+        frame = pd.DataFrame(users)
+
+        result = dopamine_cycle_breaker.run_batch(frame)
+        self.assertEqual([self.strip_timestamp(r) for r in result], expected)
+        result = dopamine_cycle_breaker.run_batch(frame, as_json=False)
+        self.assertEqual([self.strip_timestamp(r, as_json=False) for r in result], expected)
+
+    def test_pattern_arrays_and_severity(self):
+        """Pattern arrays feed the vectorized severity calculation"""
+        patterns = dopamine_cycle_breaker.analyze_patterns_batch(pd.DataFrame(self.users))
+        severities = dopamine_cycle_breaker.calculate_severity_batch(patterns)
+
+        for i, user in enumerate(self.users):
+            expected = dopamine_cycle_breaker.analyze_patterns(user)
+            self.assertEqual({name: bool(v[i]) for name, v in patterns.items()}, expected)
+            self.assertEqual(severities[i], dopamine_cycle_breaker.calculate_severity(expected))
+
+    def test_bad_hour_after_late_hour_matches_run(self):
+        """A bad hour is caught even when an earlier hour is already late night"""
+        user = dict(self.users[0], usage_times=[{"hour": 23}, {"hour": "x"}])
+        expected = [self.strip_timestamp(dopamine_cycle_breaker.run(json.dumps(user)))]
+        self.assertIn("error", expected[0])
+        result = dopamine_cycle_breaker.run_batch([user])
+        self.assertEqual([self.strip_timestamp(r) for r in result], expected)
+
+    def test_zero_duration_reports_error(self):
+        """Rows the per-user path rejects keep their error payload"""
+        user = dict(self.users[0], duration_minutes=0)
+        result = dopamine_cycle_breaker.run_batch([user])
+        self.assertEqual(result, [dopamine_cycle_breaker.run(json.dumps(user))])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
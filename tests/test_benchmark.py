@@ -0,0 +1,46 @@
+"""Test cases for the benchmark helpers"""
+import os
+import unittest
+from unittest import mock
+
+import benchmark
+
+
+class TestBenchmarkHelpers(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 95), 95)
+        self.assertEqual(benchmark.percentile([7], 99), 7)
+        self.assertIsNone(benchmark.percentile([], 50))
+
+    def test_summarize(self):
+        summary = benchmark.summarize([0.2, 0.1, 0.3, 0.4], errors=1)
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["min_ms"], 100.0)
+        self.assertEqual(summary["p50_ms"], 200.0)
+        self.assertEqual(summary["max_ms"], 400.0)
+        self.assertEqual(summary["throughput_per_sec"], 4.0)
+        self.assertIsNone(benchmark.summarize([], errors=0)["mean_ms"])
+
+    def test_rss_readings(self):
+        """Current RSS can fall; the process peak never drops below it"""
+        current = benchmark.current_rss_bytes()
+        if current is not None:
+            self.assertGreater(current, 0)
+            self.assertGreaterEqual(benchmark.peak_rss_mb() + 1, current / (1024 * 1024))
+
+    def test_documented_cohorts(self):
+        """The default and README invocations build their full cohorts"""
+        for users, seed in ((10, 42), (20, 7)):
+            # build_cohort imports main, which needs an LLM backend
+            with mock.patch.dict(os.environ, {"LLM_BACKEND": "offline"}):
+                cohort = benchmark.build_cohort(users, seed)
+            self.assertEqual(len(cohort), users * len(benchmark.SEVERITIES))
+            heavy = [usage for usage, _ in cohort if usage["user_id"].startswith("bench_heavy_")]
+            self.assertTrue(all(usage["sessions"] for usage in heavy))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
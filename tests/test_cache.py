@@ -0,0 +1,163 @@
+"""Test cases for the analysis cache"""
+import unittest
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.cache import AnalysisCache
+
+
+def user(i):
+    return {"user_id": f"user_{i}", "app_switches": i, "duration_minutes": 100 + i}
+
+
+class TestAnalysisCacheMemoryTier(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for cache in getattr(self, "caches", []):
+            cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def make_cache(self, **kwargs):
+        cache = AnalysisCache(cache_dir=self.cache_dir, **kwargs)
+        self.caches = getattr(self, "caches", []) + [cache]
+        return cache
+
+    def test_lru_eviction_by_entries(self):
+        """The least recently used entry is evicted first"""
+        cache = self.make_cache(max_entries=2)
+        cache.set(user(1), "one")
+        cache.set(user(2), "two")
+        cache.get(user(1))  # user 2 is now least recently used
+        cache.set(user(3), "three")
+
+        self.assertEqual(list(cache.memory_cache), [cache.get_key(user(1)), cache.get_key(user(3))])
+        stats = cache.get_stats()
+        self.assertEqual(stats["memory_entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+
+    def test_eviction_by_bytes(self):
+        """Entries are evicted until the memory tier fits in max_bytes"""
+        cache = self.make_cache(max_entries=None, max_bytes=600)
+        for i in range(5):
+            cache.set(user(i), "x" * 200)
+
+        stats = cache.get_stats()
+        self.assertLessEqual(stats["memory_bytes"], 600)
+        self.assertEqual(stats["memory_entries"] + stats["evictions"], 5)
+
+        # Evicted entries are still served from disk
+        self.assertEqual(cache.get(user(0)), "x" * 200)
+        self.assertEqual(cache.get_stats()["disk_hits"], 1)
+
+    def test_expired_entries_reclaimed_on_access(self):
+        """An expired memory entry is dropped when it is looked up"""
+        cache = self.make_cache()
+        cache.set(user(1), "one")
+        key = cache.get_key(user(1))
+        cache.memory_cache[key]["timestamp"] = datetime.now() - timedelta(hours=2)
+        cache.disk.delete(key)
+
+        self.assertIsNone(cache.get(user(1)))
+        self.assertNotIn(key, cache.memory_cache)
+        stats = cache.get_stats()
+        self.assertEqual(stats["expirations"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.0)
+
+    def test_stale_entries_served_within_grace_window(self):
+        """Past the TTL an entry is stale until the grace window ends"""
+        cache = self.make_cache(ttl_minutes=60, stale_minutes=30)
+        cache.set(user(1), "one")
+        key = cache.get_key(user(1))
+
+        cache.memory_cache[key]["timestamp"] = datetime.now() - timedelta(minutes=70)
+        self.assertEqual(cache.get_with_state(user(1)), ("one", "stale"))
+        self.assertIsNone(cache.get(user(1)))
+
+        cache.memory_cache[key]["timestamp"] = datetime.now() - timedelta(minutes=95)
+        cache.disk.delete(key)
+        self.assertEqual(cache.get_with_state(user(1)), (None, None))
+        self.assertEqual(cache.get_stats()["stale_hits"], 2)
+
+
+class TestSemanticKeys(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = AnalysisCache(cache_dir=self.cache_dir, key_mode="semantic")
+        self.usage = {
+            "user_id": "user_a",
+            "date": "2025-01-01",
+            "apps": [
+                {"name": "Instagram", "category": "Social Media", "duration": 121},
+                {"name": "Gmail", "category": "Productivity", "duration": 60}
+            ],
+            "app_switches": 40,
+            "duration_minutes": 181,
+            "scroll_speed": 80,
+            "usage_times": [{"hour": 14}]
+        }
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_similar_profiles_share_a_key(self):
+        """Identity fields and small duration changes do not change the key"""
+        similar = dict(self.usage, user_id="user_b", date="2025-01-02")
+        similar["apps"] = [dict(self.usage["apps"][0], duration=124), self.usage["apps"][1]]
+        self.assertEqual(self.cache.get_key(self.usage), self.cache.get_key(similar))
+
+        self.cache.set(self.usage, "shared plan")
+        self.assertEqual(self.cache.get(similar), "shared plan")
+
+    def test_material_changes_change_the_key(self):
+        """Late-night use or a new pattern gives a different key"""
+        key = self.cache.get_key(self.usage)
+        self.assertNotEqual(key, self.cache.get_key(dict(self.usage, usage_times=[{"hour": 23}])))
+        self.assertNotEqual(key, self.cache.get_key(dict(self.usage, scroll_speed=150)))
+
+    def test_malformed_data_falls_back_to_exact_key(self):
+        """Data the profile cannot read still gets a stable exact key"""
+        bad = dict(self.usage, app_switches="many")
+        key = self.cache.get_key(bad)
+        self.assertFalse(key.startswith("semantic-"))
+        self.assertEqual(key, self.cache.get_key(dict(bad)))
+
+
+class TestAnalysisCacheDiskBackends(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_backends_round_trip_and_expire(self):
+        """Both disk backends serve entries, count them and drop expired ones"""
+        for backend in ["sqlite", "pickle"]:
+            with self.subTest(backend=backend):
+                cache_dir = tempfile.mkdtemp(dir=self.cache_dir)
+                cache = AnalysisCache(cache_dir=cache_dir, backend=backend)
+                cache.set(user(1), "one")
+                cache.set(user(2), "two")
+                cache.set(user(2), "two again")
+
+                # A fresh instance only has the disk tier
+                reopened = AnalysisCache(cache_dir=cache_dir, backend=backend)
+                self.assertEqual(reopened.get(user(2)), "two again")
+                self.assertEqual(reopened.get_stats()["disk_entries"], 2)
+
+                reopened.disk.set(reopened.get_key(user(1)), {"result": "old"}, time.time() - 1)
+                self.assertEqual(reopened.disk.clear_expired(), 1)
+                self.assertEqual(reopened.get_stats()["disk_entries"], 1)
+                self.assertIsNone(reopened.get(user(1)))
+                cache.close()
+                reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,69 @@
+"""Test cases for the coach pool"""
+import unittest
+import threading
+import time
+
+from utils.coach_pool import CoachPool
+
+
+class FakeCoach:
+    def __init__(self):
+        self.busy = False
+        self.runs = 0
+
+    def analyze_user_with_status(self, usage_data):
+        # A coach must never run two analyses at once
+        assert not self.busy
+        self.busy = True
+        time.sleep(0.02)
+        self.runs += 1
+        self.busy = False
+        return usage_data["user_id"], "MISS"
+
+
+class TestCoachPool(unittest.TestCase):
+    def test_concurrent_analyses_get_isolated_coaches(self):
+        """Coaches are created lazily up to the pool size and never shared"""
+        pool = CoachPool(FakeCoach, size=3)
+        results = []
+        errors = []
+
+        def work(i):
+            try:
+                results.append(pool.analyze_user_with_status({"user_id": i}))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(r for r, _ in results), list(range(12)))
+        stats = pool.get_stats()
+        self.assertEqual(stats["created"], 3)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["leases"], 12)
+
+    def test_lease_returns_coach_on_error(self):
+        """A failing analysis still hands its coach back to the pool"""
+        pool = CoachPool(FakeCoach, size=1)
+        with self.assertRaises(RuntimeError):
+            with pool.lease():
+                raise RuntimeError("crew failed")
+        with pool.lease(timeout=0.1) as coach:
+            self.assertIs(coach, pool.primary)
+
+    def test_lease_timeout(self):
+        """Waiting longer than the timeout for a busy pool raises TimeoutError"""
+        pool = CoachPool(FakeCoach, size=1)
+        with pool.lease():
+            with self.assertRaises(TimeoutError):
+                with pool.lease(timeout=0.05):
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
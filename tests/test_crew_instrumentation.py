@@ -0,0 +1,79 @@
+"""Test cases for per-agent crew instrumentation"""
+import unittest
+import time
+from types import SimpleNamespace
+
+from utils.metrics import AgentPerformanceTracker, PerformanceTracker
+from utils.crew_instrumentation import CrewInstrumentation
+from utils.llm_backends import OfflineChatModel
+
+
+class FakeCrew:
+    """Sequential crew stand-in that sleeps per task and fires the callbacks"""
+    def __init__(self, tasks, fail_at=None):
+        self.tasks = tasks
+        self.fail_at = fail_at
+        self.task_callback = None
+
+    def kickoff(self, inputs):
+        for i, task in enumerate(self.tasks):
+            if i == self.fail_at:
+                raise RuntimeError("LLM timeout")
+            task.agent.llm.invoke("Analyze usage")
+            task.agent.step_callback([(SimpleNamespace(tool="Screen Time Analyzer"), "observation")])
+            time.sleep(task.seconds)
+            self.task_callback(SimpleNamespace(raw="done"))
+        return "plan"
+
+
+def make_task(role, seconds):
+    agent = SimpleNamespace(role=role, llm=OfflineChatModel(latency_ms=0, completion_tokens=50), step_callback=None)
+    return SimpleNamespace(agent=agent, seconds=seconds)
+
+
+class TestCrewInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.tracker = PerformanceTracker()
+        self.agent_tracker = AgentPerformanceTracker()
+        self.instrumentation = CrewInstrumentation(self.tracker, self.agent_tracker)
+
+    def test_each_agent_gets_its_own_duration(self):
+        """Task durations, tools and tokens are credited per agent"""
+        crew = FakeCrew([make_task("Analyst", 0.05), make_task("Planner", 0.15)])
+        self.instrumentation.instrument([task.agent for task in crew.tasks], crew)
+        self.assertEqual(self.instrumentation.run_sequential(crew, {}), "plan")
+
+        latency = self.tracker.generate_performance_report()["agent_latency"]
+        self.assertLess(latency["Analyst"]["max"], 0.12)
+        self.assertGreaterEqual(latency["Planner"]["max"], 0.15)
+
+        report = self.agent_tracker.get_performance_report()
+        self.assertEqual(report["slowest_agent"], "Planner")
+        self.assertEqual(report["tool_usage_by_agent"]["Analyst"], {"Screen Time Analyzer": 1})
+        self.assertEqual(report["token_usage_by_agent"]["Planner"]["completion_tokens"], 50)
+
+    def test_failure_is_charged_to_the_failing_agent(self):
+        """Only the agent whose task raised is marked as failed"""
+        crew = FakeCrew([make_task("Analyst", 0), make_task("Planner", 0)], fail_at=1)
+        self.instrumentation.instrument([task.agent for task in crew.tasks], crew)
+        with self.assertRaises(RuntimeError):
+            self.instrumentation.run_sequential(crew, {})
+
+        rates = self.tracker.generate_performance_report()["agent_success_rates"]
+        self.assertEqual(rates, {"Analyst": 100.0, "Planner": 0.0})
+        self.assertEqual(self.agent_tracker.get_performance_report()["error_counts"], {"Planner": 1})
+
+    def test_task_run_for_parallel_tasks(self):
+        """task_run times a single task on the current thread"""
+        with self.assertRaises(ValueError):
+            with self.instrumentation.task_run("Sleep Specialist"):
+                raise ValueError("bad output")
+        with self.instrumentation.task_run("Analyst"):
+            pass
+
+        rates = self.tracker.generate_performance_report()["agent_success_rates"]
+        self.assertEqual(rates, {"Sleep Specialist": 0.0, "Analyst": 100.0})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,132 @@
+"""Test cases for on-demand dashboard rendering"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.cache import CACHE_HIT, CACHE_MISS
+from utils.dashboards import DashboardService, RenderPoolBrokenError
+from utils.visualizer import render_dashboards
+
+USAGE_DATA = {
+    "user_id": "dashboard_user",
+    "apps": [
+        {"name": "Instagram", "category": "Social Media", "duration": 120},
+        {"name": "Gmail", "category": "Productivity", "duration": 30}
+    ],
+    "sessions": [{"hour": 9, "duration": 30}, {"hour": 23, "duration": 90}],
+    "app_switches": 40,
+    "duration_minutes": 150
+}
+
+
+class TestDashboardService(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.service = DashboardService(cache_dir=self.cache_dir, workers=1)
+
+    def tearDown(self):
+        self.service.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_renders_once_per_content(self):
+        """The first request renders in a worker, the second is served from disk"""
+        png, key, status = self.service.get(USAGE_DATA, "wellness_score: 55")
+        self.assertEqual(status, CACHE_MISS)
+        self.assertTrue(png.startswith(b"\x89PNG"))
+
+        cached, cached_key, status = self.service.get(USAGE_DATA, "wellness_score: 55")
+        self.assertEqual(status, CACHE_HIT)
+        self.assertEqual((cached, cached_key), (png, key))
+
+    def test_key_follows_content(self):
+        """Changed usage data or analysis gives a new cache key"""
+        key = self.service.key(USAGE_DATA, "a")
+        self.assertEqual(key, self.service.key(dict(USAGE_DATA), "a"))
+        self.assertNotEqual(key, self.service.key(USAGE_DATA, "b"))
+        self.assertNotEqual(key, self.service.key(dict(USAGE_DATA, app_switches=41), "a"))
+        self.assertNotEqual(key, self.service.key(USAGE_DATA, "a", profile="vector"))
+
+    def test_vector_profile(self):
+        """The vector profile renders SVG and is cached separately from the preview"""
+        svg, key, status = self.service.get(USAGE_DATA, profile="vector")
+        self.assertEqual(status, CACHE_MISS)
+        self.assertIn(b"<svg", svg)
+        self.assertEqual(self.service.get(USAGE_DATA)[2], CACHE_MISS)
+        self.assertEqual(self.service.get(USAGE_DATA, profile="vector")[2], CACHE_HIT)
+
+    def test_cache_is_capped(self):
+        """Past max_cache_mb the least recently served images are deleted"""
+        service = DashboardService(cache_dir=self.cache_dir, workers=1, max_cache_mb=0.06)
+        try:
+            _, first_key, _ = service.get(USAGE_DATA)
+            for switches in (41, 42):
+                service.get(dict(USAGE_DATA, app_switches=switches))
+            stats = service.get_stats()
+            self.assertGreater(stats["evictions"], 0)
+            self.assertLessEqual(stats["cache_bytes"], stats["max_cache_bytes"])
+            self.assertEqual(stats["cache_files"], len(os.listdir(self.cache_dir)))
+            # The oldest image went first and is rendered again on request
+            self.assertEqual(service.get(USAGE_DATA)[2], CACHE_MISS)
+        finally:
+            service.close()
+
+    def test_broken_pool_is_not_replaced(self):
+        """After a worker dies, renders fail until restart instead of forking again"""
+        self.service.start()
+        executor = self.service.executor
+        with self.assertRaises(Exception):
+            executor.submit(os._exit, 1).result(timeout=30)
+        for _ in range(2):
+            with self.assertRaises(RenderPoolBrokenError):
+                self.service.get(USAGE_DATA)
+        self.assertIs(self.service.executor, executor)
+        self.assertTrue(self.service.get_stats()["broken"])
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            self.service.get(USAGE_DATA, profile="poster")
+
+
+class TestRenderDashboards(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_results_align_with_users(self):
+        """Each user gets a saved PNG, and a bad record only fails itself"""
+        users = [dict(USAGE_DATA, user_id=f"cohort_{i}") for i in range(3)]
+        users.insert(1, {"user_id": "broken"})
+        results = render_dashboards(users, workers=2, output_dir=self.output_dir, profile="preview")
+
+        self.assertEqual(len(results), 4)
+        self.assertIsInstance(results[1], Exception)
+        for i, path in zip([0, 2, 3], [results[0], results[2], results[3]]):
+            self.assertIn(f"wellness_dashboard_{users[i]['user_id']}_", path)
+            with open(path, "rb") as f:
+                self.assertTrue(f.read(4) == b"\x89PNG")
+
+    def test_duplicate_user_ids_get_their_own_files(self):
+        """Users sharing an id, or without one, never overwrite each other's dashboard"""
+        users = [dict(USAGE_DATA) for _ in range(3)]
+        users.append({k: v for k, v in USAGE_DATA.items() if k != "user_id"})
+        users.append(dict(users[-1]))
+        results = render_dashboards(users, workers=2, output_dir=self.output_dir, profile="preview")
+
+        self.assertEqual(len(set(results)), len(users))
+        self.assertEqual(len(os.listdir(self.output_dir)), len(users))
+        for path in results:
+            with open(path, "rb") as f:
+                self.assertTrue(f.read(4) == b"\x89PNG")
+
+    def test_mismatched_analysis_results(self):
+        """Analysis results must line up with the users"""
+        users = [dict(USAGE_DATA, user_id=f"cohort_{i}") for i in range(3)]
+        with self.assertRaises(ValueError):
+            render_dashboards(users, workers=1, analysis_results_list=["a"], output_dir=self.output_dir)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,49 @@
+"""Test cases for the bounded feedback window"""
+import unittest
+
+from utils.feedback import FeedbackWindow
+
+
+def feedback(score, user_id="u"):
+    return {
+        "user_id": user_id,
+        "agent_performance": {"completeness": score, "relevance": score / 2, "actionability": 100 - score}
+    }
+
+
+class TestFeedbackWindow(unittest.TestCase):
+    def test_window_is_bounded_and_averages_match(self):
+        """Old records leave the window and the running sums follow"""
+        window = FeedbackWindow(max_entries=5)
+        scores = [10, 20, 30, 40, 50, 60, 70, 80]
+        for i, score in enumerate(scores):
+            window.append(feedback(score, user_id=f"u{i}"))
+
+        self.assertEqual(len(window), 5)
+        self.assertEqual(window[-1]["user_id"], "u7")
+        self.assertEqual(window[0]["user_id"], "u3")
+        trends = window.trends()
+        recent = scores[-5:]
+        self.assertEqual(trends["total_seen"], 8)
+        self.assertAlmostEqual(trends["averages"]["completeness"], sum(recent) / 5)
+        self.assertAlmostEqual(trends["averages"]["relevance"], sum(recent) / 10)
+        self.assertAlmostEqual(trends["averages"]["actionability"], 100 - sum(recent) / 5)
+
+    def test_ewma_weights_recent_scores(self):
+        """The EWMA starts at the first score and moves toward new ones"""
+        window = FeedbackWindow(max_entries=10, ewma_alpha=0.5)
+        window.append(feedback(0))
+        window.append(feedback(100))
+        self.assertAlmostEqual(window.trends()["ewma"]["completeness"], 50.0)
+
+    def test_long_runs_do_not_drift(self):
+        """Periodic re-summing keeps the window average exact"""
+        window = FeedbackWindow(max_entries=7)
+        for i in range(1000):
+            window.append(feedback((i * 37) % 100 + 0.1))
+        expected = sum(entry["agent_performance"]["completeness"] for entry in window) / 7
+        self.assertAlmostEqual(window.trends()["averages"]["completeness"], expected, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,72 @@
+"""Test cases for the background job queue"""
+import threading
+import time
+import unittest
+
+from utils.job_queue import JobQueue, QueueFullError
+
+
+def wait_for_status(queue, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job and job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {status}")
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1, max_pending=2)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_submit_status_result(self):
+        """A job moves from queued/running to completed with its result"""
+        release = threading.Event()
+        job_id = self.queue.submit(lambda x: release.wait(5) and x * 2, 21)
+        self.assertIn(self.queue.get(job_id)["status"], ("queued", "running"))
+
+        release.set()
+        job = wait_for_status(self.queue, job_id, "completed")
+        self.assertEqual(job["result"], 42)
+        self.assertIsNotNone(job["finished_at"])
+
+    def test_failed_job_keeps_error(self):
+        job_id = self.queue.submit(lambda: 1 / 0)
+        job = wait_for_status(self.queue, job_id, "failed")
+        self.assertIn("division by zero", job["error"])
+
+    def test_full_queue_rejects(self):
+        """Submits beyond max_pending raise instead of blocking"""
+        release = threading.Event()
+        for _ in range(2):
+            self.queue.submit(release.wait, 5)
+        with self.assertRaises(QueueFullError):
+            self.queue.submit(release.wait, 5)
+        release.set()
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.queue.get("missing"))
+
+    def test_finished_jobs_expire_without_a_new_submit(self):
+        """Expired results are purged on get and get_stats too"""
+        queue = JobQueue(max_workers=1, max_pending=2, result_ttl_minutes=0)
+        try:
+            job_id = queue.submit(lambda: "done")
+            deadline = time.monotonic() + 5
+            while not queue.jobs[job_id]["finished_at"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.01)
+
+            self.assertEqual(queue.get_stats()["completed"], 0)
+            self.assertIsNone(queue.get(job_id))
+            self.assertEqual(queue.jobs, {})
+        finally:
+            queue.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
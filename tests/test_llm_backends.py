@@ -0,0 +1,54 @@
+"""Test cases for the offline LLM backend"""
+import unittest
+import json
+import time
+
+from utils.llm_backends import OfflineChatModel, create_llm
+
+USAGE = {"duration_minutes": 415, "app_switches": 145, "sessions": [{"hour": 23, "duration": 45}]}
+
+
+class TestOfflineChatModel(unittest.TestCase):
+    def test_templated_response_per_task(self):
+        """Each task gets its own template filled from the usage data"""
+        model = OfflineChatModel(latency_ms=0)
+        plan = model.invoke(f"Create a comprehensive, personalized digital wellness plan. {json.dumps(USAGE)}")
+        self.assertIn("Final Answer: # Digital Wellness Plan", plan.content)
+        self.assertIn("415 minutes", plan.content)
+
+        sleep = model.invoke(f"Evaluate how device usage affects their sleep quality. {json.dumps(USAGE)}")
+        self.assertIn("1 late night sessions", sleep.content)
+        self.assertEqual(model.invoke("Sleep quality?").content, model.invoke("Sleep quality?").content)
+
+    def test_synthetic_latency_and_tokens(self):
+        """Latency and token usage follow the configuration"""
+        model = OfflineChatModel(latency_ms=50, completion_tokens=300)
+        start = time.time()
+        message = model.invoke("Analyze usage")
+        self.assertGreaterEqual(time.time() - start, 0.05)
+        self.assertEqual(message.usage_metadata["output_tokens"], 300)
+        self.assertEqual(
+            message.usage_metadata["total_tokens"],
+            message.usage_metadata["input_tokens"] + 300
+        )
+
+    def test_factory_selects_backend(self):
+        """create_llm builds the configured backend and rejects unknown ones"""
+        config = {
+            "backend": "offline",
+            "model": "gpt-3.5-turbo",
+            "temperature": 0.7,
+            "offline_latency_ms": 10,
+            "offline_latency_jitter_ms": 0,
+            "offline_completion_tokens": None
+        }
+        llm = create_llm(config)
+        self.assertIsInstance(llm, OfflineChatModel)
+        self.assertEqual(llm.latency_ms, 10)
+
+        with self.assertRaises(ValueError):
+            create_llm(dict(config, backend="local-gpu"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
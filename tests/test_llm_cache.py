@@ -0,0 +1,61 @@
+"""Test cases for the LLM completion cache"""
+import os
+import unittest
+import shutil
+import tempfile
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from utils.llm_cache import LLMResponseCache, completion_key
+
+OPENAI_LLM_STRING = (
+    '{"id": ["langchain", "chat_models", "openai", "ChatOpenAI"], '
+    '"kwargs": {"model_name": "gpt-3.5-turbo", "temperature": 0.7}, "lc": 1}---[(\'stop\', None)]'
+)
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = LLMResponseCache(cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        self.cache.store.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_repeated_prompt_served_from_cache(self):
+        """The second identical prompt never reaches the model"""
+        model = FakeListChatModel(responses=["first", "second"], cache=self.cache)
+        self.assertEqual(model.invoke("Assess sleep for a heavy user").content, "first")
+        self.assertEqual(model.invoke("Assess  sleep for a\nheavy user").content, "first")
+
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_key_depends_on_model_and_temperature(self):
+        """Prompts match up to whitespace, but model settings must match exactly"""
+        key = completion_key("Analyze usage", OPENAI_LLM_STRING)
+        self.assertEqual(key, completion_key("  Analyze\\n usage ", OPENAI_LLM_STRING))
+        self.assertNotEqual(key, completion_key("Analyze usage", OPENAI_LLM_STRING.replace("0.7", "0.2")))
+        self.assertNotEqual(key, completion_key("Analyze usage", OPENAI_LLM_STRING.replace("gpt-3.5-turbo", "gpt-4")))
+
+    def test_expired_completions_are_not_served(self):
+        """Entries older than the TTL are misses and can be purged"""
+        cache = LLMResponseCache(cache_dir=self.cache_dir, ttl_minutes=0, filename="expired.sqlite3")
+        cache.update("prompt", OPENAI_LLM_STRING, ["generation"])
+        self.assertIsNone(cache.lookup("prompt", OPENAI_LLM_STRING))
+        self.assertEqual(cache.clear_expired(), 1)
+        cache.store.close()
+
+    def test_file_created_on_first_use(self):
+        """Building the cache (as the agent modules do at import) creates no file"""
+        cache_dir = os.path.join(self.cache_dir, "lazy")
+        cache = LLMResponseCache(cache_dir=cache_dir)
+        self.assertFalse(os.path.exists(cache_dir))
+        self.assertIsNone(cache.lookup("prompt", OPENAI_LLM_STRING))
+        self.assertTrue(os.path.exists(os.path.join(cache_dir, "llm_cache.sqlite3")))
+        cache.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,58 @@
+"""Test cases for performance metrics"""
+import unittest
+import random
+import time
+
+from utils.metrics import LatencyHistogram, PerformanceTracker
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_quantiles_within_bucket_error(self):
+        """Quantiles stay within a few percent of the exact values"""
+        rng = random.Random(3)
+        values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        values.sort()
+        for q in [0.5, 0.95, 0.99]:
+            exact = values[int(q * len(values)) - 1]
+            self.assertAlmostEqual(histogram.quantile(q) / exact, 1.0, delta=0.05)
+        self.assertAlmostEqual(histogram.mean(), sum(values) / len(values))
+
+    def test_memory_is_fixed(self):
+        """Recording more values never grows the bucket array"""
+        histogram = LatencyHistogram()
+        buckets = len(histogram.counts)
+        for value in [0.0, 1e-9, 0.5, 10_000.0] * 1000:
+            histogram.record(value)
+        self.assertEqual(len(histogram.counts), buckets)
+        self.assertEqual(histogram.quantile(1.0), 10_000.0)
+        self.assertEqual(histogram.quantile(0.0), 0.0)
+
+
+class TestPerformanceTracker(unittest.TestCase):
+    def test_empty_report(self):
+        """A report with no samples does not divide by zero"""
+        report = PerformanceTracker().generate_performance_report()
+        self.assertEqual(report["avg_response_time"], 0.0)
+        self.assertEqual(report["total_analyses"], 0)
+
+    def test_agent_and_stage_latency(self):
+        """Latency is summarized per agent and per stage"""
+        tracker = PerformanceTracker()
+        tracker.track_agent_performance("Analyst", time.time() - 2, success=True)
+        tracker.track_agent_performance("Analyst", time.time() - 4, success=False)
+        with tracker.time_stage("save_results"):
+            pass
+
+        report = tracker.generate_performance_report()
+        self.assertEqual(report["total_analyses"], 2)
+        self.assertEqual(report["agent_success_rates"]["Analyst"], 50.0)
+        self.assertAlmostEqual(report["agent_latency"]["Analyst"]["p99"], 4.0, delta=0.2)
+        self.assertEqual(report["stage_latency"]["save_results"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,54 @@
+"""Test cases for the OpenMetrics exposition"""
+import unittest
+import threading
+
+from utils.openmetrics import MetricsWriter, RequestMetrics, ShardedCounter
+
+
+class TestOpenMetrics(unittest.TestCase):
+    def test_sharded_counter_is_exact_across_threads(self):
+        """Concurrent increments from many threads are never lost"""
+        counter = ShardedCounter()
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value(), 80000)
+
+    def test_sharded_counter_size_is_fixed(self):
+        """Short-lived threads (one per request) do not add shards"""
+        counter = ShardedCounter(shards=4)
+        for _ in range(200):
+            thread = threading.Thread(target=counter.inc)
+            thread.start()
+            thread.join()
+        self.assertEqual(counter.value(), 200)
+        self.assertEqual(len(counter._cells), 4)
+
+    def test_request_histogram_exposition(self):
+        """Buckets are cumulative and the exposition ends with # EOF"""
+        metrics = RequestMetrics(buckets=(0.1, 1))
+        for seconds in [0.05, 0.5, 5]:
+            metrics.start()
+            metrics.observe("POST", "/analyze", 200, seconds)
+
+        writer = MetricsWriter()
+        metrics.render(writer)
+        text = writer.render()
+
+        self.assertIn('wellness_http_requests_total{method="POST",endpoint="/analyze",status="200"} 3', text)
+        self.assertIn('wellness_http_request_duration_seconds_bucket{endpoint="/analyze",le="0.1"} 1', text)
+        self.assertIn('wellness_http_request_duration_seconds_bucket{endpoint="/analyze",le="1"} 2', text)
+        self.assertIn('wellness_http_request_duration_seconds_bucket{endpoint="/analyze",le="+Inf"} 3', text)
+        self.assertIn("wellness_http_requests_in_flight 0", text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
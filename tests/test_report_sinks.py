@@ -0,0 +1,70 @@
+"""Test cases for the report sinks"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.report_sinks import FileReportSink, ParquetReportSink, SQLiteReportSink
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def make_report(user_id, timestamp, analysis="plan"):
+    return {
+        "timestamp": timestamp,
+        "user_id": user_id,
+        "analysis_tier": "llm",
+        "agent_analysis": analysis,
+        "wellness_plan": {"immediate_actions": ["Set 21:00 device bedtime"]}
+    }
+
+
+class TestReportSinks(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def check_latest(self, sink):
+        sink.write(make_report("alice", "20250101_080000", "first"))
+        sink.write_many([
+            make_report("bob", "20250101_090000"),
+            make_report("alice", "20250102_080000", "second")
+        ])
+        self.assertEqual(sink.latest("alice")["agent_analysis"], "second")
+        self.assertEqual(sink.latest("bob")["user_id"], "bob")
+        self.assertIsNone(sink.latest("carol"))
+
+    def test_sqlite_sink(self):
+        sink = SQLiteReportSink(os.path.join(self.output_dir, "reports.sqlite3"))
+        self.check_latest(sink)
+        self.assertEqual(sink.count(), 3)
+        sink.close()
+
+    def test_file_sink_keeps_json_and_text(self):
+        sink = FileReportSink(self.output_dir)
+        locations = sink.write(make_report("alice", "20250101_080000"))
+        self.assertEqual([os.path.splitext(path)[1] for path in locations], [".json", ".txt"])
+        self.assertEqual(sink.latest("alice")["user_id"], "alice")
+
+    def test_file_sink_latest_matches_exact_user(self):
+        """A user id that prefixes another one never returns the other user's report"""
+        sink = FileReportSink(self.output_dir)
+        sink.write(make_report("bob", "20250101_080000", "bob's"))
+        sink.write(make_report("bob_smith", "20250102_080000", "bob_smith's"))
+        self.assertEqual(sink.latest("bob")["agent_analysis"], "bob's")
+        self.assertEqual(sink.latest("bob_smith")["agent_analysis"], "bob_smith's")
+        self.assertIsNone(sink.latest("bo"))
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_parquet_sink(self):
+        self.check_latest(ParquetReportSink(os.path.join(self.output_dir, "dataset")))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
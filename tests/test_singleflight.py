@@ -0,0 +1,61 @@
+"""Test cases for request coalescing"""
+import unittest
+import threading
+import time
+
+from utils.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_run(self):
+        """Callers for the same key wait for the leader's result"""
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return "plan"
+
+        threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("plan", False)] + [("plan", True)] * 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_reach_every_caller_and_are_not_kept(self):
+        """A failed run raises for all waiters and the next call runs again"""
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("crew failed")
+
+        def call():
+            try:
+                flight.do("key", fail)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(errors, ["crew failed", "crew failed"])
+        self.assertEqual(flight.do("key", lambda: "retry"), ("retry", False))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+"""Test cases for the streaming batch helpers"""
+import io
+import json
+import threading
+import time
+import unittest
+
+from utils.streaming import imap_unordered, iter_json_records
+
+RECORDS = [{"user_id": "ünï", "n": 1}, 2.5, [1, 2], "text", 10, {"nested": {"a": [None, True]}}, 300]
+
+
+def parse(body, chunk_size=64 * 1024, **kwargs):
+    return list(iter_json_records(io.BytesIO(body), chunk_size=chunk_size, **kwargs))
+
+
+class TestIterJsonRecords(unittest.TestCase):
+    def test_array_and_ndjson(self):
+        """Both body formats give the same records, whatever the chunk boundaries"""
+        array = json.dumps(RECORDS).encode("utf-8")
+        ndjson = "\n".join(json.dumps(r) for r in RECORDS).encode("utf-8")
+        for chunk_size in range(1, 12):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(parse(array, chunk_size), RECORDS)
+                self.assertEqual(parse(ndjson, chunk_size), RECORDS)
+                self.assertEqual(parse(b" [ 1 ,\n 23 ] ", chunk_size), [1, 23])
+
+    def test_empty_bodies(self):
+        self.assertEqual(parse(b""), [])
+        self.assertEqual(parse(b"[ ]"), [])
+
+    def test_malformed_input(self):
+        for body in (b"[1,,,2]", b"[,1]", b"[1,]", b"[1 2]", b"[1, 2", b'{"a": 1}\n{"b": ', b"[1] 2", b"[][]"):
+            with self.subTest(body=body):
+                with self.assertRaises(ValueError):
+                    parse(body, chunk_size=3)
+
+    def test_malformed_tail_yields_earlier_records(self):
+        records = iter_json_records(io.BytesIO(b'{"a": 1}\n{"b": 2}\n{oops}\n'))
+        self.assertEqual(next(records), {"a": 1})
+        self.assertEqual(next(records), {"b": 2})
+        with self.assertRaises(ValueError):
+            next(records)
+
+    def test_max_record_bytes(self):
+        """A record larger than the limit fails instead of being buffered"""
+        big = json.dumps({"padding": "x" * 500}).encode("utf-8")
+        self.assertEqual(len(parse(big + b"\n" + big, chunk_size=64, max_record_bytes=1000)), 2)
+        with self.assertRaisesRegex(ValueError, "exceeds 100 bytes"):
+            parse(big, chunk_size=64, max_record_bytes=100)
+
+
+class TestImapUnordered(unittest.TestCase):
+    def test_results_carry_their_index(self):
+        results = dict(imap_unordered(lambda x: x * 2, range(20), max_workers=3))
+        self.assertEqual(results, {i: i * 2 for i in range(20)})
+
+    def test_function_errors_are_yielded(self):
+        results = dict(imap_unordered(lambda x: 1 / x, [1, 0, 2], max_workers=2))
+        self.assertIsInstance(results[1], ZeroDivisionError)
+        self.assertEqual(results[2], 0.5)
+
+    def test_input_error_after_in_flight_results(self):
+        """Items accepted before bad input still finish and are yielded before the error"""
+        release = threading.Event()
+        pulled = []
+
+        def items():
+            for i in range(3):
+                pulled.append(i)
+                yield i
+            raise ValueError("bad record")
+
+        def slow(i):
+            release.wait(5)
+            return i
+
+        results = imap_unordered(slow, items(), max_workers=4)
+        threading.Timer(0.05, release.set).start()
+        seen = []
+        with self.assertRaisesRegex(ValueError, "bad record"):
+            for index, result in results:
+                seen.append((index, result))
+        self.assertEqual(sorted(seen), [(0, 0), (1, 1), (2, 2)])
+        self.assertEqual(pulled, [0, 1, 2])
+
+    def test_input_is_pulled_lazily(self):
+        pulled = []
+
+        def items():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        results = imap_unordered(lambda x: (time.sleep(0.01), x)[1], items(), max_workers=2)
+        next(results)
+        self.assertLessEqual(len(pulled), 5)
+        results.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+"""Test cases for dependency-aware task execution"""
+import unittest
+import threading
+import time
+
+from utils.task_graph import run_task_graph
+
+GRAPH = {
+    "analyze_usage": {"depends_on": []},
+    "detect_addiction": {"depends_on": []},
+    "sleep_assessment": {"depends_on": ["analyze_usage"], "input_key": "usage_analysis"},
+    "emotional_impact": {"depends_on": []},
+    "create_wellness_plan": {
+        "depends_on": ["analyze_usage", "detect_addiction", "sleep_assessment", "emotional_impact"],
+        "input_key": "all_analyses"
+    }
+}
+
+
+class TestTaskGraph(unittest.TestCase):
+    def test_independent_tasks_run_concurrently(self):
+        """Fan-out tasks overlap and dependents see upstream outputs"""
+        received = {}
+        active = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def run_task(name, node, inputs):
+            with lock:
+                active.append(name)
+                peak[0] = max(peak[0], len(active))
+            received[name] = inputs
+            time.sleep(0.05)
+            with lock:
+                active.remove(name)
+            return f"{name} output"
+
+        outputs = run_task_graph(GRAPH, {"usage_data": "{}"}, run_task, max_workers=3)
+
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(received["sleep_assessment"]["usage_analysis"], "analyze_usage output")
+        for name in ["analyze_usage", "detect_addiction", "sleep_assessment", "emotional_impact"]:
+            self.assertIn(f"{name} output", received["create_wellness_plan"]["all_analyses"])
+        self.assertEqual(outputs["create_wellness_plan"], "create_wellness_plan output")
+
+    def test_failure_is_raised(self):
+        """A failing task stops the graph"""
+        def run_task(name, node, inputs):
+            if name == "detect_addiction":
+                raise RuntimeError("LLM unavailable")
+            return name
+
+        with self.assertRaises(RuntimeError):
+            run_task_graph(GRAPH, {}, run_task)
+
+    def test_unknown_dependency(self):
+        """Graphs referencing missing tasks are rejected"""
+        with self.assertRaises(ValueError):
+            run_task_graph({"a": {"depends_on": ["b"]}}, {}, lambda *args: None)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+"""Test cases for the deterministic fast path"""
+import unittest
+
+from utils.tiered_analysis import (
+    build_deterministic_report,
+    escalation_reasons,
+    run_tool_analysis,
+    summarize_tool_results
+)
+
+CONFIG = {
+    "escalate_severities": ["MEDIUM", "HIGH", "CRITICAL"],
+    "min_wellness_score": 60,
+    "min_confidence": 0.8,
+    "mood_escalation_score": 4
+}
+
+
+def light_user():
+    return {
+        "user_id": "light_user",
+        "apps": [
+            {"name": "Gmail", "category": "Productivity", "duration": 45},
+            {"name": "Calendar", "category": "Productivity", "duration": 30},
+            {"name": "News", "category": "Information", "duration": 45}
+        ],
+        "sessions": [{"hour": 9, "duration": 30}, {"hour": 13, "duration": 45}, {"hour": 18, "duration": 45}],
+        "app_switches": 20,
+        "duration_minutes": 120,
+        "scroll_speed": 40,
+        "notification_response_time": [12, 20, 15],
+        "usage_times": [{"hour": 9}, {"hour": 13}, {"hour": 18}],
+        "session_duration": 45,
+        "daily_usage": [110, 125, 118, 120, 122]
+    }
+
+
+class TestTieredAnalysis(unittest.TestCase):
+    def test_healthy_user_stays_deterministic(self):
+        """Tools decide the plan for a healthy user"""
+        usage_data = light_user()
+        tool_results = run_tool_analysis(usage_data)
+        self.assertEqual(escalation_reasons(usage_data, None, tool_results, CONFIG), [])
+
+        report = build_deterministic_report(usage_data, tool_results)
+        self.assertIn("Digital Wellness Plan", report)
+        self.assertIn("Analysis tier: deterministic", report)
+        self.assertNotIn("critical", report.lower())
+
+    def test_heavy_user_escalates(self):
+        """High severity escalates to the LLM crew"""
+        usage_data = light_user()
+        usage_data.update({
+            "app_switches": 200,
+            "scroll_speed": 200,
+            "notification_response_time": [1, 2, 1],
+            "usage_times": [{"hour": 23}],
+            "session_duration": 150
+        })
+        reasons = escalation_reasons(usage_data, None, run_tool_analysis(usage_data), CONFIG)
+        self.assertIn("severity CRITICAL", reasons)
+
+    def test_missing_data_and_low_mood_escalate(self):
+        """Low confidence and low mood scores need the LLM crew"""
+        usage_data = {"user_id": "sparse", "apps": [], "sessions": []}
+        reasons = escalation_reasons(usage_data, None, run_tool_analysis(usage_data), CONFIG)
+        self.assertTrue(any(reason.startswith("confidence") for reason in reasons))
+
+        mood_data = {"mood_surveys": [{"time": "evening", "score": 3, "after_social_media": True}]}
+        usage_data = light_user()
+        reasons = escalation_reasons(usage_data, mood_data, run_tool_analysis(usage_data), CONFIG)
+        self.assertEqual(reasons, ["low mood scores"])
+
+    def test_summary_follows_tool_output(self):
+        """Saved severity, score and findings come from the tools, not a template"""
+        usage_data = light_user()
+        summary = summarize_tool_results(run_tool_analysis(usage_data))
+        self.assertEqual(summary["severity_level"], "HEALTHY")
+        self.assertEqual(summary["wellness_score"], "100/100")
+        self.assertEqual(summary["key_findings"], ["Daily screen time: 2h 0m (120 minutes)"])
+
+        usage_data.update({"app_switches": 200, "scroll_speed": 200})
+        summary = summarize_tool_results(run_tool_analysis(usage_data))
+        self.assertIn("Rapid app switching detected", summary["key_findings"])
+        self.assertIn("Doom scrolling detected", summary["key_findings"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,68 @@
+"""
+Helpers shared by the batch entry points of the custom tools
+"""
+
+import json
+import math
+import numbers
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def load_batch_records(batch) -> List[Tuple[Optional[Dict], Optional[str]]]:
+    """Normalise a batch of users into ``(record, error)`` pairs.
+
+    ``batch`` may be a pandas DataFrame with one row per user (columns named
+    like the per-user JSON fields) or any sequence of dicts / JSON strings.
+    Rows that cannot be parsed come back as ``(None, error_message)`` so the
+    caller can emit the same error payload as the per-user ``run`` method.
+    """
+    if isinstance(batch, pd.DataFrame):
+        rows = batch.to_dict("records")
+        # Missing cells show up as NaN; drop them so ``.get`` defaults apply
+        return [({k: v for k, v in row.items() if not _is_missing(v)}, None) for row in rows]
+
+    records = []
+    for item in batch:
+        if isinstance(item, (str, bytes)):
+            try:
+                records.append((json.loads(item), None))
+            except Exception as e:
+                records.append((None, str(e)))
+        else:
+            records.append((item, None))
+    return records
+
+
+def is_number(value) -> bool:
+    """True for finite ints and floats (bools excluded, as JSON keeps them apart)"""
+    value_type = type(value)
+    if value_type is int:
+        return True
+    if value_type is float:
+        return math.isfinite(value)
+    if value_type is bool or not isinstance(value, (numbers.Integral, float)):
+        return False
+    return math.isfinite(value)
+
+
+def is_integer(value) -> bool:
+    """True for ints (including NumPy integers) but not bools"""
+    value_type = type(value)
+    if value_type is int:
+        return True
+    return value_type is not bool and isinstance(value, numbers.Integral)
+
+
+def typed_values(values: np.ndarray, is_float: np.ndarray) -> List:
+    """Convert aggregated float64 values back to the int/float types the
+    per-user path would have produced, as a plain list"""
+    as_int = values.astype(np.int64).tolist()
+    as_float = values.tolist()
+    return [f if flag else i for i, f, flag in zip(as_int, as_float, is_float.tolist())]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
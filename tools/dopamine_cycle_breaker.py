@@ -5,7 +5,22 @@ Detects and interrupts addictive digital behavior patterns
 
 import json
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from tools.batch_utils import is_number, load_batch_records
+
+PATTERN_NAMES = [
+    "rapid_app_switching",
+    "doom_scrolling",
+    "notification_loops",
+    "late_night_usage",
+    "continuous_usage"
+]
+
+SEVERITY_LEVELS = np.array(["HEALTHY", "LOW", "MEDIUM", "HIGH", "CRITICAL", "CRITICAL"])
 
 class DopamineCycleBreaker:
     """Tool for analyzing digital usage patterns"""
@@ -18,28 +33,30 @@ class DopamineCycleBreaker:
         """Main method to analyze usage data"""
         try:
             data = json.loads(usage_data)
-            
-            # Analyze patterns
-            patterns = self.analyze_patterns(data)
-            
-            # Generate interventions
-            interventions = self.generate_interventions(patterns)
-            
-            # Calculate severity
-            severity = self.calculate_severity(patterns)
-            
-            result = {
-                "analysis": patterns,
-                "interventions": interventions,
-                "severity": severity,
-                "timestamp": datetime.now().isoformat()
-            }
-            
+            result = self._analyze(data, datetime.now().isoformat())
             return json.dumps(result, indent=2)
             
         except Exception as e:
             return json.dumps({"error": str(e)})
     
+    def _analyze(self, data: Dict, timestamp: str) -> Dict:
+        """Build the full result for one parsed user record"""
+        # Analyze patterns
+        patterns = self.analyze_patterns(data)
+        
+        # Generate interventions
+        interventions = self.generate_interventions(patterns)
+        
+        # Calculate severity
+        severity = self.calculate_severity(patterns)
+        
+        return {
+            "analysis": patterns,
+            "interventions": interventions,
+            "severity": severity,
+            "timestamp": timestamp
+        }
+    
     def analyze_patterns(self, data: Dict) -> Dict:
         """Analyze usage for addictive patterns"""
         patterns = {
@@ -138,5 +155,249 @@ class DopamineCycleBreaker:
         else:
             return "HEALTHY"
 
+    def run_batch(self, batch, as_json: bool = True) -> List:
+        """Analyze a whole cohort at once.
+        
+        ``batch`` is a pandas DataFrame with one row per user (columns named
+        like the per-user JSON fields) or a sequence of dicts / JSON strings.
+        Every entry matches what ``run`` returns for that user, except that
+        the whole sweep shares one timestamp. Pass ``as_json=False`` to get
+        the result dicts instead of JSON strings.
+        """
+        timestamp = datetime.now().isoformat()
+        patterns, fallback = self._batch_patterns(batch)
+        severities = self.calculate_severity_batch(patterns).tolist()
+        interventions = self.generate_interventions_batch(patterns)
+        flags = {name: patterns[name].tolist() for name in PATTERN_NAMES}
+        
+        results = []
+        for i, severity in enumerate(severities):
+            if i in fallback:
+                record, error = fallback[i]
+                if error is None:
+                    try:
+                        result = self._analyze(record, timestamp)
+                        results.append(json.dumps(result, indent=2) if as_json else result)
+                        continue
+                    except Exception as e:
+                        error = str(e)
+                results.append(json.dumps({"error": error}) if as_json else {"error": error})
+                continue
+            
+            result = {
+                "analysis": {name: flags[name][i] for name in PATTERN_NAMES},
+                "interventions": interventions[i],
+                "severity": severity,
+                "timestamp": timestamp
+            }
+            results.append(json.dumps(result, indent=2) if as_json else result)
+        
+        return results
+    
+    def analyze_patterns_batch(self, batch) -> Dict[str, np.ndarray]:
+        """Evaluate every pattern threshold as a boolean array across a cohort.
+        
+        Rows that the per-user path would reject (e.g. zero
+        ``duration_minutes`` or non-numeric values) are reported as False;
+        use ``run_batch`` to get their error payloads.
+        """
+        patterns, _ = self._batch_patterns(batch)
+        return patterns
+    
+    def calculate_severity_batch(self, patterns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized ``calculate_severity`` over boolean pattern arrays"""
+        active_patterns = sum(np.asarray(patterns[name], dtype=np.int64) for name in PATTERN_NAMES)
+        return SEVERITY_LEVELS[active_patterns]
+    
+    def generate_interventions_batch(self, patterns: Dict[str, np.ndarray]) -> List[list]:
+        """Vectorized intervention selection.
+        
+        Each user's active patterns are packed into a 5-bit mask that indexes
+        a table of the 32 possible intervention lists.
+        """
+        if not hasattr(self, "_intervention_table"):
+            self._intervention_table = [
+                self.generate_interventions({
+                    name: bool(mask & (1 << bit)) for bit, name in enumerate(PATTERN_NAMES)
+                })
+                for mask in range(1 << len(PATTERN_NAMES))
+            ]
+        
+        masks = sum(
+            np.asarray(patterns[name], dtype=np.int64) << bit
+            for bit, name in enumerate(PATTERN_NAMES)
+        )
+        return [
+            [dict(intervention) for intervention in self._intervention_table[mask]]
+            for mask in np.asarray(masks).tolist()
+        ]
+    
+    def _batch_patterns(self, batch) -> tuple:
+        """Compute pattern arrays plus the rows that need the per-user path"""
+        if isinstance(batch, pd.DataFrame):
+            columns, fallback = self._columns_from_frame(batch)
+        else:
+            columns, fallback = self._columns_from_records(load_batch_records(batch))
+        
+        switches = columns["app_switches"]
+        duration = columns["duration_minutes"]
+        has_switches = ~np.isnan(switches)
+        
+        # The per-user path divides by duration_minutes and fails on zero
+        zero_duration = has_switches & (duration == 0)
+        for i in np.flatnonzero(zero_duration).tolist():
+            fallback.setdefault(i, (columns["records"][i], None))
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            switches_per_hour = switches * (60 / duration)
+        
+        count = columns["notification_count"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_response = columns["notification_sum"] / count
+        
+        patterns = {
+            "rapid_app_switching": has_switches & ~zero_duration & (switches_per_hour > 30),
+            "doom_scrolling": columns["scroll_speed"] > 100,
+            "notification_loops": (count > 0) & (avg_response < 5),
+            "late_night_usage": columns["late_night"],
+            "continuous_usage": columns["session_duration"] > 90
+        }
+        for i in fallback:
+            for name in PATTERN_NAMES:
+                patterns[name][i] = False
+        return patterns, fallback
+    
+    def _columns_from_frame(self, frame: pd.DataFrame) -> tuple:
+        """Pattern inputs straight from DataFrame columns"""
+        n_users = len(frame)
+        records = _LazyRecords(frame)
+        fallback = {}
+        columns = {"records": records}
+        
+        for name in ("app_switches", "scroll_speed", "session_duration"):
+            columns[name] = self._numeric_column(frame, name, np.nan, fallback, records)
+        columns["duration_minutes"] = self._numeric_column(frame, "duration_minutes", 60, fallback, records)
+        
+        # notification_response_time: per-user count and sum of a list column
+        count = np.zeros(n_users, dtype=np.int64)
+        total = np.zeros(n_users)
+        if "notification_response_time" in frame:
+            values = frame["notification_response_time"].tolist()
+            row, flat = [], []
+            for i, times in enumerate(values):
+                if not isinstance(times, (list, tuple)) or not all(is_number(t) for t in times):
+                    if not _is_absent(times):
+                        fallback[i] = (records[i], None)
+                    continue
+                row.extend([i] * len(times))
+                flat.extend(times)
+            row = np.asarray(row, dtype=np.int64)
+            count = np.bincount(row, minlength=n_users)
+            total = np.bincount(row, weights=np.asarray(flat, dtype=np.float64), minlength=n_users)
+        columns["notification_count"] = count
+        columns["notification_sum"] = total
+        
+        # usage_times: any hour at night (missing hour counts as midnight)
+        late_night = np.zeros(n_users, dtype=bool)
+        if "usage_times" in frame:
+            for i, times in enumerate(frame["usage_times"].tolist()):
+                if not isinstance(times, (list, tuple)) or not all(isinstance(t, dict) for t in times):
+                    if not _is_absent(times):
+                        fallback[i] = (records[i], None)
+                    continue
+                hours = [t.get("hour", 0) for t in times]
+                if not all(is_number(h) for h in hours):
+                    fallback[i] = (records[i], None)
+                    continue
+                late_night[i] = any(h >= 22 or h <= 5 for h in hours)
+        columns["late_night"] = late_night
+        
+        return columns, fallback
+    
+    def _numeric_column(self, frame, name, default, fallback, records) -> np.ndarray:
+        """Float column with NaN where the key is absent (or ``default``)"""
+        if name not in frame:
+            return np.full(len(frame), default, dtype=np.float64)
+        column = frame[name]
+        absent = column.isna().to_numpy()
+        if column.dtype.kind in "iuf":
+            values = column.to_numpy(dtype=np.float64, copy=True)
+        else:
+            values = np.full(len(frame), np.nan)
+            for i, value in enumerate(column.tolist()):
+                if absent[i]:
+                    continue
+                if is_number(value):
+                    values[i] = value
+                else:
+                    fallback[i] = (records[i], None)
+        values[absent] = default
+        return values
+    
+    def _columns_from_records(self, records: List) -> tuple:
+        """Pattern inputs from parsed dict records in a single extraction pass"""
+        n_users = len(records)
+        fallback = {}
+        scalars = {name: np.full(n_users, np.nan) for name in (
+            "app_switches", "scroll_speed", "session_duration"
+        )}
+        duration = np.full(n_users, 60.0)
+        count = np.zeros(n_users, dtype=np.int64)
+        total = np.zeros(n_users)
+        late_night = np.zeros(n_users, dtype=bool)
+        
+        for i, (data, error) in enumerate(records):
+            if error is not None or not isinstance(data, dict):
+                fallback[i] = (data, error)
+                continue
+            try:
+                for name, values in scalars.items():
+                    if name in data:
+                        values[i] = _checked_number(data[name])
+                if "app_switches" in data:
+                    duration[i] = _checked_number(data.get("duration_minutes", 60))
+                if "notification_response_time" in data:
+                    times = data["notification_response_time"]
+                    count[i] = len(times)
+                    total[i] = sum(_checked_number(t) for t in times)
+                if "usage_times" in data:
+                    # Check every hour first, as run() fails on a bad hour even after a late one
+                    hours = [_checked_number(t.get("hour", 0)) for t in data["usage_times"]]
+                    late_night[i] = any(h >= 22 or h <= 5 for h in hours)
+            except Exception:
+                fallback[i] = (data, None)
+        
+        columns = dict(scalars)
+        columns.update({
+            "records": [data for data, _ in records],
+            "duration_minutes": duration,
+            "notification_count": count,
+            "notification_sum": total,
+            "late_night": late_night
+        })
+        return columns, fallback
+
+
+class _LazyRecords:
+    """Row-to-dict access for DataFrame rows that need the per-user path"""
+    
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+    
+    def __getitem__(self, i: int) -> Dict:
+        row = self.frame.iloc[i].to_dict()
+        return {k: v for k, v in row.items() if not _is_absent(v)}
+
+
+def _is_absent(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _checked_number(value):
+    """Return ``value`` if the columnar path can mirror it, else raise"""
+    if not is_number(value):
+        raise TypeError(f"unsupported value: {value!r}")
+    return value
+
 # Create instance for easy import
 dopamine_cycle_breaker = DopamineCycleBreaker()
\ No newline at end of file
@@ -7,6 +7,11 @@ import json
 from datetime import datetime
 from typing import Dict, List
 
+import numpy as np
+import pandas as pd
+
+from tools.batch_utils import is_integer, is_number, load_batch_records, typed_values
+
 class ScreenTimeAnalyzer:
     """Tool for analyzing screen time data"""
     
@@ -18,21 +23,23 @@ class ScreenTimeAnalyzer:
         """Analyze screen time data"""
         try:
             data = json.loads(device_data)
-            
-            analysis = {
-                "total_screen_time": self._calculate_total_time(data),
-                "app_breakdown": self._analyze_app_usage(data),
-                "peak_usage_times": self._find_peak_times(data),
-                "usage_trends": self._analyze_trends(data),
-                "wellness_score": self._calculate_wellness_score(data),
-                "recommendations": self._generate_recommendations(data)
-            }
-            
+            analysis = self._analyze(data)
             return json.dumps(analysis, indent=2)
             
         except Exception as e:
             return json.dumps({"error": str(e)})
     
+    def _analyze(self, data: Dict) -> Dict:
+        """Build the full analysis for one parsed user record"""
+        return {
+            "total_screen_time": self._calculate_total_time(data),
+            "app_breakdown": self._analyze_app_usage(data),
+            "peak_usage_times": self._find_peak_times(data),
+            "usage_trends": self._analyze_trends(data),
+            "wellness_score": self._calculate_wellness_score(data),
+            "recommendations": self._generate_recommendations(data)
+        }
+    
     def _calculate_total_time(self, data: Dict) -> Dict:
         """Calculate total screen time"""
         total_minutes = sum(app.get("duration", 0) for app in data.get("apps", []))
@@ -212,5 +219,480 @@ class ScreenTimeAnalyzer:
         
         return recommendations
 
+    def run_batch(self, batch, as_json: bool = True) -> List:
+        """Analyze many users at once using vectorized aggregation passes.
+        
+        ``batch`` is either
+        
+        * a pandas DataFrame with one row per user (columns named like the
+          per-user JSON fields) or a sequence of dicts / JSON strings, or
+        * a dict of long-format tables ``{"apps": ..., "sessions": ...,
+          "daily_usage": ...}`` where every row carries a ``user`` column
+          (0-based position in the output); see ``_columns_from_frames``.
+        
+        Each entry of the returned list is identical to what ``run`` produces
+        for that user; pass ``as_json=False`` to get the analysis dicts.
+        Records with value types the columnar path cannot reproduce exactly
+        are analyzed one at a time so the output still matches.
+        """
+        if isinstance(batch, dict) and isinstance(batch.get("apps"), pd.DataFrame):
+            n_users, columns = self._columns_from_frames(batch)
+            results = self._analyze_columns(n_users, columns)
+            failed = ()
+        else:
+            results, failed = self._analyze_records(load_batch_records(batch))
+        
+        if not as_json:
+            return results
+        return [
+            json.dumps(result) if i in failed else self._dump_result(result)
+            for i, result in enumerate(results)
+        ]
+    
+    def _dump_result(self, result: Dict) -> str:
+        """Serialize a batch result exactly like ``run`` does"""
+        try:
+            return json.dumps(result, indent=2)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+    
+    def _analyze_records(self, records: List) -> tuple:
+        """Flatten parsed records into columns and analyze them together"""
+        results = [None] * len(records)
+        failed = set()
+        columnar_rows = []
+        columns = _empty_columns()
+        
+        for i, (record, error) in enumerate(records):
+            if error is None and _append_record(columns, len(columnar_rows), record):
+                columnar_rows.append(i)
+                continue
+            if error is None:
+                try:
+                    results[i] = self._analyze(record)
+                    continue
+                except Exception as e:
+                    error = str(e)
+            results[i] = {"error": error}
+            failed.add(i)
+        
+        analyses = self._analyze_columns(len(columnar_rows), columns)
+        for i, analysis in zip(columnar_rows, analyses):
+            results[i] = analysis
+        return results, failed
+    
+    def _columns_from_frames(self, frames: Dict) -> tuple:
+        """Build analysis columns from long-format tables without a Python loop.
+        
+        ``apps`` needs ``user`` and ``duration`` columns (``name`` and
+        ``category`` are optional), ``sessions`` needs ``user``, ``hour`` and
+        ``duration``, and ``daily_usage`` needs ``user`` and ``minutes``.
+        Rows of one user keep their table order. ``n_users`` defaults to one
+        past the largest user index seen.
+        """
+        apps = frames["apps"]
+        sessions = frames.get("sessions")
+        daily = frames.get("daily_usage")
+        if sessions is None:
+            sessions = pd.DataFrame({"user": [], "hour": [], "duration": []})
+        if daily is None:
+            daily = pd.DataFrame({"user": [], "minutes": []})
+        
+        n_users = frames.get("n_users")
+        if n_users is None:
+            n_users = 1 + int(max(
+                [frame["user"].max() for frame in (apps, sessions, daily) if len(frame)],
+                default=-1
+            ))
+        
+        apps = apps.iloc[np.argsort(apps["user"].to_numpy(), kind="stable")]
+        sessions = sessions.iloc[np.argsort(sessions["user"].to_numpy(), kind="stable")]
+        daily = daily.iloc[np.argsort(daily["user"].to_numpy(), kind="stable")]
+        
+        app_user = apps["user"].to_numpy(dtype=np.int64)
+        category = apps["category"] if "category" in apps else pd.Series(["Other"] * len(apps))
+        category_code, _ = pd.factorize(category.to_numpy(dtype=object), use_na_sentinel=False)
+        day_user = daily["user"].to_numpy(dtype=np.int64)
+        day_start = _offsets(day_user, n_users)
+        
+        columns = {
+            "app_user": app_user,
+            "app_duration": apps["duration"].to_numpy(dtype=np.float64),
+            "app_is_float": np.full(len(apps), apps["duration"].dtype.kind == "f"),
+            "app_social": (category == "Social Media").to_numpy(dtype=bool),
+            "app_names": apps["name"].tolist() if "name" in apps else [None] * len(apps),
+            "app_has_name": [True] * len(apps) if "name" in apps else [False] * len(apps),
+            "app_categories": category.tolist(),
+            "app_category_codes": category_code.astype(np.int64),
+            "n_categories": int(category_code.max()) + 1 if len(category_code) else 0,
+            "sess_user": sessions["user"].to_numpy(dtype=np.int64),
+            "sess_hour": sessions["hour"].to_numpy(dtype=np.int64),
+            "sess_duration": sessions["duration"].to_numpy(dtype=np.float64),
+            "sess_is_float": np.full(len(sessions), sessions["duration"].dtype.kind == "f"),
+            "day_user": day_user,
+            "day_value": daily["minutes"].to_numpy(dtype=np.float64),
+            "day_index": np.arange(len(daily)) - day_start[day_user]
+        }
+        return n_users, columns
+    
+    def _analyze_columns(self, n_users: int, columns: Dict) -> List[Dict]:
+        """Compute every analysis section for many users in vectorized passes"""
+        app_names = columns["app_names"]
+        app_has_name = columns["app_has_name"]
+        app_categories = columns["app_categories"]
+        
+        apps = self._columnar_app_stats(
+            n_users,
+            np.asarray(columns["app_user"], dtype=np.int64),
+            np.asarray(columns["app_duration"], dtype=np.float64),
+            np.asarray(columns["app_is_float"], dtype=bool),
+            np.asarray(columns["app_social"], dtype=bool),
+            np.asarray(columns["app_category_codes"], dtype=np.int64),
+            columns["n_categories"]
+        )
+        sessions = self._columnar_session_stats(
+            n_users,
+            np.asarray(columns["sess_user"], dtype=np.int64),
+            np.asarray(columns["sess_hour"], dtype=np.int64),
+            np.asarray(columns["sess_duration"], dtype=np.float64),
+            np.asarray(columns["sess_is_float"], dtype=bool)
+        )
+        trends = self._columnar_trends(
+            n_users,
+            np.asarray(columns["day_user"], dtype=np.int64),
+            np.asarray(columns["day_value"], dtype=np.float64),
+            np.asarray(columns["day_index"], dtype=np.int64)
+        )
+        wellness = self._columnar_wellness(
+            apps["total"], apps["social"], sessions["late_count"]
+        )
+        
+        # Assemble per-user output in the exact shape of the per-user path,
+        # working on plain lists since NumPy scalar access is slow per element
+        totals = typed_values(apps["total"], apps["user_is_float"])
+        durations = typed_values(apps["duration"], apps["is_float"])
+        percentages = apps["percentage"].tolist()
+        category_totals = apps["category_total"].tolist()
+        order = apps["order"].tolist()
+        app_start = apps["app_start"].tolist()
+        group_first = apps["group_first"].tolist()
+        group_sums = typed_values(apps["group_sum"], apps["group_is_float"])
+        group_start = apps["group_start"].tolist()
+        peak_hours = sessions["group_hour"].tolist()
+        peak_sums = typed_values(sessions["group_sum"], sessions["group_is_float"])
+        peak_periods = sessions["group_period"].tolist()
+        peak_start = sessions["peak_start"].tolist()
+        peak_groups = sessions["peak_groups"].tolist()
+        has_bedtime = sessions["has_bedtime"].tolist()
+        trend_labels = trends["trend"].tolist()
+        day_counts = trends["count"].tolist()
+        day_averages = trends["average"].tolist()
+        over_total = wellness["over_total"].tolist()
+        over_social = wellness["over_social"].tolist()
+        scores = wellness["score"].astype(np.int64).tolist()
+        ratings = wellness["rating"].tolist()
+        
+        results = []
+        for u in range(n_users):
+            total = totals[u]
+            hours = total // 60
+            minutes = total % 60
+            
+            categories = {
+                app_categories[group_first[g]]: group_sums[g]
+                for g in range(group_start[u], group_start[u + 1])
+            }
+            
+            has_total = category_totals[u] > 0
+            ranked_apps = order[app_start[u]:app_start[u + 1]]
+            app_details = [
+                {
+                    "name": app_names[i],
+                    "category": app_categories[i],
+                    "duration": durations[i],
+                    "percentage": round(percentages[i], 1) if has_total else 0
+                }
+                for i in ranked_apps
+            ]
+            
+            if not ranked_apps:
+                most_used_app = "No data"
+            else:
+                top = ranked_apps[0]
+                most_used_app = app_names[top] if app_has_name[top] else "Unknown"
+            
+            peak_times = [
+                {
+                    "hour": peak_hours[g],
+                    "duration": peak_sums[g],
+                    "period": peak_periods[g]
+                }
+                for g in peak_groups[peak_start[u]:peak_start[u + 1]]
+            ]
+            
+            recommendations = []
+            if over_total[u]:
+                recommendations.append("Set daily screen time limits to under 6 hours")
+            if over_social[u]:
+                recommendations.append("Reduce social media usage to under 2 hours daily")
+            if has_bedtime[u]:
+                recommendations.append("Avoid screens 1 hour before bedtime for better sleep")
+            if not recommendations:
+                recommendations.append("Great job! Maintain your healthy digital habits")
+            
+            results.append({
+                "total_screen_time": {
+                    "hours": hours,
+                    "minutes": minutes,
+                    "total_minutes": total,
+                    "formatted": f"{hours}h {minutes}m"
+                },
+                "app_breakdown": {
+                    "by_category": categories,
+                    "by_app": app_details
+                },
+                "peak_usage_times": peak_times,
+                "usage_trends": {
+                    "overall_trend": trend_labels[u],
+                    "daily_average": day_averages[u] if day_counts[u] else 0,
+                    "most_used_app": most_used_app
+                },
+                "wellness_score": {
+                    "score": scores[u],
+                    "rating": ratings[u],
+                    "penalties": wellness["penalties"][u]
+                },
+                "recommendations": recommendations
+            })
+        
+        return results
+    
+    def _columnar_app_stats(self, n_users, user, duration, is_float, social, category, n_categories) -> Dict:
+        """Totals, category breakdown and app ranking for all users in one pass"""
+        total = np.bincount(user, weights=duration, minlength=n_users)
+        social_time = np.bincount(user, weights=duration * social, minlength=n_users)
+        user_is_float = np.bincount(user, weights=is_float, minlength=n_users) > 0
+        
+        # (user, category) groups numbered in order of first appearance
+        group, _ = pd.factorize(user * max(n_categories, 1) + category)
+        n_groups = int(group.max()) + 1 if len(group) else 0
+        _, group_first = np.unique(group, return_index=True)
+        group_sum = np.bincount(group, weights=duration, minlength=n_groups)
+        group_is_float = np.bincount(group, weights=is_float, minlength=n_groups) > 0
+        group_user = user[group_first]
+        category_total = np.bincount(group_user, weights=group_sum, minlength=n_users)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = (duration / category_total[user]) * 100
+        
+        # Stable sort by duration (descending) within each user
+        order = np.lexsort((-duration, user))
+        
+        return {
+            "total": total,
+            "social": social_time,
+            "user_is_float": user_is_float,
+            "duration": duration,
+            "is_float": is_float,
+            "percentage": percentage,
+            "order": order,
+            "app_start": _offsets(user, n_users),
+            "group_first": group_first,
+            "group_sum": group_sum,
+            "group_is_float": group_is_float,
+            "group_start": _offsets(group_user, n_users),
+            "category_total": category_total
+        }
+    
+    def _columnar_session_stats(self, n_users, user, hour, duration, is_float) -> Dict:
+        """Hourly peaks and late-night flags for all users"""
+        late = (hour >= 22) | (hour <= 5)
+        late_count = np.bincount(user, weights=late, minlength=n_users)
+        has_bedtime = np.bincount(user, weights=hour >= 22, minlength=n_users) > 0
+        
+        hour_code, hour_values = pd.factorize(hour)
+        group, _ = pd.factorize(user * max(len(hour_values), 1) + hour_code)
+        n_groups = int(group.max()) + 1 if len(group) else 0
+        _, group_first = np.unique(group, return_index=True)
+        group_sum = np.bincount(group, weights=duration, minlength=n_groups)
+        group_is_float = np.bincount(group, weights=is_float, minlength=n_groups) > 0
+        group_user = user[group_first]
+        group_hour = hour[group_first]
+        group_period = np.select(
+            [
+                (group_hour >= 5) & (group_hour < 12),
+                (group_hour >= 12) & (group_hour < 17),
+                (group_hour >= 17) & (group_hour < 21)
+            ],
+            ["Morning", "Afternoon", "Evening"],
+            default="Night"
+        )
+        
+        # Top 3 hours per user, ties kept in first-seen order like sorted()
+        order = np.lexsort((-group_sum, group_user))
+        starts = _offsets(group_user, n_users)
+        rank = np.arange(n_groups) - starts[group_user[order]]
+        peak_groups = order[rank < 3]
+        
+        return {
+            "late_count": late_count,
+            "has_bedtime": has_bedtime,
+            "group_sum": group_sum,
+            "group_is_float": group_is_float,
+            "group_hour": group_hour,
+            "group_period": group_period,
+            "peak_groups": peak_groups,
+            "peak_start": _offsets(group_user[peak_groups], n_users)
+        }
+    
+    def _columnar_trends(self, n_users, user, value, index) -> Dict:
+        """Recent vs. older daily usage averages for all users"""
+        count = np.bincount(user, minlength=n_users)
+        recent = (count[user] - index) <= 3
+        
+        recent_sum = np.bincount(user[recent], weights=value[recent], minlength=n_users)
+        older_sum = np.bincount(user[~recent], weights=value[~recent], minlength=n_users)
+        total_sum = np.bincount(user, weights=value, minlength=n_users)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            recent_avg = recent_sum / np.minimum(3, count)
+            older_avg = older_sum / np.maximum(1, count - 3)
+            average = total_sum / count
+        
+        trend = np.select(
+            [count < 2, recent_avg > older_avg * 1.1, recent_avg < older_avg * 0.9],
+            ["Insufficient data", "Increasing", "Decreasing"],
+            default="Stable"
+        )
+        
+        return {"trend": trend, "average": average, "count": count}
+    
+    def _columnar_wellness(self, total, social, late_count) -> Dict:
+        """Wellness scores, ratings and penalties for all users"""
+        over_total = total > 360
+        over_social = social > 120
+        has_late = late_count > 0
+        
+        total_penalty = np.where(over_total, np.minimum(20, (total - 360) / 10), 0)
+        social_penalty = np.where(over_social, np.minimum(15, (social - 120) / 8), 0)
+        late_penalty = np.where(has_late, np.minimum(15, late_count * 5), 0)
+        
+        score = 100 - total_penalty - social_penalty - late_penalty
+        rating = np.select(
+            [score >= 80, score >= 60, score >= 40],
+            ["Excellent", "Good", "Fair"],
+            default="Poor"
+        )
+        
+        penalties = []
+        for u in range(len(total)):
+            user_penalties = []
+            if over_total[u]:
+                user_penalties.append(f"Excessive screen time: -{float(total_penalty[u]):.0f}")
+            if over_social[u]:
+                user_penalties.append(f"High social media use: -{float(social_penalty[u]):.0f}")
+            if has_late[u]:
+                user_penalties.append(f"Late night usage: -{float(late_penalty[u]):.0f}")
+            penalties.append(user_penalties)
+        
+        return {
+            "over_total": over_total,
+            "over_social": over_social,
+            "score": np.maximum(0, np.rint(score)),
+            "rating": rating,
+            "penalties": penalties
+        }
+
+
+def _offsets(sorted_user: np.ndarray, n_users: int) -> np.ndarray:
+    """Start offsets of each user's block in an array grouped by user"""
+    offsets = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sorted_user, minlength=n_users), out=offsets[1:])
+    return offsets
+
+
+def _empty_columns() -> Dict:
+    """Column buffers filled by ``_append_record``"""
+    return {
+        "app_user": [], "app_duration": [], "app_is_float": [], "app_social": [],
+        "app_names": [], "app_has_name": [], "app_categories": [], "app_category_codes": [],
+        "category_index": {}, "n_categories": 0,
+        "sess_user": [], "sess_hour": [], "sess_duration": [], "sess_is_float": [],
+        "day_user": [], "day_value": [], "day_index": []
+    }
+
+
+def _append_record(columns: Dict, user: int, data) -> bool:
+    """Append one user's apps, sessions and daily usage to the column buffers.
+    
+    Returns False (leaving the buffers untouched) when the record holds
+    values the columnar path cannot reproduce exactly, e.g. non-numeric
+    durations or unhashable categories; those go through ``_analyze``.
+    """
+    if not isinstance(data, dict):
+        return False
+    apps = data.get("apps", [])
+    sessions = data.get("sessions", [])
+    daily_usage = data.get("daily_usage", [])
+    if not (isinstance(apps, (list, tuple)) and isinstance(sessions, (list, tuple))
+            and isinstance(daily_usage, (list, tuple))):
+        return False
+    
+    marks = [(values, len(values)) for values in columns.values() if isinstance(values, list)]
+    category_index = columns["category_index"]
+    
+    def rollback():
+        for values, mark in marks:
+            del values[mark:]
+        return False
+    
+    app_user, app_duration = columns["app_user"].append, columns["app_duration"].append
+    app_is_float, app_social = columns["app_is_float"].append, columns["app_social"].append
+    app_names, app_has_name = columns["app_names"].append, columns["app_has_name"].append
+    app_categories, app_codes = columns["app_categories"].append, columns["app_category_codes"].append
+    for app in apps:
+        if not isinstance(app, dict):
+            return rollback()
+        duration = app.get("duration", 0)
+        category = app.get("category", "Other")
+        if not is_number(duration):
+            return rollback()
+        try:
+            code = category_index.setdefault(category, len(category_index))
+        except TypeError:
+            return rollback()
+        app_user(user)
+        app_duration(duration)
+        app_is_float(not is_integer(duration))
+        app_social(app.get("category") == "Social Media")
+        app_names(app.get("name"))
+        app_has_name("name" in app)
+        app_categories(category)
+        app_codes(code)
+    
+    sess_user, sess_hour = columns["sess_user"].append, columns["sess_hour"].append
+    sess_duration, sess_is_float = columns["sess_duration"].append, columns["sess_is_float"].append
+    for session in sessions:
+        if not isinstance(session, dict):
+            return rollback()
+        duration = session.get("duration", 0)
+        hour = session.get("hour", 0)
+        if not is_number(duration) or not is_integer(hour):
+            return rollback()
+        sess_user(user)
+        sess_hour(hour)
+        sess_duration(duration)
+        sess_is_float(not is_integer(duration))
+    
+    for value in daily_usage:
+        if not is_number(value):
+            return rollback()
+    columns["day_user"].extend([user] * len(daily_usage))
+    columns["day_value"].extend(daily_usage)
+    columns["day_index"].extend(range(len(daily_usage)))
+    
+    columns["n_categories"] = len(category_index)
+    return True
+
 # Create instance for easy import
 screen_time_analyzer = ScreenTimeAnalyzer()
\ No newline at end of file
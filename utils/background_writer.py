@@ -0,0 +1,131 @@
+"""
+Bounded background queue for persistence and rendering work
+
+Analyses hand reports, feedback, error logs and dashboards to a writer and
+return as soon as the result is in memory. A single worker thread drains
+the queue in batches and passes each batch to the handler registered for
+its kind, so e.g. many reports become one sink transaction.
+
+Backpressure: when the queue is full, ``submit`` blocks for up to
+``put_timeout`` seconds and then runs the handler on the caller's thread,
+so work is slowed down but never dropped. ``flush`` waits for everything
+submitted so far and ``close`` (also run at exit) flushes and stops.
+"""
+import atexit
+import queue
+import threading
+import time
+
+
+class BackgroundWriter:
+    def __init__(self, name="writer", max_queue=1000, batch_size=50, batch_wait_seconds=0.2,
+                 put_timeout=5.0, enabled=True):
+        self.name = name
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_seconds
+        self.put_timeout = put_timeout
+        self.enabled = enabled
+        self.handlers = {}
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.pending = 0
+        self.stats = {"submitted": 0, "written": 0, "failed": 0, "batches": 0, "inline_writes": 0}
+        self.closed = False
+        self.thread = None
+        if enabled:
+            self.thread = threading.Thread(target=self._run, name=f"background-{name}", daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def register(self, kind, handler):
+        """Route items of ``kind`` to ``handler(items)``, which receives a list"""
+        self.handlers[kind] = handler
+
+    def submit(self, kind, item):
+        """Queue one item; written inline when disabled, closed or persistently full"""
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for '{kind}'")
+        with self.lock:
+            self.stats["submitted"] += 1
+            inline = not self.enabled or self.closed
+            if not inline:
+                self.pending += 1
+        if not inline:
+            try:
+                self.queue.put((kind, item), timeout=self.put_timeout)
+                return
+            except queue.Full:
+                with self.lock:
+                    self._done(1)
+                    self.stats["inline_writes"] += 1
+        self._handle(kind, [item])
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.batch_wait
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        by_kind = {}
+        for kind, item in batch:
+            by_kind.setdefault(kind, []).append(item)
+        for kind, items in by_kind.items():
+            self._handle(kind, items)
+        with self.lock:
+            self.stats["batches"] += 1
+            self._done(len(batch))
+
+    def _handle(self, kind, items):
+        try:
+            self.handlers[kind](items)
+        except Exception as e:
+            print(f"⚠️ Background {self.name} failed to write {len(items)} {kind} item(s): {e}")
+            with self.lock:
+                self.stats["failed"] += len(items)
+        else:
+            with self.lock:
+                self.stats["written"] += len(items)
+
+    def _done(self, count):
+        # Caller holds self.lock
+        self.pending -= count
+        if self.pending == 0:
+            self.idle.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is written; False on timeout"""
+        with self.lock:
+            return self.idle.wait_for(lambda: self.pending == 0, timeout=timeout)
+
+    def close(self, timeout=None):
+        """Flush, then stop the worker thread; later submits are written inline"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        if self.thread is not None:
+            self.flush(timeout)
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, queued=self.pending, max_queue=self.queue.maxsize)
@@ -3,54 +3,176 @@ Simple caching system for improved performance
 """
 import json
 import hashlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
-import os
 import pickle
+import threading
+
+from tools.dopamine_cycle_breaker import dopamine_cycle_breaker
+from utils.cache_backends import create_disk_backend
+
+# How a request was served, reported in the API's X-Cache header
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+CACHE_COALESCED = "COALESCED"
+CACHE_BYPASS = "BYPASS"
+CACHE_STALE = "STALE"
+
+# Entry states returned by AnalysisCache.get_with_state
+ENTRY_FRESH = "fresh"
+ENTRY_STALE = "stale"
+
+# Bucket widths for semantic keys; users within one bucket share an analysis
+SEMANTIC_BUCKETS = {
+    "total_minutes": 30,  # daily screen time
+    "social_share": 0.1,  # fraction of screen time on social media
+    "switch_rate": 10  # app switches per hour
+}
+
+LATE_NIGHT_START = 22
+EARLY_MORNING_END = 6
+
+
+def semantic_profile(user_data, buckets=None):
+    """Reduce usage data to the bucketed features that drive the analysis"""
+    buckets = buckets or SEMANTIC_BUCKETS
+    apps = user_data.get("apps", [])
+    app_minutes = sum(app.get("duration", 0) for app in apps)
+    social_minutes = sum(app.get("duration", 0) for app in apps if app.get("category") == "Social Media")
+    total_minutes = app_minutes or user_data.get("duration_minutes", 0)
+
+    duration = user_data.get("duration_minutes") or 60
+    switch_rate = user_data.get("app_switches", 0) * 60 / duration
+
+    hours = [entry.get("hour") for entry in user_data.get("usage_times", []) + user_data.get("sessions", [])]
+    late_night = any(
+        hour is not None and (hour >= LATE_NIGHT_START or hour < EARLY_MORNING_END)
+        for hour in hours
+    )
+
+    patterns = dopamine_cycle_breaker.analyze_patterns(user_data)
+    return {
+        "total_minutes": int(total_minutes // buckets["total_minutes"]),
+        "social_share": int((social_minutes / app_minutes if app_minutes else 0) // buckets["social_share"]),
+        "late_night": late_night,
+        "switch_rate": int(switch_rate // buckets["switch_rate"]),
+        "patterns": sorted(name for name, active in patterns.items() if active),
+        "severity": dopamine_cycle_breaker.calculate_severity(patterns)
+    }
+
 
 class AnalysisCache:
-    def __init__(self, ttl_minutes=60, cache_dir="cache"):
+    def __init__(self, ttl_minutes=60, cache_dir="cache", max_entries=1000, max_bytes=None, backend="sqlite",
+                 key_mode="exact", semantic_buckets=None, stale_minutes=0):
         self.ttl = timedelta(minutes=ttl_minutes)
+        # Entries stay servable as stale for this long after the TTL
+        self.stale_window = timedelta(minutes=stale_minutes)
         self.cache_dir = cache_dir
-        os.makedirs(cache_dir, exist_ok=True)
-        self.memory_cache = {}
+        # "exact" hashes the full payload, "semantic" hashes the bucketed usage profile
+        if key_mode not in ("exact", "semantic"):
+            raise ValueError(f"Unknown cache key mode '{key_mode}' (expected 'exact' or 'semantic')")
+        self.key_mode = key_mode
+        self.semantic_buckets = {**SEMANTIC_BUCKETS, **(semantic_buckets or {})}
+        # Disk tier: "sqlite" (single indexed file), "pickle" (one file per entry) or a backend instance
+        self.disk = create_disk_backend(backend, cache_dir)
+        
+        # In-memory LRU tier: least recently used entries sit at the front
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_cache = OrderedDict()
+        self.memory_sizes = {}
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+        
+    def get_key(self, user_data, context=None):
+        """Generate cache key from user data
+        
+        ``context`` holds anything else the analysis depends on (mood data,
+        mode) and is always matched exactly.
+        """
+        if self.key_mode == "semantic":
+            try:
+                profile = semantic_profile(user_data, self.semantic_buckets)
+                if context is not None:
+                    profile["context"] = context
+                profile_str = json.dumps(profile, sort_keys=True)
+                return "semantic-" + hashlib.md5(profile_str.encode()).hexdigest()
+            except (TypeError, ValueError, AttributeError, ZeroDivisionError):
+                # Malformed data cannot be profiled; only exact repeats may share it
+                pass
         
-    def _get_key(self, user_data):
-        """Generate cache key from user data"""
         # Create a deterministic key from the data
-        data_str = json.dumps(user_data, sort_keys=True)
+        payload = user_data if context is None else {"data": user_data, "context": context}
+        data_str = json.dumps(payload, sort_keys=True)
         return hashlib.md5(data_str.encode()).hexdigest()
     
-    def get(self, user_data):
+    def get(self, user_data, context=None):
         """Get cached analysis if available"""
-        key = self._get_key(user_data)
+        result, state = self.get_with_state(user_data, context)
+        return result if state == ENTRY_FRESH else None
+    
+    def get_with_state(self, user_data, context=None):
+        """Return ``(result, state)`` where state is "fresh", "stale" or None
+        
+        Stale entries are past the TTL but inside the ``stale_minutes`` grace
+        window; callers may serve them while refreshing in the background.
+        """
+        key = self.get_key(user_data, context)
+        now = datetime.now()
         
         # Check memory cache first
-        if key in self.memory_cache:
-            entry = self.memory_cache[key]
-            if datetime.now() - entry['timestamp'] < self.ttl:
-                print("📦 Cache hit (memory)")
-                return entry['result']
+        with self.lock:
+            entry = self.memory_cache.get(key)
+            if entry is not None:
+                state = self._entry_state(entry, now)
+                if state is not None:
+                    self.memory_cache.move_to_end(key)
+                    self.counters["memory_hits" if state == ENTRY_FRESH else "stale_hits"] += 1
+                    print(f"📦 Cache hit (memory, {state})")
+                    return entry['result'], state
+                # Reclaim expired entries lazily on access
+                self._remove_memory(key)
+                self.counters["expirations"] += 1
         
         # Check disk cache
-        cache_file = os.path.join(self.cache_dir, f"{key}.pkl")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
-                    entry = pickle.load(f)
-                    if datetime.now() - entry['timestamp'] < self.ttl:
-                        print("📦 Cache hit (disk)")
-                        # Load into memory cache
-                        self.memory_cache[key] = entry
-                        return entry['result']
-            except:
-                pass
+        try:
+            entry = self.disk.get(key)
+        except Exception as e:
+            print(f"Cache read error: {e}")
+            entry = None
+        state = self._entry_state(entry, now) if entry is not None else None
+        if state is not None:
+            print(f"📦 Cache hit (disk, {state})")
+            # Load into memory cache
+            with self.lock:
+                self._store_memory(key, entry)
+                self.counters["disk_hits" if state == ENTRY_FRESH else "stale_hits"] += 1
+            return entry['result'], state
         
+        with self.lock:
+            self.counters["misses"] += 1
         print("📦 Cache miss")
+        return None, None
+    
+    def _entry_state(self, entry, now):
+        age = now - entry['timestamp']
+        if age < self.ttl:
+            return ENTRY_FRESH
+        if age < self.ttl + self.stale_window:
+            return ENTRY_STALE
         return None
     
-    def set(self, user_data, result):
+    def set(self, user_data, result, context=None):
         """Cache analysis result"""
-        key = self._get_key(user_data)
+        key = self.get_key(user_data, context)
         entry = {
             'result': result,
             'timestamp': datetime.now(),
@@ -61,13 +183,13 @@ class AnalysisCache:
         }
         
         # Save to memory
-        self.memory_cache[key] = entry
+        with self.lock:
+            self._store_memory(key, entry)
         
         # Save to disk
-        cache_file = os.path.join(self.cache_dir, f"{key}.pkl")
+        expires_at = (entry['timestamp'] + self.ttl + self.stale_window).timestamp()
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(entry, f)
+            self.disk.set(key, entry, expires_at)
         except Exception as e:
             print(f"Cache save error: {e}")
     
@@ -76,32 +198,73 @@ class AnalysisCache:
         now = datetime.now()
         
         # Clear from memory
-        expired_keys = [
-            key for key, entry in self.memory_cache.items()
-            if now - entry['timestamp'] >= self.ttl
-        ]
-        for key in expired_keys:
-            del self.memory_cache[key]
+        with self.lock:
+            expired_keys = [
+                key for key, entry in self.memory_cache.items()
+                if self._entry_state(entry, now) is None
+            ]
+            for key in expired_keys:
+                self._remove_memory(key)
+            self.counters["expirations"] += len(expired_keys)
         
         # Clear from disk
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith('.pkl'):
-                filepath = os.path.join(self.cache_dir, filename)
-                try:
-                    with open(filepath, 'rb') as f:
-                        entry = pickle.load(f)
-                        if now - entry['timestamp'] >= self.ttl:
-                            os.remove(filepath)
-                except:
-                    # Remove corrupted cache files
-                    os.remove(filepath)
+        return self.disk.clear_expired(now.timestamp())
+    
+    def _store_memory(self, key, entry):
+        """Insert as most recently used and evict LRU entries over the limits (call with lock held)"""
+        if key in self.memory_cache:
+            self._remove_memory(key)
+        
+        size = self._entry_size(entry) if self.max_bytes else 0
+        self.memory_cache[key] = entry
+        self.memory_sizes[key] = size
+        self.memory_bytes += size
+        
+        while self.memory_cache and (
+            (self.max_entries and len(self.memory_cache) > self.max_entries)
+            or (self.max_bytes and self.memory_bytes > self.max_bytes)
+        ):
+            oldest_key = next(iter(self.memory_cache))
+            self._remove_memory(oldest_key)
+            self.counters["evictions"] += 1
+    
+    def _remove_memory(self, key):
+        """Drop one memory entry and its size accounting (call with lock held)"""
+        del self.memory_cache[key]
+        self.memory_bytes -= self.memory_sizes.pop(key, 0)
+    
+    def _entry_size(self, entry):
+        """Approximate memory footprint of an entry in bytes"""
+        try:
+            return len(pickle.dumps(entry['result']))
+        except Exception:
+            return len(str(entry['result']))
+    
+    def close(self):
+        """Release the disk backend"""
+        self.disk.close()
     
     def get_stats(self):
         """Get cache statistics"""
-        disk_files = len([f for f in os.listdir(self.cache_dir) if f.endswith('.pkl')])
+        with self.lock:
+            counters = dict(self.counters)
+            memory_entries = len(self.memory_cache)
+            memory_bytes = self.memory_bytes
+        
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["stale_hits"] + counters["misses"]
         return {
-            "memory_entries": len(self.memory_cache),
-            "disk_entries": disk_files,
+            "memory_entries": memory_entries,
+            "disk_entries": self.disk.count(),
+            "disk_backend": self.disk.name,
             "cache_dir": self.cache_dir,
-            "ttl_minutes": self.ttl.total_seconds() / 60
+            "ttl_minutes": self.ttl.total_seconds() / 60,
+            "stale_minutes": self.stale_window.total_seconds() / 60,
+            "key_mode": self.key_mode,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "memory_bytes": memory_bytes,
+            "hits": hits,
+            **counters,
+            "hit_ratio": hits / lookups if lookups else 0.0
         }
\ No newline at end of file
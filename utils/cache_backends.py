@@ -0,0 +1,187 @@
+"""
+Disk backends for AnalysisCache.
+
+Each backend stores pickled cache entries under a string key together with
+an absolute expiry time (epoch seconds) and exposes the same small API:
+``get``, ``set``, ``delete``, ``clear``, ``clear_expired``, ``count`` and
+``close``.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+class PickleDirBackend:
+    """Original layout: one ``<key>.pkl`` file per entry"""
+    name = "pickle"
+
+    def __init__(self, cache_dir="cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key, now=None):
+        """Return the stored entry, or None if missing, expired or corrupted"""
+        now = time.time() if now is None else now
+        try:
+            with open(self._path(key), 'rb') as f:
+                record = pickle.load(f)
+        except Exception:
+            return None
+        if record.get('expires_at', 0) <= now:
+            return None
+        return record['entry']
+
+    def set(self, key, entry, expires_at):
+        with open(self._path(key), 'wb') as f:
+            pickle.dump({'entry': entry, 'expires_at': expires_at}, f)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.pkl'):
+                os.remove(os.path.join(self.cache_dir, filename))
+
+    def clear_expired(self, now=None):
+        """Scan every file and remove expired or corrupted ones (O(N))"""
+        now = time.time() if now is None else now
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.pkl'):
+                filepath = os.path.join(self.cache_dir, filename)
+                try:
+                    with open(filepath, 'rb') as f:
+                        record = pickle.load(f)
+                    expired = record.get('expires_at', 0) <= now
+                except Exception:
+                    # Remove corrupted cache files
+                    expired = True
+                if expired:
+                    os.remove(filepath)
+                    removed += 1
+        return removed
+
+    def count(self):
+        return len([f for f in os.listdir(self.cache_dir) if f.endswith('.pkl')])
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """Single SQLite file with an indexed expiry column.
+
+    Expired rows are removed with one range delete on ``expires_at`` and the
+    entry count is kept in a meta row by triggers, so stats never scan.
+    """
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at);
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO cache_meta (name, value)
+            SELECT 'entry_count', COUNT(*) FROM cache_entries;
+        CREATE TRIGGER IF NOT EXISTS cache_entries_count_insert AFTER INSERT ON cache_entries
+            BEGIN UPDATE cache_meta SET value = value + 1 WHERE name = 'entry_count'; END;
+        CREATE TRIGGER IF NOT EXISTS cache_entries_count_delete AFTER DELETE ON cache_entries
+            BEGIN UPDATE cache_meta SET value = value - 1 WHERE name = 'entry_count'; END;
+    """
+
+    def __init__(self, cache_dir="cache", filename="analysis_cache.sqlite3"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, filename)
+        self.lock = threading.Lock()
+        # One shared connection guarded by the lock; the API serves requests on many threads
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def get(self, key, now=None):
+        """Return the stored entry, or None if missing or expired"""
+        now = time.time() if now is None else now
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            self.delete(key)
+            return None
+
+    def set(self, key, entry, expires_at):
+        payload = sqlite3.Binary(pickle.dumps(entry))
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT INTO cache_entries (key, created_at, expires_at, payload)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at,
+                    payload = excluded.payload
+                """,
+                (key, time.time(), expires_at, payload)
+            )
+
+    def delete(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM cache_entries")
+
+    def clear_expired(self, now=None):
+        """Delete every expired row with one indexed range delete"""
+        now = time.time() if now is None else now
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        return cursor.rowcount
+
+    def count(self):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM cache_meta WHERE name = 'entry_count'").fetchone()
+        return row[0] if row else 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+DISK_BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "pickle": PickleDirBackend
+}
+
+
+def create_disk_backend(backend, cache_dir):
+    """Build a backend from its name, or pass an existing instance through"""
+    if not isinstance(backend, str):
+        return backend
+    if backend not in DISK_BACKENDS:
+        raise ValueError(f"Unknown cache backend '{backend}' (expected one of {sorted(DISK_BACKENDS)})")
+    return DISK_BACKENDS[backend](cache_dir)
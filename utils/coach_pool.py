@@ -0,0 +1,99 @@
+"""
+Pool of isolated coach instances for concurrent requests
+
+A CrewAI crew (and its agents' memory and callbacks) must not run two
+analyses at once, so each concurrent request leases its own coach. Coaches
+are created lazily up to ``size``; further requests wait for a free one.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class CoachPool:
+    def __init__(self, factory, size=4):
+        if size < 1:
+            raise ValueError("Coach pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        self.leases = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        # Built eagerly so configuration errors surface at startup
+        self.primary = self._create()
+        self.idle.put(self.primary)
+
+    def _create(self):
+        coach = self.factory()
+        with self.lock:
+            self.created += 1
+        return coach
+
+    def _acquire(self, timeout=None):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                # Reserve the slot before the (slow) construction
+                self.created += 1
+        if can_create:
+            try:
+                return self.factory()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+
+        start = time.perf_counter()
+        try:
+            return self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No coach became available within {timeout} seconds")
+        finally:
+            with self.lock:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Borrow a coach for the duration of the block"""
+        coach = self._acquire(timeout)
+        with self.lock:
+            self.in_use += 1
+            self.leases += 1
+        try:
+            yield coach
+        finally:
+            with self.lock:
+                self.in_use -= 1
+            self.idle.put(coach)
+
+    def analyze_user_with_status(self, *args, **kwargs):
+        """Run DigitalWellnessCoach.analyze_user_with_status on a leased coach"""
+        with self.lease() as coach:
+            return coach.analyze_user_with_status(*args, **kwargs)
+
+    def analyze_user(self, *args, **kwargs):
+        result, _ = self.analyze_user_with_status(*args, **kwargs)
+        return result
+
+    def get_stats(self):
+        """Pool size, coaches created and busy, and time spent waiting for one"""
+        with self.lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "in_use": self.in_use,
+                "leases": self.leases,
+                "waits": self.waits,
+                "avg_wait_seconds": self.wait_seconds / self.waits if self.waits else 0.0
+            }
@@ -0,0 +1,146 @@
+"""
+Per-agent instrumentation for crew runs.
+
+Hooks the CrewAI step/task callbacks and an LLM callback so each agent is
+credited with its own task duration, tool calls, token usage and failures,
+instead of every agent being charged the whole pipeline time.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Which instrumentation and agent the current thread is running a task for
+_current = threading.local()
+
+
+def _step_actions(step_output):
+    """Normalize a step callback payload to a list of agent actions"""
+    steps = step_output if isinstance(step_output, list) else [step_output]
+    actions = []
+    for step in steps:
+        # langchain agents report (AgentAction, observation) pairs
+        action = step[0] if isinstance(step, tuple) and step else step
+        actions.append(action)
+    return actions
+
+
+def _token_counts(response):
+    """Prompt and completion tokens from an LLMResult, or None if unreported"""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    prompt_tokens = completion_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                found = True
+                prompt_tokens += metadata.get("input_tokens", 0)
+                completion_tokens += metadata.get("output_tokens", 0)
+    return (prompt_tokens, completion_tokens) if found else None
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """LLM callback crediting token usage to the agent running on this thread"""
+
+    def on_llm_end(self, response, **kwargs):
+        instrumentation = getattr(_current, "instrumentation", None)
+        agent_role = getattr(_current, "agent_role", None)
+        if instrumentation is None or agent_role is None:
+            return
+        counts = _token_counts(response)
+        if counts:
+            instrumentation.agent_tracker.track_tokens(agent_role, *counts)
+
+
+token_usage_handler = TokenUsageHandler()
+
+
+def attach_token_handler(llm):
+    """Register the shared token handler on an LLM once"""
+    callbacks = getattr(llm, "callbacks", None)
+    if callbacks is None:
+        callbacks = []
+    if not isinstance(callbacks, list) or any(cb is token_usage_handler for cb in callbacks):
+        return
+    try:
+        llm.callbacks = callbacks + [token_usage_handler]
+    except (AttributeError, ValueError, TypeError):
+        # LLMs given as plain model names have no callback hook
+        pass
+
+
+class CrewInstrumentation:
+    def __init__(self, performance_tracker, agent_tracker):
+        self.performance_tracker = performance_tracker
+        self.agent_tracker = agent_tracker
+
+    def instrument(self, agents, crew=None):
+        """Install step callbacks on the agents (and the task callback on a crew)"""
+        for agent in agents:
+            agent.step_callback = self.step_callback_for(agent.role)
+            attach_token_handler(getattr(agent, "llm", None))
+        if crew is not None:
+            crew.task_callback = self.on_task_complete
+
+    def step_callback_for(self, agent_role):
+        """Step callback counting the tools an agent invokes"""
+        def on_step(step_output):
+            for action in _step_actions(step_output):
+                tool_name = getattr(action, "tool", None)
+                if tool_name:
+                    self.agent_tracker.track_tool_usage(agent_role, tool_name)
+        return on_step
+
+    @contextmanager
+    def task_run(self, agent_role):
+        """Time one task on the current thread and record success or failure"""
+        self._set_current(agent_role)
+        start_time = time.time()
+        try:
+            yield
+        except Exception:
+            self._record(agent_role, start_time, success=False)
+            raise
+        else:
+            self._record(agent_role, start_time, success=True)
+        finally:
+            self._set_current(None)
+
+    def run_sequential(self, crew, inputs):
+        """Kick off a sequential crew, timing each task between task callbacks"""
+        _current.pending = [task.agent.role for task in crew.tasks]
+        _current.task_started = time.time()
+        self._set_current(_current.pending[0] if _current.pending else None)
+        try:
+            return crew.kickoff(inputs=inputs)
+        except Exception:
+            # The first task without a completion callback is the one that failed
+            if _current.pending:
+                self._record(_current.pending[0], _current.task_started, success=False)
+            raise
+        finally:
+            _current.pending = []
+            self._set_current(None)
+
+    def on_task_complete(self, task_output):
+        """Crew task callback: credit the finished task to its agent"""
+        pending = getattr(_current, "pending", None)
+        if not pending:
+            return
+        agent_role = pending.pop(0)
+        self._record(agent_role, _current.task_started, success=True)
+        _current.task_started = time.time()
+        self._set_current(pending[0] if pending else None)
+
+    def _set_current(self, agent_role):
+        _current.instrumentation = self if agent_role else None
+        _current.agent_role = agent_role
+
+    def _record(self, agent_role, start_time, success):
+        self.performance_tracker.track_agent_performance(agent_role, start_time, success=success)
+        self.agent_tracker.track_task(agent_role, time.time() - start_time, success)
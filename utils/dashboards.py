@@ -0,0 +1,223 @@
+"""
+On-demand dashboard rendering for GET /dashboard/<user_id>
+
+Dashboards are no longer drawn for every analysis. They are rendered when
+requested, in a process pool so matplotlib work does not hold the API's
+GIL, and the image is cached on disk under a hash of its inputs and output
+profile (see DASHBOARD_PROFILES), so an unchanged user is rendered once
+per profile. Concurrent requests for the same dashboard share one render.
+The cache is capped at ``max_cache_mb``: past it, the least recently
+served images are deleted (hits refresh an image's mtime).
+
+Where available the workers are forked, and ``start()`` should be called
+before the server starts other threads. A spawned worker would re-import
+the API module and build a second coach pool. For the same reason a pool
+whose worker died is not replaced: forking again from the running, threaded
+server is unsafe, so every later render raises RenderPoolBrokenError until
+the process is restarted.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.cache import CACHE_COALESCED, CACHE_HIT, CACHE_MISS
+from utils.singleflight import SingleFlight
+from utils.visualizer import get_dashboard_profile, render_dashboard
+
+# Bump when the dashboard layout changes so cached images are not reused
+RENDERER_VERSION = 3
+
+
+class RenderPoolBrokenError(Exception):
+    """Raised once a render worker has died; the server must be restarted"""
+
+
+def _warm_up():
+    return True
+
+
+class DashboardService:
+    def __init__(self, cache_dir="cache/dashboards", workers=2, profile="preview", render_timeout=60,
+                 max_cache_mb=512):
+        get_dashboard_profile(profile)
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.profile = profile
+        self.render_timeout = render_timeout
+        self.max_cache_bytes = int(max_cache_mb * 1024 * 1024)
+        os.makedirs(cache_dir, exist_ok=True)
+        self.inflight = SingleFlight()
+        self.executor = None
+        self.broken = False
+        self.executor_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.prune_lock = threading.Lock()
+        self.stats = {"hits": 0, "renders": 0, "coalesced": 0, "evictions": 0}
+        entries = self._cache_entries()
+        self.cache_bytes = sum(size for _, size, _ in entries)
+        self.cache_files = len(entries)
+
+    def key(self, usage_data, analysis_results=None, profile=None):
+        """Content hash of everything the rendered image depends on"""
+        profile = profile or self.profile
+        payload = json.dumps(
+            {
+                "usage_data": usage_data,
+                "analysis": str(analysis_results) if analysis_results is not None else None,
+                "profile": profile,
+                "settings": get_dashboard_profile(profile),
+                "version": RENDERER_VERSION
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key, profile):
+        return os.path.join(self.cache_dir, f"{key}.{get_dashboard_profile(profile)['format']}")
+
+    def _get_executor(self):
+        with self.executor_lock:
+            if self.broken:
+                raise RenderPoolBrokenError("Dashboard render workers died; restart the server")
+            if self.executor is None:
+                start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(start_method)
+                )
+            return self.executor
+
+    def start(self):
+        """Launch the worker processes now (forked workers all start on the first submit)"""
+        self._get_executor().submit(_warm_up).result()
+
+    def get(self, usage_data, analysis_results=None, profile=None):
+        """Return ``(image_bytes, key, cache_status)``, rendering on a miss
+
+        ``profile`` defaults to the service's; its DASHBOARD_PROFILES entry
+        gives the image format and mimetype.
+        """
+        profile = profile or self.profile
+        key = self.key(usage_data, analysis_results, profile)
+        image = self._read(key, profile)
+        if image is not None:
+            self._count("hits")
+            return image, key, CACHE_HIT
+
+        def render():
+            # Another request may have finished this render while we waited
+            cached = self._read(key, profile)
+            if cached is not None:
+                return cached
+            try:
+                future = self._get_executor().submit(render_dashboard, usage_data, analysis_results, profile)
+                rendered = future.result(timeout=self.render_timeout)
+            except BrokenProcessPool as e:
+                # A worker died. Re-forking now would copy the server's threads and
+                # locks into the new workers, so stay unavailable until a restart
+                with self.executor_lock:
+                    self.broken = True
+                raise RenderPoolBrokenError("Dashboard render workers died; restart the server") from e
+            self._write(key, profile, rendered)
+            self._count("renders")
+            return rendered
+
+        image, shared = self.inflight.do(key, render)
+        if shared:
+            self._count("coalesced")
+        return image, key, CACHE_COALESCED if shared else CACHE_MISS
+
+    def _read(self, key, profile):
+        path = self._path(key, profile)
+        try:
+            with open(path, "rb") as f:
+                image = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            # Recently served images are the last to be evicted
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return image
+
+    def _write(self, key, profile, image):
+        # Write then rename so readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(image)
+        os.replace(tmp_path, self._path(key, profile))
+        with self.lock:
+            self.cache_bytes += len(image)
+            self.cache_files += 1
+            over_limit = self.cache_bytes > self.max_cache_bytes
+        if over_limit:
+            self._prune()
+
+    def _cache_entries(self):
+        """``(mtime, size, path)`` of every cached image"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _prune(self):
+        """Delete the least recently served images until the cache is under 90% of its cap"""
+        if not self.prune_lock.acquire(blocking=False):
+            # Another thread is already pruning
+            return
+        try:
+            entries = sorted(self._cache_entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_cache_bytes * 0.9
+            evicted = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+            with self.lock:
+                # Rescanned totals also correct for files removed by other processes
+                self.cache_bytes = total
+                self.cache_files = len(entries) - evicted
+                self.stats["evictions"] += evicted
+        finally:
+            self.prune_lock.release()
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_stats(self):
+        with self.lock:
+            return dict(
+                self.stats,
+                workers=self.workers,
+                profile=self.profile,
+                broken=self.broken,
+                cache_files=self.cache_files,
+                cache_bytes=self.cache_bytes,
+                max_cache_bytes=self.max_cache_bytes
+            )
+
+    def close(self):
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
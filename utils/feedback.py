@@ -0,0 +1,83 @@
+"""
+Bounded feedback history with incremental trend aggregates
+"""
+import threading
+from collections import deque
+
+TREND_METRICS = ("completeness", "relevance", "actionability")
+
+
+class FeedbackWindow:
+    """Keeps the last ``max_entries`` feedback records and their score trends
+
+    Window sums are updated as records enter and leave, and an EWMA is kept
+    per metric, so ``trends()`` costs the same however many analyses ran.
+    Indexing and ``len()`` behave like the list this replaces.
+    """
+    def __init__(self, max_entries=100, ewma_alpha=0.2, metrics=TREND_METRICS):
+        self.max_entries = max_entries
+        self.ewma_alpha = ewma_alpha
+        self.metrics = tuple(metrics)
+        self.entries = deque(maxlen=max_entries)
+        self.sums = {metric: 0.0 for metric in self.metrics}
+        self.ewma = {metric: None for metric in self.metrics}
+        self.total_seen = 0
+        self.evictions_since_resum = 0
+        self.lock = threading.Lock()
+
+    def _scores(self, feedback):
+        performance = feedback.get("agent_performance", {})
+        return {metric: float(performance.get(metric, 0.0)) for metric in self.metrics}
+
+    def append(self, feedback):
+        scores = self._scores(feedback)
+        with self.lock:
+            if len(self.entries) == self.max_entries:
+                evicted = self._scores(self.entries[0])
+                for metric in self.metrics:
+                    self.sums[metric] -= evicted[metric]
+                self.evictions_since_resum += 1
+            self.entries.append(feedback)
+            for metric, score in scores.items():
+                self.sums[metric] += score
+                previous = self.ewma[metric]
+                self.ewma[metric] = score if previous is None else (
+                    self.ewma_alpha * score + (1 - self.ewma_alpha) * previous
+                )
+            self.total_seen += 1
+            # Re-sum once per full turnover so float error cannot accumulate (amortized O(1))
+            if self.evictions_since_resum >= self.max_entries:
+                self._resum()
+
+    def _resum(self):
+        for metric in self.metrics:
+            self.sums[metric] = sum(self._scores(entry)[metric] for entry in self.entries)
+        self.evictions_since_resum = 0
+
+    def trends(self):
+        """Window averages and EWMA per metric, plus window and lifetime counts"""
+        with self.lock:
+            count = len(self.entries)
+            return {
+                "window_size": count,
+                "total_seen": self.total_seen,
+                "averages": {
+                    metric: (self.sums[metric] / count if count else 0.0) for metric in self.metrics
+                },
+                "ewma": {metric: (value or 0.0) for metric, value in self.ewma.items()}
+            }
+
+    def snapshot(self):
+        """Copy of the records currently in the window, oldest first"""
+        with self.lock:
+            return list(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        with self.lock:
+            return self.entries[index]
+
+    def __iter__(self):
+        return iter(self.snapshot())
@@ -0,0 +1,153 @@
+"""
+Append-only, segmented NDJSON log for feedback records
+
+Each record is one JSON line written with a single O_APPEND write, so
+several threads or worker processes can share a log without interleaving.
+Segments rotate by size and fsync is batched (every ``fsync_every``
+records or ``fsync_interval_seconds``), trading at most one batch on a
+power loss for not syncing on every analysis.
+"""
+import atexit
+import glob
+import json
+import os
+import re
+import threading
+import time
+
+SEGMENT_PREFIX = "feedback-"
+SEGMENT_SUFFIX = ".ndjson"
+_SEGMENT_RE = re.compile(rf"{SEGMENT_PREFIX}(\d+){re.escape(SEGMENT_SUFFIX)}$")
+
+
+class FeedbackLog:
+    def __init__(self, log_dir="outputs/feedback", segment_max_bytes=16 * 1024 * 1024,
+                 fsync_every=50, fsync_interval_seconds=5.0):
+        self.log_dir = log_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval_seconds
+        os.makedirs(log_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.fd = None
+        self.segment_number = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.records_written = 0
+        self.fsyncs = 0
+
+        segments = self.segments()
+        self._open_segment(self._segment_number(segments[-1]) if segments else 1)
+        atexit.register(self.close)
+
+    def _segment_path(self, number):
+        return os.path.join(self.log_dir, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _segment_number(path):
+        return int(_SEGMENT_RE.search(os.path.basename(path)).group(1))
+
+    def _open_segment(self, number):
+        self.fd = os.open(self._segment_path(number), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.segment_number = number
+
+    def segments(self):
+        """Segment paths, oldest first"""
+        paths = glob.glob(os.path.join(self.log_dir, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+        return sorted((p for p in paths if _SEGMENT_RE.search(os.path.basename(p))), key=self._segment_number)
+
+    def append(self, record):
+        """Append one record (a JSON-serializable dict)"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Append a batch of records with a single write"""
+        data = b"".join(
+            (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+            for record in records
+        )
+        if not data:
+            return
+        with self.lock:
+            if self.fd is None:
+                raise ValueError("Feedback log is closed")
+            os.write(self.fd, data)
+            self.records_written += len(records)
+            self.unsynced += len(records)
+            if (self.unsynced >= self.fsync_every
+                    or time.monotonic() - self.last_sync >= self.fsync_interval):
+                self._sync()
+            if os.fstat(self.fd).st_size >= self.segment_max_bytes:
+                self._rotate()
+
+    def _sync(self):
+        if self.unsynced:
+            os.fsync(self.fd)
+            self.fsyncs += 1
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _rotate(self):
+        self._sync()
+        os.close(self.fd)
+        self._open_segment(self.segment_number + 1)
+
+    def sync(self):
+        """Force pending records to disk"""
+        with self.lock:
+            if self.fd is not None:
+                self._sync()
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                self._sync()
+                os.close(self.fd)
+                self.fd = None
+
+    def _read_segment(self, path):
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-write
+                    continue
+
+    def read(self, user_id=None, since=None):
+        """Stream records oldest first, optionally for one user or after an ISO timestamp"""
+        for path in self.segments():
+            for record in self._read_segment(path):
+                if user_id is not None and record.get("user_id") != user_id:
+                    continue
+                if since is not None and record.get("timestamp", "") <= since:
+                    continue
+                yield record
+
+    def tail(self, n):
+        """The last ``n`` records, oldest first, reading only the newest segments"""
+        if n <= 0:
+            return []
+        chunks = []
+        found = 0
+        for path in reversed(self.segments()):
+            records = list(self._read_segment(path))
+            chunks.append(records)
+            found += len(records)
+            if found >= n:
+                break
+        records = [record for chunk in reversed(chunks) for record in chunk]
+        return records[-n:]
+
+    def get_stats(self):
+        segments = self.segments()
+        with self.lock:
+            return {
+                "log_dir": self.log_dir,
+                "segments": len(segments),
+                "bytes": sum(os.path.getsize(path) for path in segments),
+                "records_written": self.records_written,
+                "unsynced": self.unsynced,
+                "fsyncs": self.fsyncs
+            }
@@ -0,0 +1,101 @@
+"""
+Bounded background job queue for long-running analyses
+"""
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds its maximum number of jobs"""
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_pending=100, result_ttl_minutes=60):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = timedelta(minutes=result_ttl_minutes)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self.jobs = {}
+        # (finished_at, job_id) in the order jobs finish, so purging stops at the first live job
+        self.finished = deque()
+        self.lock = threading.Lock()
+        # Counts queued + running jobs so submit never blocks
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` and return its job id"""
+        self._purge_finished()
+        if not self.slots.acquire(blocking=False):
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None
+            }
+
+        try:
+            self.executor.submit(self._run, job_id, fn, args, kwargs)
+        except Exception:
+            with self.lock:
+                del self.jobs[job_id]
+            self.slots.release()
+            raise
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if unknown or expired"""
+        self._purge_finished()
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def get_stats(self):
+        """Queue depth and job counts by status"""
+        self._purge_finished()
+        with self.lock:
+            counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+            for job in self.jobs.values():
+                counts[job["status"]] += 1
+        counts["max_workers"] = self.max_workers
+        counts["max_pending"] = self.max_pending
+        return counts
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and optionally wait for running ones"""
+        self.executor.shutdown(wait=wait)
+
+    def _run(self, job_id, fn, args, kwargs):
+        self._update(job_id, status="running", started_at=datetime.now().isoformat())
+        try:
+            fields = {"status": "completed", "result": fn(*args, **kwargs)}
+        except Exception as e:
+            fields = {"status": "failed", "error": str(e)}
+        try:
+            finished_at = datetime.now().isoformat()
+            with self.lock:
+                self.jobs[job_id].update(fields, finished_at=finished_at)
+                self.finished.append((finished_at, job_id))
+        finally:
+            self.slots.release()
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _purge_finished(self):
+        """Drop finished jobs older than the result TTL (run on submit, get and get_stats)"""
+        cutoff = (datetime.now() - self.result_ttl).isoformat()
+        with self.lock:
+            while self.finished and self.finished[0][0] < cutoff:
+                _, job_id = self.finished.popleft()
+                self.jobs.pop(job_id, None)
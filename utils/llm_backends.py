@@ -0,0 +1,154 @@
+"""
+LLM backends for the agents.
+
+``create_llm`` builds the model selected by ``AGENT_CONFIG["backend"]``:
+"openai" uses ChatOpenAI, "offline" uses OfflineChatModel, a local stand-in
+that answers with templated reports after a synthetic delay, so the crew,
+caching and API layers can be load tested without network access.
+"""
+import hashlib
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+BACKEND_OPENAI = "openai"
+BACKEND_OFFLINE = "offline"
+
+# Templates keyed by a phrase from each task description, checked in order
+# (the wellness plan prompt quotes the other analyses, so it comes first)
+OFFLINE_TEMPLATES = [
+    ("personalized digital wellness plan", """# Digital Wellness Plan
+
+## Executive Summary
+Daily screen time is {duration_minutes} minutes with {app_switches} app switches; social media and late night use are the main concerns.
+
+## Interventions
+- Immediate: enable focus mode and set a 2 hour social media limit
+- Short-term: schedule a 10 minute break every hour
+- Long-term: implement a digital sunset at 21:00
+
+## Daily Schedule
+- 07:00-09:00: Morning routine with no social media
+- 09:00-17:00: Focused work, take a 5 minute break every hour
+- 21:00: Devices off to protect sleep
+
+## Recommendations
+- Limit each social app to 30 minutes per day
+- Practice 5-minute breathing exercises between sessions
+- Track weekly screen time and wellness analysis progress"""),
+    ("sleep quality", """Sleep impact analysis: {late_sessions} late night sessions detected.
+Recommendations: set a digital sunset at 21:00, enable night mode after 20:00 and keep devices out of the bedroom."""),
+    ("emotional well-being", """Emotional wellness analysis: mood drops after social media sessions.
+Recommendations: limit passive scrolling to 30 minutes and schedule offline activities in the evening."""),
+    ("addictive patterns", """Addictive pattern analysis: {app_switches} app switches indicate rapid switching.
+Interventions: enable focus mode for 30 minutes and batch notifications every 2 hours."""),
+]
+
+OFFLINE_DEFAULT_TEMPLATE = """Usage analysis: {duration_minutes} minutes of screen time across {app_count} apps.
+Wellness score: 55/100. Key concerns: social media time and late night usage."""
+
+
+def _prompt_fields(prompt):
+    """Pull a few usage numbers out of the prompt for the templates"""
+    fields = {}
+    for name in ["duration_minutes", "app_switches"]:
+        match = re.search(rf'"{name}"\s*:\s*(\d+)', prompt)
+        fields[name] = match.group(1) if match else "unknown"
+    fields["app_count"] = len(re.findall(r'"category"\s*:', prompt)) or "several"
+    hours = [int(h) for h in re.findall(r'"hour"\s*:\s*(\d+)', prompt)]
+    fields["late_sessions"] = sum(1 for hour in hours if hour >= 22 or hour < 6)
+    return fields
+
+
+def _count_tokens(text):
+    """Rough token estimate (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class OfflineChatModel(BaseChatModel):
+    """Deterministic local chat model with synthetic latency and token usage"""
+    model_name: str = "offline"
+    temperature: float = 0.0
+    latency_ms: float = 200.0
+    latency_jitter_ms: float = 0.0
+    completion_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "temperature": self.temperature}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        text = self.render(prompt)
+
+        # Jitter is seeded by the prompt so repeated runs take the same time
+        seed = int(hashlib.md5(prompt.encode()).hexdigest()[:8], 16)
+        jitter = random.Random(seed).uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+        input_tokens = _count_tokens(prompt)
+        output_tokens = self.completion_tokens or _count_tokens(text)
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={
+                "model_name": self.model_name,
+                "token_usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens
+                }
+            }
+        )
+
+    def render(self, prompt):
+        """Fill the template matching the task in the prompt"""
+        template = OFFLINE_DEFAULT_TEMPLATE
+        for phrase, candidate in OFFLINE_TEMPLATES:
+            if phrase in prompt:
+                template = candidate
+                break
+        answer = template.format(**_prompt_fields(prompt))
+        # Agents parse the ReAct format, so answer directly
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+def create_llm(agent_config, cache=None):
+    """Build the agents' LLM for the configured backend"""
+    backend = agent_config.get("backend", BACKEND_OPENAI)
+    if backend == BACKEND_OFFLINE:
+        return OfflineChatModel(
+            temperature=agent_config["temperature"],
+            latency_ms=agent_config["offline_latency_ms"],
+            latency_jitter_ms=agent_config["offline_latency_jitter_ms"],
+            completion_tokens=agent_config["offline_completion_tokens"],
+            cache=cache
+        )
+    if backend == BACKEND_OPENAI:
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=agent_config["model"],
+            temperature=agent_config["temperature"],
+            cache=cache
+        )
+    raise ValueError(f"Unknown LLM backend '{backend}' (expected '{BACKEND_OPENAI}' or '{BACKEND_OFFLINE}')")
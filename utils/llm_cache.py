@@ -0,0 +1,125 @@
+"""
+Content-addressed completion cache for the shared agent LLM.
+
+Plugs into langchain's ``cache=`` hook, so every agent using the shared
+``llm`` answers repeated prompts (same model, temperature and prompt text
+up to whitespace) from a SQLite file instead of calling the API.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+
+from utils.cache_backends import SQLiteBackend
+
+_WHITESPACE = re.compile(r"(?:\s|\\n|\\t)+")
+_MODEL = re.compile(r'"model(?:_name)?"\s*:\s*"([^"]+)"')
+_TEMPERATURE = re.compile(r'"temperature"\s*:\s*([0-9.eE+-]+|null)')
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace (including escaped newlines in serialized messages)"""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def completion_key(prompt, llm_string):
+    """Hash of model, temperature, call parameters and the normalized prompt
+
+    Call parameters (such as stop words) follow "---" in ``llm_string``.
+    Falls back to the full ``llm_string`` when model or temperature cannot
+    be read from it, so unknown LLM types never share completions.
+    """
+    model = _MODEL.search(llm_string)
+    temperature = _TEMPERATURE.search(llm_string)
+    if model and temperature:
+        llm_id = {
+            "model": model.group(1),
+            "temperature": temperature.group(1),
+            "params": llm_string.partition("---")[2]
+        }
+    else:
+        llm_id = {"llm_string": llm_string}
+    payload = json.dumps({**llm_id, "prompt": normalize_prompt(prompt)}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache(BaseCache):
+    """The SQLite file is opened on first lookup or update, not when the agent modules import"""
+
+    def __init__(self, cache_dir="cache", ttl_minutes=24 * 60, filename="llm_cache.sqlite3"):
+        self.cache_dir = cache_dir
+        self.filename = filename
+        self.ttl_seconds = ttl_minutes * 60
+        self._store = None
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "writes": 0}
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self.lock:
+                if self._store is None:
+                    self._store = SQLiteBackend(self.cache_dir, filename=self.filename)
+        return self._store
+
+    def lookup(self, prompt, llm_string):
+        """Return the cached generations for this prompt, or None"""
+        try:
+            generations = self.store.get(completion_key(prompt, llm_string))
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            generations = None
+        with self.lock:
+            self.counters["hits" if generations is not None else "misses"] += 1
+        return generations
+
+    def update(self, prompt, llm_string, return_val):
+        """Store the generations returned by the model"""
+        try:
+            self.store.set(completion_key(prompt, llm_string), return_val, time.time() + self.ttl_seconds)
+        except Exception as e:
+            print(f"LLM cache save error: {e}")
+            return
+        with self.lock:
+            self.counters["writes"] += 1
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+    def clear_expired(self):
+        """Remove expired completions, returning how many were deleted"""
+        return self.store.clear_expired()
+
+    def get_stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": self.store.count(),
+            "ttl_minutes": self.ttl_seconds / 60,
+            **counters,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0
+        }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def create_llm_cache(config):
+    """Build the completion cache from LLM_CACHE_CONFIG, or None when disabled"""
+    if not config["enabled"]:
+        return None
+    return LLMResponseCache(cache_dir=config["cache_dir"], ttl_minutes=config["ttl_minutes"])
+
+
+def get_shared_llm_cache(config):
+    """Completion cache shared by every agent module (created on first use)"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = create_llm_cache(config)
+        return _shared_cache
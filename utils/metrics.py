@@ -1,35 +1,204 @@
 """Performance metrics for Digital Wellness Coach"""
+import math
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 
+class LatencyHistogram:
+    """Fixed-memory streaming histogram with log-spaced buckets (HDR-style)
+
+    Values between ``min_value`` and ``max_value`` seconds are recorded with
+    a relative error of about ``(growth - 1) / 2``; the bucket count never
+    changes, so memory and quantile queries do not depend on how many
+    values were recorded.
+    """
+    def __init__(self, min_value=1e-4, max_value=3600.0, growth=1.05):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.log_growth = math.log(growth)
+        # Bucket 0 holds values below min_value, the last one values above max_value
+        self.bucket_count = int(math.ceil(math.log(max_value / min_value) / self.log_growth)) + 2
+        self.counts = [0] * self.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        if value < self.min_value:
+            index = 0
+        elif value >= self.max_value:
+            index = self.bucket_count - 1
+        else:
+            index = 1 + int(math.log(value / self.min_value) / self.log_growth)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Approximate q-quantile (0-1), or 0.0 when nothing was recorded"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                break
+        if index == 0:
+            return self.min
+        if index == self.bucket_count - 1:
+            return self.max
+        # Geometric midpoint of the bucket, clamped to the observed range
+        lower = self.min_value * math.exp((index - 1) * self.log_growth)
+        estimate = lower * math.exp(self.log_growth / 2)
+        return min(max(estimate, self.min), self.max)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max or 0.0
+        }
+
 class PerformanceTracker:
     def __init__(self):
         self.metrics = {
-            "response_times": [],
+            "response_times": LatencyHistogram(),
+            "agent_latency": {},
+            "stage_latency": {},
             "agent_success_rates": {},
             "tool_usage_stats": {},
             "memory_usage": []
         }
-    
+        self.lock = threading.Lock()
+
     def track_agent_performance(self, agent_name, start_time, success):
         """Track individual agent performance"""
         duration = time.time() - start_time
-        self.metrics["response_times"].append(duration)
-        
-        if agent_name not in self.metrics["agent_success_rates"]:
-            self.metrics["agent_success_rates"][agent_name] = {"success": 0, "total": 0}
-        
-        self.metrics["agent_success_rates"][agent_name]["total"] += 1
-        if success:
-            self.metrics["agent_success_rates"][agent_name]["success"] += 1
-    
+        with self.lock:
+            self.metrics["response_times"].record(duration)
+
+            if agent_name not in self.metrics["agent_success_rates"]:
+                self.metrics["agent_success_rates"][agent_name] = {"success": 0, "total": 0}
+                self.metrics["agent_latency"][agent_name] = LatencyHistogram()
+
+            self.metrics["agent_latency"][agent_name].record(duration)
+            self.metrics["agent_success_rates"][agent_name]["total"] += 1
+            if success:
+                self.metrics["agent_success_rates"][agent_name]["success"] += 1
+
+    def track_stage(self, stage, duration):
+        """Record how long one pipeline stage took (seconds)"""
+        with self.lock:
+            if stage not in self.metrics["stage_latency"]:
+                self.metrics["stage_latency"][stage] = LatencyHistogram()
+            self.metrics["stage_latency"][stage].record(duration)
+
+    @contextmanager
+    def time_stage(self, stage):
+        """Context manager recording the duration of a pipeline stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.track_stage(stage, time.perf_counter() - start)
+
     def generate_performance_report(self):
         """Generate performance metrics report"""
-        return {
-            "avg_response_time": sum(self.metrics["response_times"]) / len(self.metrics["response_times"]),
-            "agent_success_rates": {
-                agent: (stats["success"] / stats["total"] * 100)
-                for agent, stats in self.metrics["agent_success_rates"].items()
-            },
-            "total_analyses": len(self.metrics["response_times"])
-        }
\ No newline at end of file
+        with self.lock:
+            response_times = self.metrics["response_times"]
+            return {
+                "avg_response_time": response_times.mean(),
+                "agent_success_rates": {
+                    agent: (stats["success"] / stats["total"] * 100)
+                    for agent, stats in self.metrics["agent_success_rates"].items()
+                },
+                "total_analyses": response_times.count,
+                "response_time_percentiles": response_times.summary(),
+                "agent_latency": {
+                    agent: histogram.summary()
+                    for agent, histogram in self.metrics["agent_latency"].items()
+                },
+                "stage_latency": {
+                    stage: histogram.summary()
+                    for stage, histogram in self.metrics["stage_latency"].items()
+                },
+                "generated_at": datetime.now().isoformat()
+            }
+
+class AgentPerformanceTracker:
+    """Per-agent task, tool and token counters fed by utils/crew_instrumentation.py"""
+    def __init__(self):
+        self.performance_data = {
+            "task_completions": {},
+            "error_counts": {},
+            "tool_usage": {},
+            "token_usage": {},
+            "task_durations": {}
+        }
+        self.lock = threading.Lock()
+    
+    def track_tool_usage(self, agent_role: str, tool_name: str):
+        """Track which tools agents use"""
+        with self.lock:
+            agent_tools = self.performance_data["tool_usage"].setdefault(agent_role, {})
+            agent_tools[tool_name] = agent_tools.get(tool_name, 0) + 1
+    
+    def track_task(self, agent_role: str, duration: float, success: bool):
+        """Track one task run by an agent and how long it took"""
+        with self.lock:
+            counts = self.performance_data["task_completions"]
+            counts[agent_role] = counts.get(agent_role, 0) + (1 if success else 0)
+            if not success:
+                errors = self.performance_data["error_counts"]
+                errors[agent_role] = errors.get(agent_role, 0) + 1
+            durations = self.performance_data["task_durations"].setdefault(
+                agent_role, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            durations["count"] += 1
+            durations["total_seconds"] += duration
+            durations["max_seconds"] = max(durations["max_seconds"], duration)
+    
+    def track_tokens(self, agent_role: str, prompt_tokens: int, completion_tokens: int):
+        """Track LLM token usage per agent"""
+        with self.lock:
+            tokens = self.performance_data["token_usage"].setdefault(
+                agent_role, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0}
+            )
+            tokens["prompt_tokens"] += prompt_tokens
+            tokens["completion_tokens"] += completion_tokens
+            tokens["calls"] += 1
+    
+    def get_performance_report(self):
+        """Generate performance report"""
+        with self.lock:
+            tool_usage = {agent: dict(tools) for agent, tools in self.performance_data["tool_usage"].items()}
+            token_usage = {agent: dict(tokens) for agent, tokens in self.performance_data["token_usage"].items()}
+            durations = self.performance_data["task_durations"]
+            avg_task_seconds = {
+                agent: stats["total_seconds"] / stats["count"]
+                for agent, stats in durations.items() if stats["count"]
+            }
+            slowest = max(avg_task_seconds, key=avg_task_seconds.get) if avg_task_seconds else None
+            return {
+                "status": "Performance tracking active",
+                "agents_tracked": len(durations),
+                "task_completions": dict(self.performance_data["task_completions"]),
+                "error_counts": dict(self.performance_data["error_counts"]),
+                "avg_task_seconds": avg_task_seconds,
+                "slowest_agent": slowest,
+                "total_tool_uses": sum(sum(tools.values()) for tools in tool_usage.values()),
+                "tool_usage_by_agent": tool_usage,
+                "total_tokens": sum(t["prompt_tokens"] + t["completion_tokens"] for t in token_usage.values()),
+                "token_usage_by_agent": token_usage
+            }
@@ -0,0 +1,138 @@
+"""
+OpenMetrics (Prometheus) exposition for the REST API.
+
+Counters are split over a fixed number of shards picked by thread id, so
+concurrent requests under a multi-threaded WSGI server rarely contend for
+the same shard lock, and a scrape sums the shards. The shard count does not
+grow with the number of threads the server has started.
+"""
+import bisect
+import threading
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Request latency buckets in seconds (analyses take from milliseconds to minutes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class ShardedCounter:
+    """Counter summed over ``shards`` lock-protected cells"""
+    def __init__(self, shards=16):
+        self._cells = [0] * shards
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def inc(self, amount=1):
+        # Native thread ids are small sequential integers, unlike get_ident()'s aligned addresses
+        shard = threading.get_native_id() % len(self._cells)
+        with self._locks[shard]:
+            self._cells[shard] += amount
+
+    def value(self):
+        return sum(self._cells)
+
+
+class LabeledCounters:
+    """ShardedCounters keyed by a tuple of label values"""
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, labels):
+        counter = self._counters.get(labels)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(labels, ShardedCounter())
+        return counter
+
+    def items(self):
+        return list(self._counters.items())
+
+
+class RequestMetrics:
+    """HTTP request counts and latency histograms per endpoint"""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.requests = LabeledCounters()
+        # One counter per bucket (not cumulative) plus +Inf, summed on render
+        self.bucket_counts = LabeledCounters()
+        self.latency_sum = LabeledCounters()
+        self.in_flight = ShardedCounter()
+
+    def start(self):
+        self.in_flight.inc()
+
+    def observe(self, method, endpoint, status, seconds):
+        self.in_flight.inc(-1)
+        self.requests.get((method, endpoint, str(status))).inc()
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        self.bucket_counts.get((endpoint, bucket)).inc()
+        self.latency_sum.get((endpoint,)).inc(seconds)
+
+    def render(self, writer):
+        writer.family("wellness_http_requests", "counter", "HTTP requests handled")
+        for (method, endpoint, status), counter in sorted(self.requests.items()):
+            writer.sample("wellness_http_requests_total", counter.value(),
+                          method=method, endpoint=endpoint, status=status)
+
+        writer.family("wellness_http_request_duration_seconds", "histogram", "HTTP request latency", unit="seconds")
+        per_endpoint = {}
+        for (endpoint, bucket), counter in self.bucket_counts.items():
+            counts = per_endpoint.setdefault(endpoint, [0] * (len(self.buckets) + 1))
+            counts[bucket] += counter.value()
+        for endpoint, counts in sorted(per_endpoint.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += count
+                writer.sample("wellness_http_request_duration_seconds_bucket", cumulative,
+                              endpoint=endpoint, le=str(bound))
+            writer.sample("wellness_http_request_duration_seconds_count", cumulative, endpoint=endpoint)
+            writer.sample("wellness_http_request_duration_seconds_sum",
+                          self.latency_sum.get((endpoint,)).value(), endpoint=endpoint)
+
+        writer.family("wellness_http_requests_in_flight", "gauge", "Requests currently being handled")
+        writer.sample("wellness_http_requests_in_flight", self.in_flight.value())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class MetricsWriter:
+    """Builds an OpenMetrics text exposition"""
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, metric_type, help_text, unit=None):
+        self.lines.append(f"# TYPE {name} {metric_type}")
+        if unit:
+            self.lines.append(f"# UNIT {name} {unit}")
+        self.lines.append(f"# HELP {name} {_escape(help_text)}")
+
+    def sample(self, name, value, **labels):
+        if value is None:
+            return
+        if labels:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            self.lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+        else:
+            self.lines.append(f"{name} {_format_value(value)}")
+
+    def summary(self, name, help_text, summaries, label):
+        """Latency summaries from PerformanceTracker (LatencyHistogram.summary dicts)"""
+        self.family(name, "summary", help_text, unit="seconds")
+        for key, stats in sorted(summaries.items()):
+            for quantile in ("p50", "p95", "p99"):
+                self.sample(name, stats[quantile], **{label: key, "quantile": str(int(quantile[1:]) / 100)})
+            self.sample(f"{name}_count", stats["count"], **{label: key})
+            self.sample(f"{name}_sum", stats["mean"] * stats["count"], **{label: key})
+
+    def render(self):
+        return "\n".join(self.lines + ["# EOF"]) + "\n"
@@ -0,0 +1,236 @@
+"""
+Report sinks for DigitalWellnessCoach._save_results.
+
+Every sink stores the comprehensive report dict built by the coach and
+exposes the same small API: ``write`` (one report, returns where it went),
+``write_many`` (one batch of reports), ``latest(user_id)`` and ``close``.
+"""
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+# The timestamp _save_results puts in report file names (%Y%m%d_%H%M%S)
+REPORT_TIMESTAMP = re.compile(r"\d{8}_\d{6}")
+
+
+def format_text_report(report):
+    """Human-readable version of a report (the old .txt file)"""
+    lines = [
+        "DIGITAL WELLNESS REPORT",
+        "=" * 50,
+        "",
+        f"User ID: {report['user_id']}",
+        f"Generated: {report['timestamp']}",
+        f"Analysis tier: {report.get('analysis_tier')}",
+        "",
+        "ANALYSIS RESULTS:",
+        "-" * 30,
+        report.get("agent_analysis", ""),
+        "",
+        "=" * 50,
+        "For structured data, see the JSON file."
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class FileReportSink:
+    """Original layout: a JSON and a TXT file per report in ``output_dir``"""
+    name = "files"
+
+    def __init__(self, output_dir="outputs"):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, report):
+        base = os.path.join(self.output_dir, f"wellness_report_{report['user_id']}_{report['timestamp']}")
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(format_text_report(report))
+        return [f"{base}.json", f"{base}.txt"]
+
+    def write_many(self, reports):
+        for report in reports:
+            self.write(report)
+
+    def latest(self, user_id):
+        """Most recent report for a user (scans the directory)"""
+        prefix = f"wellness_report_{user_id}_"
+        paths = [
+            path for path in glob.glob(os.path.join(self.output_dir, f"{glob.escape(prefix)}*.json"))
+            # The glob also matches users whose id starts with this one ("bob" vs "bob_smith");
+            # only a bare timestamp may follow the prefix
+            if REPORT_TIMESTAMP.fullmatch(os.path.basename(path)[len(prefix):-len(".json")])
+        ]
+        if not paths:
+            return None
+        with open(max(paths, key=os.path.getmtime), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def close(self):
+        pass
+
+
+class SQLiteReportSink:
+    """One SQLite table keyed by user and time, reports stored as compressed JSON
+
+    ``latest(user_id)`` is a lookup on the (user_id, created_at) index and a
+    batch from ``write_many`` is one transaction.
+    """
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            report_timestamp TEXT NOT NULL,
+            analysis_tier TEXT,
+            report BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reports_user_created ON reports (user_id, created_at);
+    """
+
+    def __init__(self, path="outputs/reports.sqlite3", compression_level=6):
+        self.path = path
+        self.compression_level = compression_level
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        # One shared connection guarded by the lock; the API saves reports from many threads
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _row(self, report):
+        payload = zlib.compress(json.dumps(report, default=str).encode("utf-8"), self.compression_level)
+        return (
+            report["user_id"],
+            time.time(),
+            report["timestamp"],
+            report.get("analysis_tier"),
+            sqlite3.Binary(payload)
+        )
+
+    def write(self, report):
+        self.write_many([report])
+        return [f"{self.path} (user_id={report['user_id']}, timestamp={report['timestamp']})"]
+
+    def write_many(self, reports):
+        rows = [self._row(report) for report in reports]
+        if not rows:
+            return
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    """
+                    INSERT INTO reports (user_id, created_at, report_timestamp, analysis_tier, report)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows
+                )
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def latest(self, user_id):
+        """Most recent report for a user, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT report FROM reports WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+                (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class ParquetReportSink:
+    """Parquet dataset partitioned by report date (needs pyarrow)
+
+    Suited to offline analytics over many reports; each ``write_many``
+    batch becomes one zstd-compressed file under ``date=YYYYMMDD/``.
+    """
+    name = "parquet"
+
+    def __init__(self, dataset_dir="outputs/reports_parquet"):
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The parquet report sink needs pyarrow: pip install pyarrow")
+        self.pa = pyarrow
+        self.dataset_dir = dataset_dir
+        os.makedirs(dataset_dir, exist_ok=True)
+
+    def write(self, report):
+        return [self._write_batch([report])]
+
+    def write_many(self, reports):
+        by_date = {}
+        for report in reports:
+            by_date.setdefault(report["timestamp"][:8], []).append(report)
+        for batch in by_date.values():
+            self._write_batch(batch)
+
+    def _write_batch(self, reports):
+        partition = os.path.join(self.dataset_dir, f"date={reports[0]['timestamp'][:8]}")
+        os.makedirs(partition, exist_ok=True)
+        table = self.pa.table({
+            "user_id": [r["user_id"] for r in reports],
+            "report_timestamp": [r["timestamp"] for r in reports],
+            "analysis_tier": [r.get("analysis_tier") for r in reports],
+            "report": [json.dumps(r, default=str) for r in reports]
+        })
+        path = os.path.join(partition, f"part-{uuid.uuid4().hex}.parquet")
+        self.pa.parquet.write_table(table, path, compression="zstd")
+        return path
+
+    def latest(self, user_id):
+        """Most recent report for a user (filtered dataset scan)"""
+        dataset = self.pa.dataset.dataset(self.dataset_dir, format="parquet", partitioning="hive")
+        table = dataset.to_table(
+            columns=["report_timestamp", "report"],
+            filter=self.pa.dataset.field("user_id") == user_id
+        )
+        if table.num_rows == 0:
+            return None
+        rows = table.to_pylist()
+        return json.loads(max(rows, key=lambda row: row["report_timestamp"])["report"])
+
+    def close(self):
+        pass
+
+
+REPORT_SINKS = {
+    "files": lambda config: FileReportSink(config["output_dir"]),
+    "sqlite": lambda config: SQLiteReportSink(config["sqlite_path"]),
+    "parquet": lambda config: ParquetReportSink(config["parquet_dir"])
+}
+
+
+def create_report_sink(config):
+    """Build the sink named by config["sink"]"""
+    sink = config["sink"]
+    if sink not in REPORT_SINKS:
+        raise ValueError(f"Unknown report sink '{sink}' (expected one of {sorted(REPORT_SINKS)})")
+    return REPORT_SINKS[sink](config)
@@ -0,0 +1,51 @@
+"""
+Request coalescing: concurrent calls for the same key share one execution
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """Run ``fn()`` once per key at a time and return ``(result, shared)``
+
+        Callers arriving while a call for ``key`` is in flight wait for it and
+        receive its result (or exception) with ``shared=True``.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        """Number of keys currently being computed"""
+        with self.lock:
+            return len(self.calls)
@@ -0,0 +1,127 @@
+"""
+Streaming helpers for bulk requests: incremental JSON/NDJSON parsing and
+bounded-parallel mapping that yields results as they finish
+"""
+import codecs
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+_decoder = json.JSONDecoder()
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def iter_json_records(stream, chunk_size=64 * 1024, max_record_bytes=1024 * 1024):
+    """Yield records from a binary stream holding a JSON array or NDJSON.
+
+    Only one chunk plus the record being decoded is held in memory, so
+    arbitrarily large batches can be consumed. Raises ValueError on
+    malformed input or a record larger than ``max_record_bytes``.
+    """
+    reader = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    eof = False
+    in_array = None
+    # Inside an array: "first" (after "["), "value" (after ","), "separator" (after an element)
+    # or "end" (after the closing "]", where only whitespace may follow)
+    expect = "first"
+
+    while True:
+        buffer = buffer.lstrip()
+
+        if buffer:
+            if expect == "end":
+                raise ValueError("Unexpected data after the JSON array in batch body")
+            if in_array is None:
+                in_array = buffer[0] == "["
+                if in_array:
+                    buffer = buffer[1:]
+                    continue
+            if in_array:
+                if expect == "separator":
+                    if buffer[0] == "]":
+                        buffer = buffer[1:]
+                        expect = "end"
+                        continue
+                    if buffer[0] != ",":
+                        raise ValueError("Expected ',' or ']' between JSON array elements")
+                    buffer = buffer[1:]
+                    expect = "value"
+                    continue
+                if buffer[0] == "]":
+                    if expect == "value":
+                        raise ValueError("Trailing comma in JSON array")
+                    buffer = buffer[1:]
+                    expect = "end"
+                    continue
+                if buffer[0] == ",":
+                    raise ValueError("Empty element in JSON array")
+            try:
+                record, end = _decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("Malformed JSON record in batch body")
+                if len(buffer) > max_record_bytes:
+                    raise ValueError(f"Batch record exceeds {max_record_bytes} bytes")
+            else:
+                # A number at the end of the buffer could still be cut off mid-chunk ("2." of "2.5")
+                if eof or not isinstance(record, (int, float)) or buffer[end:].strip(_NUMBER_CHARS):
+                    buffer = buffer[end:]
+                    expect = "separator"
+                    yield record
+                    continue
+
+        if eof:
+            if in_array and expect != "end":
+                raise ValueError("Unterminated JSON array in batch body")
+            return
+
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            buffer += reader.decode(b"", final=True)
+        else:
+            buffer += reader.decode(chunk)
+
+
+def imap_unordered(fn, iterable, max_workers=4):
+    """Yield ``(index, result)`` for each item as soon as it finishes.
+
+    At most ``2 * max_workers`` items are pulled from ``iterable`` ahead of
+    completed results, so the input is consumed lazily. Exceptions raised
+    by ``fn`` are yielded in place of the result. If ``iterable`` itself
+    raises, nothing more is pulled from it, every item already submitted
+    is still yielded, and then the error is re-raised.
+    """
+    max_in_flight = 2 * max_workers
+    items = enumerate(iterable)
+    exhausted = False
+    input_error = None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-item") as executor:
+        in_flight = {}
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                except Exception as e:
+                    # Bad input: finish what was accepted, then report it
+                    input_error = e
+                    exhausted = True
+                    break
+                in_flight[executor.submit(fn, item)] = index
+
+            if not in_flight:
+                if input_error is not None:
+                    raise input_error
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    yield index, future.result()
+                except Exception as e:
+                    yield index, e
@@ -0,0 +1,60 @@
+"""
+Dependency-aware parallel execution of wellness tasks
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_task_graph(graph, inputs, run_task, max_workers=3):
+    """Run every node of ``graph`` as soon as its dependencies finish.
+    
+    ``graph`` maps node names to dicts with ``depends_on`` (list of node
+    names) and an optional ``input_key``; ``run_task(name, node, inputs)``
+    executes one node. Dependent nodes get the outputs of their upstream
+    nodes joined into ``inputs[input_key]``. Returns node name -> output.
+    The first failure cancels pending nodes and is re-raised.
+    """
+    for name, node in graph.items():
+        for dependency in node["depends_on"]:
+            if dependency not in graph:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dependency}'")
+    
+    outputs = {}
+    pending = dict(graph)
+    running = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wellness-task") as executor:
+        while pending or running:
+            ready = [
+                name for name, node in pending.items()
+                if all(dependency in outputs for dependency in node["depends_on"])
+            ]
+            if not ready and not running:
+                raise ValueError(f"Task graph has a cycle between: {', '.join(pending)}")
+            
+            for name in ready:
+                node = pending.pop(name)
+                task_inputs = dict(inputs)
+                if node.get("input_key"):
+                    task_inputs[node["input_key"]] = _combine_outputs(node["depends_on"], outputs)
+                running[executor.submit(run_task, name, node, task_inputs)] = name
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    outputs[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+    
+    return outputs
+
+
+def _combine_outputs(names, outputs):
+    """Join upstream task outputs into one prompt section"""
+    if len(names) == 1:
+        return str(outputs[names[0]])
+    return "\n\n".join(
+        f"### {name.replace('_', ' ').title()}\n{outputs[name]}" for name in names
+    )
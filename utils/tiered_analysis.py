@@ -0,0 +1,173 @@
+"""
+Deterministic fast path for the wellness analysis.
+
+The custom tools already decide the whole plan for healthy and low-risk
+users, so those users get a templated report built from the tool output.
+Everyone else is escalated to the LLM crew.
+"""
+import json
+
+from tools.dopamine_cycle_breaker import dopamine_cycle_breaker
+from tools.screen_time_analyzer import screen_time_analyzer
+
+TIER_DETERMINISTIC = "deterministic"
+TIER_LLM = "llm"
+
+# Fields the tools read; missing ones lower our confidence in their output
+EXPECTED_FIELDS = [
+    "apps",
+    "sessions",
+    "app_switches",
+    "duration_minutes",
+    "scroll_speed",
+    "notification_response_time",
+    "usage_times",
+    "session_duration",
+    "daily_usage"
+]
+
+
+def run_tool_analysis(usage_data):
+    """Run both custom tools and return their parsed output"""
+    usage_json = json.dumps(usage_data)
+    return {
+        "patterns": json.loads(dopamine_cycle_breaker.run(usage_json)),
+        "screen_time": json.loads(screen_time_analyzer.run(usage_json))
+    }
+
+
+def calculate_confidence(usage_data, tool_results):
+    """Estimate (0-1) how fully the tool output describes this user"""
+    present = sum(1 for field in EXPECTED_FIELDS if usage_data.get(field) not in (None, [], ""))
+    confidence = present / len(EXPECTED_FIELDS)
+
+    # Reported screen time should roughly agree with the per-app breakdown
+    reported = usage_data.get("duration_minutes")
+    total = tool_results["screen_time"].get("total_screen_time", {}).get("total_minutes")
+    if reported and total is not None:
+        if abs(total - reported) > 0.25 * reported:
+            confidence -= 0.2
+
+    return max(0.0, round(confidence, 2))
+
+
+def escalation_reasons(usage_data, mood_data, tool_results, config):
+    """List the rules that require the LLM crew (empty means tools decide)"""
+    reasons = []
+    patterns = tool_results["patterns"]
+    screen_time = tool_results["screen_time"]
+
+    if "error" in patterns or "error" in screen_time:
+        reasons.append("tool error")
+        return reasons
+
+    severity = patterns["severity"]
+    if severity in config["escalate_severities"]:
+        reasons.append(f"severity {severity}")
+
+    score = screen_time["wellness_score"]["score"]
+    if score < config["min_wellness_score"]:
+        reasons.append(f"wellness score {score}/100")
+
+    confidence = calculate_confidence(usage_data, tool_results)
+    if confidence < config["min_confidence"]:
+        reasons.append(f"confidence {confidence:.2f}")
+
+    # Emotional impact is not covered by the tools
+    for survey in (mood_data or {}).get("mood_surveys", []):
+        if survey.get("score", 10) <= config["mood_escalation_score"]:
+            reasons.append("low mood scores")
+            break
+
+    return reasons
+
+
+def summarize_tool_results(tool_results):
+    """Severity, wellness score and key findings for the saved report"""
+    patterns = tool_results["patterns"]
+    screen_time = tool_results["screen_time"]
+    errors = [result["error"] for result in (patterns, screen_time) if "error" in result]
+    if errors:
+        return {"severity_level": None, "wellness_score": None, "key_findings": [], "tool_errors": errors}
+
+    total = screen_time["total_screen_time"]
+    wellness = screen_time["wellness_score"]
+    social_minutes = screen_time["app_breakdown"]["by_category"].get("Social Media", 0)
+
+    findings = [f"Daily screen time: {total['formatted']} ({total['total_minutes']} minutes)"]
+    if social_minutes:
+        findings.append(f"Social media usage: {social_minutes} minutes")
+    findings += [
+        f"{name.replace('_', ' ').capitalize()} detected"
+        for name, active in patterns["analysis"].items() if active
+    ]
+    findings += wellness["penalties"]
+    return {
+        "severity_level": patterns["severity"],
+        "wellness_score": f"{wellness['score']}/100",
+        "key_findings": findings
+    }
+
+
+def build_deterministic_report(usage_data, tool_results):
+    """Build the templated wellness plan from the tool output"""
+    patterns = tool_results["patterns"]
+    screen_time = tool_results["screen_time"]
+    total = screen_time["total_screen_time"]
+    wellness = screen_time["wellness_score"]
+    trends = screen_time["usage_trends"]
+    categories = screen_time["app_breakdown"]["by_category"]
+    social_minutes = categories.get("Social Media", 0)
+
+    lines = [
+        "# Digital Wellness Plan",
+        f"Analysis tier: {TIER_DETERMINISTIC} (custom tools only, no LLM escalation needed)",
+        f"User: {usage_data.get('user_id', 'Unknown')}",
+        "",
+        "## Executive Summary",
+        f"- Severity level: {patterns['severity']}",
+        f"- wellness_score: {wellness['score']}/100 ({wellness['rating']})",
+        f"- Daily screen time: {total['formatted']} ({total['total_minutes']} minutes)",
+        f"- Social media: {social_minutes} minutes",
+        f"- Usage trend: {trends['overall_trend']}, most used app: {trends['most_used_app']}",
+        "",
+        "## Usage Analysis",
+    ]
+    for peak in screen_time["peak_usage_times"]:
+        lines.append(f"- Peak at {peak['hour']}:00 ({peak['period']}): {peak['duration']} minutes")
+    for name, minutes in categories.items():
+        lines.append(f"- {name}: {minutes} minutes")
+
+    detected = [name.replace("_", " ") for name, active in patterns["analysis"].items() if active]
+    lines += [
+        "",
+        "## Detected Patterns",
+        f"- {', '.join(detected)}" if detected else "- No addictive patterns detected",
+        "",
+        "## Interventions",
+    ]
+    if patterns["interventions"]:
+        for intervention in patterns["interventions"]:
+            lines.append(f"- {intervention['action']} - {intervention['reasoning']}")
+    else:
+        lines.append("- No interventions required; keep current limits in place")
+
+    lines += ["", "## Recommendations"]
+    lines += [f"- {recommendation}" for recommendation in screen_time["recommendations"]]
+    for penalty in wellness["penalties"]:
+        lines.append(f"- Address: {penalty}")
+
+    lines += [
+        "",
+        "## Daily Schedule",
+        "- 07:00-09:00: Morning routine with minimal device use",
+        "- 09:00-17:00: Focused work, take a 5 minute break every hour",
+        "- 17:00-21:00: Personal time, limit social media to 2 hours",
+        "- 21:00+: Wind down and set devices aside for better sleep",
+        "",
+        "## Break Activities",
+        "- Practice 5-minute breathing exercises",
+        "- Take short walks or stretches between sessions",
+        "- Enable screen time reminders as a digital wellness check-in",
+    ]
+    return "\n".join(lines)
@@ -1,17 +1,79 @@
 """Visualization tools for wellness reports"""
+import matplotlib
 import matplotlib.pyplot as plt
+import multiprocessing
 import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
+from cycler import cycler
 from datetime import datetime
+from functools import lru_cache
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
 import numpy as np
+import io
 import json
+import os
 
 # Set style for better-looking plots
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
-def create_wellness_dashboard(usage_data, analysis_results=None):
-    """Create a comprehensive visual dashboard of wellness metrics"""
-    fig = plt.figure(figsize=(16, 12))
+# Dashboards apply their style per figure instead of relying on the global one
+DASHBOARD_STYLE = ['seaborn-v0_8-darkgrid', {"axes.prop_cycle": cycler(color=sns.color_palette("husl"))}]
+
+# Output profiles. "preview" is a web UI thumbnail: low dpi, no pie shadow or
+# explode, and no value labels, legends, tick labels or timestamp (unreadable
+# at that size, and text layout is most of the render time). Only "print"
+# pays for the second layout pass of bbox_inches='tight'.
+DASHBOARD_PROFILES = {
+    "preview": {"format": "png", "mimetype": "image/png", "dpi": 30, "bbox_inches": None,
+                "detail": False, "rc": {}},
+    "print": {"format": "png", "mimetype": "image/png", "dpi": 300, "bbox_inches": "tight",
+              "detail": True, "rc": {}},
+    # Text stays text in the SVG instead of being drawn as glyph paths
+    "vector": {"format": "svg", "mimetype": "image/svg+xml", "dpi": 72, "bbox_inches": None,
+               "detail": True, "rc": {"svg.fonttype": "none"}}
+}
+
+def get_dashboard_profile(profile):
+    """Settings for a profile name from DASHBOARD_PROFILES"""
+    if profile not in DASHBOARD_PROFILES:
+        raise ValueError(f"Unknown dashboard profile '{profile}' (expected one of {sorted(DASHBOARD_PROFILES)})")
+    return DASHBOARD_PROFILES[profile]
+
+def create_wellness_dashboard(usage_data, analysis_results=None, save=True, profile="print"):
+    """Create a comprehensive visual dashboard of wellness metrics
+    
+    Built on a standalone Figure (no pyplot state), so dashboards can be
+    rendered from worker processes or threads. With ``save=False`` the
+    figure is only returned (see render_dashboard).
+    """
+    settings = get_dashboard_profile(profile)
+    with matplotlib.style.context(DASHBOARD_STYLE + [settings["rc"]]):
+        fig = _build_dashboard_figure(usage_data, analysis_results, profile)
+        if save:
+            output_path = _dashboard_path(usage_data, "outputs", settings["format"])
+            _save_dashboard(fig, output_path, settings)
+            print(f"📊 Dashboard saved to: {output_path}")
+    return fig
+
+def _dashboard_path(usage_data, output_dir, extension="png", index=None):
+    # ``index`` tells apart dashboards of one batch saved within the same second
+    suffix = f"_{index}" if index is not None else ""
+    return os.path.join(
+        output_dir,
+        f'wellness_dashboard_{usage_data.get("user_id", "user")}_{datetime.now().strftime("%Y%m%d_%H%M%S")}{suffix}.{extension}'
+    )
+
+def _save_dashboard(fig, target, settings):
+    fig.savefig(target, format=settings["format"], dpi=settings["dpi"],
+                bbox_inches=settings["bbox_inches"], facecolor='white')
+
+def _build_dashboard_figure(usage_data, analysis_results=None, profile="print"):
+    detail = get_dashboard_profile(profile)["detail"]
+    fig = Figure(figsize=(16, 12))
+    FigureCanvasAgg(fig)
     
     # Create a more complex grid layout
     gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
@@ -29,19 +91,20 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
     ax1.axhline(y=60, color='orange', linestyle='--', label='Recommended limit (60 min/session)')
     
     ax1.set_title('Daily Usage Pattern', fontsize=16, fontweight='bold')
-    ax1.set_xlabel('Hour of Day', fontsize=12)
-    ax1.set_ylabel('Duration (minutes)', fontsize=12)
-    ax1.legend()
     ax1.set_xticks(range(0, 24, 2))
-    
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        ax1.annotate(f'{int(height)}',
-                    xy=(bar.get_x() + bar.get_width() / 2, height),
-                    xytext=(0, 3),
-                    textcoords="offset points",
-                    ha='center', va='bottom', fontsize=8)
+    if detail:
+        ax1.set_xlabel('Hour of Day', fontsize=12)
+        ax1.set_ylabel('Duration (minutes)', fontsize=12)
+        ax1.legend()
+        
+        # Add value labels on bars
+        for bar in bars:
+            height = bar.get_height()
+            ax1.annotate(f'{int(height)}',
+                        xy=(bar.get_x() + bar.get_width() / 2, height),
+                        xytext=(0, 3),
+                        textcoords="offset points",
+                        ha='center', va='bottom', fontsize=8)
     
     # 2. App Category Breakdown (top right)
     ax2 = fig.add_subplot(gs[0, 2])
@@ -50,12 +113,12 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
         cat = app["category"]
         categories[cat] = categories.get(cat, 0) + app["duration"]
     
-    # Create a more stylish pie chart
-    colors_pie = plt.cm.Set3(np.linspace(0, 1, len(categories)))
+    # Create a more stylish pie chart (shadow and explode only where it will be seen)
+    colors_pie = matplotlib.colormaps['Set3'](np.linspace(0, 1, len(categories)))
     wedges, texts, autotexts = ax2.pie(categories.values(), labels=categories.keys(), 
                                         autopct='%1.1f%%', colors=colors_pie,
-                                        explode=[0.05] * len(categories),
-                                        shadow=True, startangle=90)
+                                        explode=[0.05] * len(categories) if detail else None,
+                                        shadow=detail, startangle=90)
     
     # Improve text appearance
     for text in texts:
@@ -82,13 +145,14 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
     app_durations = [app["duration"] for app in apps_sorted]
     
     bars = ax4.barh(app_names, app_durations, color='skyblue')
-    ax4.set_xlabel('Duration (minutes)', fontsize=12)
     ax4.set_title('Top 5 Apps by Usage', fontsize=14, fontweight='bold')
-    
-    # Add value labels
-    for i, (bar, duration) in enumerate(zip(bars, app_durations)):
-        ax4.text(bar.get_width() + 3, bar.get_y() + bar.get_height()/2, 
-                f'{duration}m', va='center', fontsize=10)
+    if detail:
+        ax4.set_xlabel('Duration (minutes)', fontsize=12)
+        
+        # Add value labels
+        for i, (bar, duration) in enumerate(zip(bars, app_durations)):
+            ax4.text(bar.get_width() + 3, bar.get_y() + bar.get_height()/2, 
+                    f'{duration}m', va='center', fontsize=10)
     
     # 5. Intervention Timeline (middle right)
     ax5 = fig.add_subplot(gs[1, 2])
@@ -98,12 +162,13 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
     
     ax5.scatter(timeline, [1, 1, 1], s=300, c=colors_timeline, alpha=0.7, edgecolors='black')
     
-    for i, txt in enumerate(interventions):
-        ax5.annotate(txt, (timeline[i], 1), xytext=(0, 30), 
-                    textcoords='offset points', ha='center', fontsize=10,
-                    bbox=dict(boxstyle="round,pad=0.3", facecolor=colors_timeline[i], alpha=0.3))
+    if detail:
+        for i, txt in enumerate(interventions):
+            ax5.annotate(txt, (timeline[i], 1), xytext=(0, 30), 
+                        textcoords='offset points', ha='center', fontsize=10,
+                        bbox=dict(boxstyle="round,pad=0.3", facecolor=colors_timeline[i], alpha=0.3))
+        ax5.set_xlabel('Days', fontsize=12)
     
-    ax5.set_xlabel('Days', fontsize=12)
     ax5.set_xlim(0, 35)
     ax5.set_ylim(0.5, 1.5)
     ax5.set_title('Intervention Timeline', fontsize=14, fontweight='bold')
@@ -118,11 +183,12 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
     ax6.fill_between(days, daily_usage, alpha=0.3, color='lightblue')
     ax6.axhline(y=360, color='red', linestyle='--', label='Recommended limit (6 hours)')
     
-    ax6.set_xlabel('Days', fontsize=12)
-    ax6.set_ylabel('Minutes', fontsize=12)
     ax6.set_title('5-Day Usage Trend', fontsize=14, fontweight='bold')
-    ax6.legend()
     ax6.grid(True, alpha=0.3)
+    if detail:
+        ax6.set_xlabel('Days', fontsize=12)
+        ax6.set_ylabel('Minutes', fontsize=12)
+        ax6.legend()
     
     # 7. Notification Response Pattern (bottom center)
     ax7 = fig.add_subplot(gs[2, 1])
@@ -132,13 +198,14 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
              color='purple', alpha=0.7, edgecolor='black')
     ax7.axvline(x=5, color='green', linestyle='--', label='Healthy response (>5s)')
     
-    ax7.set_xlabel('Response Time (seconds)', fontsize=12)
-    ax7.set_ylabel('Frequency', fontsize=12)
     ax7.set_title('Notification Response Pattern', fontsize=14, fontweight='bold')
-    ax7.legend()
+    if detail:
+        ax7.set_xlabel('Response Time (seconds)', fontsize=12)
+        ax7.set_ylabel('Frequency', fontsize=12)
+        ax7.legend()
     
     # 8. Addiction Indicators (bottom right)
-    ax8 = fig.add_subplot(gs[2, 2])
+    ax8 = fig.add_subplot(gs[2, 2], projection='polar')
     indicators = extract_addiction_indicators(analysis_results) if analysis_results else {
         'App Switching': 85,
         'Doom Scrolling': 70,
@@ -148,49 +215,47 @@ def create_wellness_dashboard(usage_data, analysis_results=None):
     }
     
     # Create a radar chart
-    create_radar_chart(ax8, indicators)
+    create_radar_chart(ax8, indicators, labels=detail)
     ax8.set_title('Digital Addiction Indicators', fontsize=14, fontweight='bold')
     
     # Add overall title and timestamp
     fig.suptitle(f'Digital Wellness Dashboard - {usage_data.get("user_id", "User")}', 
                  fontsize=18, fontweight='bold', y=0.98)
     
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    fig.text(0.99, 0.01, f'Generated: {timestamp}', ha='right', va='bottom', 
-             fontsize=10, style='italic', alpha=0.7)
-    
-    # Save the dashboard
-    plt.tight_layout()
-    output_path = f'outputs/wellness_dashboard_{usage_data.get("user_id", "user")}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
+    if detail:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        fig.text(0.99, 0.01, f'Generated: {timestamp}', ha='right', va='bottom', 
+                 fontsize=10, style='italic', alpha=0.7)
+    else:
+        # Tick labels are the bulk of the text to lay out and are unreadable in a thumbnail
+        for ax in (ax1, ax4, ax5, ax6, ax7):
+            ax.tick_params(labelbottom=False, labelleft=False)
     
-    print(f"📊 Dashboard saved to: {output_path}")
     return fig
 
-def create_gauge(ax, score):
-    """Create a gauge visualization for wellness score"""
-    # Create the gauge
-    theta = np.linspace(0, np.pi, 100)
+@lru_cache(maxsize=None)
+def _gauge_zones():
+    """Vertices of the gauge's colored zones; the same for every dashboard"""
     r_inner = 0.7
     r_outer = 1.0
-    
-    # Color zones
-    colors = ['red', 'orange', 'yellow', 'lightgreen', 'green']
     boundaries = [0, 20, 40, 60, 80, 100]
     
-    for i in range(len(colors)):
+    zones = []
+    for i in range(len(boundaries) - 1):
         theta_start = np.pi * (1 - boundaries[i] / 100)
         theta_end = np.pi * (1 - boundaries[i + 1] / 100)
         theta_range = np.linspace(theta_start, theta_end, 50)
         
-        x_inner = r_inner * np.cos(theta_range)
-        y_inner = r_inner * np.sin(theta_range)
-        x_outer = r_outer * np.cos(theta_range)
-        y_outer = r_outer * np.sin(theta_range)
-        
-        verts = list(zip(x_outer, y_outer)) + list(zip(x_inner[::-1], y_inner[::-1]))
-        poly = plt.Polygon(verts, facecolor=colors[i], edgecolor='white')
-        ax.add_patch(poly)
+        outer = np.column_stack([r_outer * np.cos(theta_range), r_outer * np.sin(theta_range)])
+        inner = np.column_stack([r_inner * np.cos(theta_range[::-1]), r_inner * np.sin(theta_range[::-1])])
+        zones.append(np.concatenate([outer, inner]))
+    return tuple(zones)
+
+def create_gauge(ax, score):
+    """Create a gauge visualization for wellness score"""
+    # Color zones, drawn as one collection from the cached geometry
+    colors = ['red', 'orange', 'yellow', 'lightgreen', 'green']
+    ax.add_collection(PolyCollection(_gauge_zones(), facecolors=colors, edgecolors='white'))
     
     # Add needle
     angle = np.pi * (1 - score / 100)
@@ -212,8 +277,8 @@ def create_gauge(ax, score):
     ax.set_ylim(-0.6, 1.2)
     ax.axis('off')
 
-def create_radar_chart(ax, indicators):
-    """Create a radar chart for addiction indicators"""
+def create_radar_chart(ax, indicators, labels=True):
+    """Create a radar chart for addiction indicators on a polar Axes"""
     categories = list(indicators.keys())
     values = list(indicators.values())
     
@@ -225,9 +290,6 @@ def create_radar_chart(ax, indicators):
     values += values[:1]  # Complete the circle
     angles += angles[:1]
     
-    # Initialize the plot
-    ax = plt.subplot(projection='polar', position=ax.get_position())
-    
     # Draw the outline of our data
     ax.plot(angles, values, 'o-', linewidth=2, color='red')
     ax.fill(angles, values, alpha=0.25, color='red')
@@ -238,12 +300,12 @@ def create_radar_chart(ax, indicators):
     
     # Draw axis lines for each angle and label
     ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(categories, size=10)
+    ax.set_xticklabels(categories if labels else [], size=10)
     
     # Set y-axis limits and labels
     ax.set_ylim(0, 100)
     ax.set_yticks([20, 40, 60, 80])
-    ax.set_yticklabels(['20', '40', '60', '80'], size=8)
+    ax.set_yticklabels(['20', '40', '60', '80'] if labels else [], size=8)
     
     # Add grid
     ax.grid(True)
@@ -468,15 +530,73 @@ def create_comparative_analysis(user_data_list):
     
     return fig
 
+def render_dashboard(usage_data, analysis_results=None, profile="preview"):
+    """Render the dashboard to image bytes (PNG or SVG, per the profile) without writing a file
+    
+    Top-level so utils/dashboards.py can run it in a worker process.
+    """
+    settings = get_dashboard_profile(profile)
+    with matplotlib.style.context(DASHBOARD_STYLE + [settings["rc"]]):
+        fig = _build_dashboard_figure(usage_data, analysis_results, profile)
+        buffer = io.BytesIO()
+        _save_dashboard(fig, buffer, settings)
+    return buffer.getvalue()
+
+def _render_dashboard_file(task):
+    """Process-pool worker for render_dashboards: returns the saved path or the exception"""
+    index, usage_data, analysis_results, output_dir, profile = task
+    try:
+        settings = get_dashboard_profile(profile)
+        with matplotlib.style.context(DASHBOARD_STYLE + [settings["rc"]]):
+            fig = _build_dashboard_figure(usage_data, analysis_results, profile)
+            output_path = _dashboard_path(usage_data, output_dir, settings["format"], index)
+            # Exclusive create: a name collision fails this user instead of overwriting a dashboard
+            with open(output_path, "xb") as f:
+                _save_dashboard(fig, f, settings)
+        return output_path
+    except Exception as e:
+        return e
+
+def render_dashboards(user_data_list, workers=None, analysis_results_list=None, output_dir="outputs", profile="print"):
+    """Render one dashboard per user across a process pool
+    
+    Returns a list aligned with ``user_data_list`` holding each saved path,
+    or the exception raised for that user. File names carry the user's
+    position in the list, so duplicate or missing user ids never share a
+    file. ``workers`` defaults to the CPU
+    count; 1 renders in this process. Workers start from a fresh process
+    (forkserver or spawn), never a fork of the caller, which may already run
+    background threads.
+    """
+    get_dashboard_profile(profile)
+    if analysis_results_list is None:
+        analysis_results_list = [None] * len(user_data_list)
+    elif len(analysis_results_list) != len(user_data_list):
+        raise ValueError(
+            f"analysis_results_list has {len(analysis_results_list)} entries "
+            f"for {len(user_data_list)} users"
+        )
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [
+        (index, usage_data, analysis_results, output_dir, profile)
+        for index, (usage_data, analysis_results) in enumerate(zip(user_data_list, analysis_results_list))
+    ]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers == 1:
+        return [_render_dashboard_file(task) for task in tasks]
+    
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as executor:
+        # Several dashboards per task keep IPC overhead low for large cohorts (and amortize worker startup)
+        chunksize = max(1, len(tasks) // (workers * 4))
+        return list(executor.map(_render_dashboard_file, tasks, chunksize=chunksize))
+
 # Integration function to be called from main.py
 def generate_visual_report(usage_data, analysis_results=None):
     """Generate complete visual report for a user"""
     try:
-        # Create main dashboard
-        dashboard_fig = create_wellness_dashboard(usage_data, analysis_results)
-        
-        # Close the figure to free memory
-        plt.close(dashboard_fig)
+        # Create main dashboard (a standalone Figure, freed once unreferenced)
+        create_wellness_dashboard(usage_data, analysis_results)
         
         return True
     except Exception as e: